@@ -48,6 +48,9 @@ def create_app(config_class=Config):
     # 블루프린트 등록
     register_blueprints(app)
     
+    # 백그라운드 이벤트 루프 시작 (비동기 검색 서비스 공유)
+    start_background_loop(app)
+    
     # WebSocket 서비스 초기화
     from .services.websocket_service import initialize_websocket_service
     initialize_websocket_service(socketio)
@@ -96,6 +99,36 @@ def register_blueprints(app):
     except ImportError as e:
         print(f"Blueprint registration error (may be in development): {e}")
 
+def start_background_loop(app):
+    """
+    앱 공유 이벤트 루프 시작 후 고급 RAG 서비스를 미리 초기화
+    
+    초기화(모델 로드 + 색인)는 루프에서 백그라운드로 진행되며,
+    그 사이 들어온 검색 요청은 초기화가 끝날 때까지 기다립니다.
+    """
+    from .services.background_loop import background_loop
+    
+    background_loop.start()
+    app.background_loop = background_loop
+    
+    if not app.config.get('ADVANCED_RAG_WARMUP', True):
+        return
+    
+    try:
+        from .services.advanced_rag_service import get_advanced_rag_service
+    except ImportError as e:
+        print(f"Advanced RAG warmup skipped: {e}")
+        return
+    
+    def _on_ready(future):
+        error = future.exception()
+        if error is not None:
+            print(f"Advanced RAG warmup failed: {error}")
+        else:
+            print("Advanced RAG service ready")
+    
+    background_loop.submit(get_advanced_rag_service()).add_done_callback(_on_ready)
+
 def register_static_routes(app):
     """Static 파일 라우트 등록"""
     
@@ -774,36 +774,23 @@ def auto_restore():
                 elif name == "최적화: 벡터 인덱스 자동 생성":
                     print("[ADMIN] 벡터 인덱스 확인 및 자동 생성...")
                     try:
-                        from ..services.config_adapter import config_adapter as _cfg
-                        from ..services.persist import effective_persist_dir
-                        from pathlib import Path
-                        import os
-                        
-                        persist_dir = Path(effective_persist_dir())
-                        vector_dir = Path(_cfg.get('VECTOR_DB_PATH', persist_dir / 'vectors'))
-                        chroma_db = vector_dir / "chroma.sqlite3"
+                        from ..domain.rag.vector_indexer import build_vector_index, get_default_indexer
                         
-                        # 벡터 인덱스 존재 확인
-                        if chroma_db.exists() and chroma_db.stat().st_size > 0:
-                            print(f"[ADMIN] 벡터 인덱스 이미 존재함: {chroma_db}")
-                            print(f"[ADMIN] 크기: {chroma_db.stat().st_size / 1024 / 1024:.2f} MB")
+                        # 상주 벡터 인덱스 확인 (공유 행렬이 있으면 매핑만)
+                        stats = get_default_indexer().get_index_stats()
+                        if stats['exists']:
+                            print(f"[ADMIN] 벡터 인덱스 이미 존재함: {stats['vector_count']}개 ({stats['embedding_model']})")
                             print("[ADMIN] 벡터 인덱스 재생성 스킵 (기존 사용)")
+                            result = {'indexed_count': stats['vector_count'], 'provider': stats['embedding_provider']}
                         else:
                             print("[ADMIN] 벡터 인덱스 없음 - 자동 생성 시도")
-                            
-                            chunks_file = persist_dir / "chunks.jsonl"
-                            if not chunks_file.exists():
-                                raise FileNotFoundError(f"chunks.jsonl 파일이 없습니다: {chunks_file}")
-                            
-                            # from src.backend.domain.rag.vector_indexer import build_vector_index
-                            def build_vector_index(): return {"success": False, "error": "Not implemented"}
-                            result = build_vector_index(str(chunks_file), vector_db_path=str(vector_dir), force_rebuild=True)
+                            result = build_vector_index(force_rebuild=True)
                             if int(result.get('indexed_count') or 0) <= 0:
-                                raise RuntimeError('벡터 0개 생성')
-                            
-                            session_adapter.set('vector_index_built', True)
-                            session_adapter.set('vector_count', int(result.get('indexed_count') or 0))
-                            session_adapter.set('embedding_model', result.get('provider') or 'unknown')
+                                raise RuntimeError(result.get('error') or '벡터 0개 생성')
+                        
+                        session_adapter.set('vector_index_built', True)
+                        session_adapter.set('vector_count', int(result.get('indexed_count') or 0))
+                        session_adapter.set('embedding_model', result.get('provider') or 'unknown')
                             
                     except Exception as e:
                         print(f"[ADMIN] 벡터 인덱스 생성 실패: {e}")
@@ -1872,12 +1859,11 @@ def vector_rebuild():
         print(f"[REBUILD] Model: {model}")
         print(f"[REBUILD] Force rebuild: {force_rebuild}")
 
-        from pathlib import Path
-        from ..services.persist import effective_persist_dir
-        # from src.backend.domain.rag.vector_indexer import build_vector_index
-        def build_vector_index(): return {"success": False, "error": "Not implemented"}
+        from ..domain.rag.vector_indexer import build_vector_index
+        from ..services.rag_service import rag_service
 
-        chunks_file = Path(effective_persist_dir()) / 'chunks.jsonl'
+        # 상주 인덱스가 검색하는 chunks.jsonl
+        chunks_file = rag_service.persist_dir / 'chunks.jsonl'
         if not chunks_file.exists():
             return jsonify({'success': False, 'error': 'chunks.jsonl이 없습니다. 먼저 인덱스 생성이 필요합니다.'}), 400
 
@@ -1896,15 +1882,15 @@ def vector_rebuild():
         if int(result.get('indexed_count') or 0) <= 0:
             return jsonify({
                 'success': False, 
-                'error': f'벡터가 0개로 생성되었습니다. chunks.jsonl/임베딩 설정을 확인하세요.'
+                'error': result.get('error') or f'벡터가 0개로 생성되었습니다. chunks.jsonl/임베딩 설정을 확인하세요.'
             }), 400
             
         return jsonify({
             'success': True, 
             'data': {
                 'vector_count': int(result.get('indexed_count') or 0),
-                'provider': provider,
-                'model': model
+                'provider': result.get('provider') or provider,
+                'model': result.get('model') or model
             }
         })
         
@@ -1919,10 +1905,8 @@ def vector_build():
         if not auth_service.is_authenticated():
             return jsonify({'success': False, 'error': 'Unauthorized'}), 401
 
-        from pathlib import Path
-        from ..services.persist import effective_persist_dir
-        # from src.backend.domain.rag.vector_indexer import build_vector_index
-        def build_vector_index(): return {"success": False, "error": "Not implemented"}
+        from ..domain.rag.vector_indexer import build_vector_index
+        from ..services.rag_service import rag_service
 
         # 클라이언트에서 임베딩 설정 오버라이드 허용
         payload = {}
@@ -1935,7 +1919,8 @@ def vector_build():
         vector_db_path = (payload.get('vector_db_path') or '').strip() or None
         force_rebuild = bool(payload.get('force_rebuild')) if 'force_rebuild' in payload else True
 
-        chunks_file = Path(effective_persist_dir()) / 'chunks.jsonl'
+        # 상주 인덱스가 검색하는 chunks.jsonl
+        chunks_file = rag_service.persist_dir / 'chunks.jsonl'
         if not chunks_file.exists():
             return jsonify({'success': False, 'error': 'chunks.jsonl이 없습니다. 먼저 인덱스 생성이 필요합니다.'}), 400
 
@@ -1959,16 +1944,13 @@ def vector_build():
         session_adapter.set('embedding_model', result.get('provider') or 'unknown')
         
         if int(result.get('indexed_count') or 0) <= 0:
-            # 자동 폴백: OpenAI 실패 시 ST 시도, 그 반대도 시도
+            # 자동 폴백: OpenAI 실패 시 ST(없으면 내장 해시 임베딩), 그 외에는 내장 해시 임베딩
             try:
                 fallback_provider = None
                 if (provider or '').strip().lower() == 'openai':
-                    fallback_provider = 'sentence-transformer'
-                elif (provider or '').strip().lower() == 'sentence-transformer':
-                    fallback_provider = 'openai'
+                    fallback_provider = 'auto'
                 else:
-                    # 명시 안했으면 ST 우선
-                    fallback_provider = 'sentence-transformer'
+                    fallback_provider = 'hashing'
 
                 if fallback_provider:
                     fb_res = build_vector_index(
@@ -2012,41 +1994,17 @@ def search_test():
         if not query:
             return jsonify({'success': False, 'error': 'query가 필요합니다.'}), 400
 
-        # BM25 + (선택) 벡터 검색기 구성
-        # from src.backend.domain.rag.engine_bm25 import Bm25RagEngine
-        class Bm25RagEngine: pass
-        # from src.backend.domain.rag.engine import RagDoc
-        class RagDoc: pass
-        # from src.backend.domain.rag.vector_store import get_vector_store
-        def get_vector_store(): return None
-        # from src.backend.domain.rag.hybrid_search import HybridSearcher, SearchMode
-        class HybridSearcher: pass
-        class SearchMode: pass
-        from ..services.persist import effective_persist_dir
-        from pathlib import Path
+        # 프로세스 상주 BM25/벡터 인덱스로 검색 (요청마다 인덱스를 만들지 않음)
+        from ..domain.rag.hybrid_search import SearchMode, create_hybrid_search_engine
         import time
 
-        chunks_file = Path(effective_persist_dir()) / 'chunks.jsonl'
-        docs: list[RagDoc] = []
-        if chunks_file.exists():
-            import json as _json
-            with open(chunks_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if line.strip():
-                        c = _json.loads(line)
-                        docs.append(RagDoc(doc_id=c.get('chunk_id',''), title=c.get('title',''), text=c.get('text','')))
-
-        bm25 = Bm25RagEngine()
-        if docs:
-            bm25.index(docs)
-        vs = get_vector_store()
-
         try:
             smode = SearchMode(mode) if mode in ('bm25','vector','hybrid') else SearchMode.HYBRID
         except Exception:
             smode = SearchMode.HYBRID
 
-        hs = HybridSearcher(bm25, vs, mode=smode, alpha=alpha)
+        hs = create_hybrid_search_engine(mode=smode, alpha=alpha)
+        smode = hs.effective_mode
         t0 = time.time()
         results = hs.search(query, top_k=top_k)
         elapsed_ms = int((time.time() - t0) * 1000)
@@ -2422,8 +2380,7 @@ def get_vector_status():
         }
     """
     try:
-        # from src.backend.domain.rag.vector_indexer import get_default_indexer
-        def get_default_indexer(): return None
+        from ..domain.rag.vector_indexer import get_default_indexer
         
         indexer = get_default_indexer()
         stats = indexer.get_index_stats()
@@ -2481,8 +2438,7 @@ def get_search_mode():
         
         # 벡터 인덱스 상태
         try:
-            # from src.backend.domain.rag.vector_indexer import get_default_indexer
-            def get_default_indexer(): return None
+            from ..domain.rag.vector_indexer import get_default_indexer
             vector_indexer = get_default_indexer()
             vector_stats = vector_indexer.get_index_stats()
             vector_count = vector_stats.get('vector_count', 0)
@@ -11,6 +11,7 @@ from ..services.chat_service import chat_service
 from ..services.rag_service import rag_service
 from ..services.ai_service import ai_service, AIProvider
 from ..services.advanced_rag_service import get_advanced_rag_service
+from ..services.background_loop import background_loop
 
 # 채팅 API 블루프린트
 chat_bp = Blueprint('chat', __name__)
@@ -264,7 +265,7 @@ def _create_system_prompt(mode: str, difficulty: str) -> str:
 
 
 @chat_bp.route('/search/advanced', methods=['POST'])
-async def advanced_search():
+def advanced_search():
     """
     고급 RAG 검색 API
     
@@ -273,7 +274,8 @@ async def advanced_search():
             "query": "검색 쿼리",
             "top_k": 10,
             "alpha": 0.5,
-            "use_rerank": true
+            "use_rerank": true,
+            "fusion": "minmax|zscore|rrf"
         }
     
     Returns:
@@ -289,6 +291,7 @@ async def advanced_search():
         top_k = data.get('top_k', 10)
         alpha = data.get('alpha', 0.5)
         use_rerank = data.get('use_rerank', True)
+        fusion = data.get('fusion')  # minmax | zscore | rrf (기본: RAG_FUSION)
         
         # 입력 검증
         if not query:
@@ -297,35 +300,34 @@ async def advanced_search():
                 'error': '검색 쿼리가 비어있습니다.'
             }), 400
         
-        # 고급 RAG 서비스 가져오기
-        advanced_rag = await get_advanced_rag_service()
+        from ..domain.rag.fusion import FUSION_METHODS
+        if fusion is not None and str(fusion).lower() not in FUSION_METHODS:
+            return jsonify({
+                'success': False,
+                'error': f"지원하지 않는 융합 방식입니다: {fusion} ({', '.join(FUSION_METHODS)})"
+            }), 400
         
-        # 하이브리드 검색 실행
-        results = await advanced_rag.hybrid_search(
-            query=query,
-            top_k=top_k,
-            alpha=alpha,
-            use_rerank=use_rerank
-        )
+        async def _search():
+            # 고급 RAG 서비스 가져오기
+            advanced_rag = await get_advanced_rag_service()
+            
+            # 하이브리드 검색 실행
+            results = await advanced_rag.hybrid_search(
+                query=query,
+                top_k=top_k,
+                alpha=alpha,
+                use_rerank=use_rerank,
+                fusion=fusion
+            )
+            
+            # 통계 정보
+            return results, await advanced_rag.get_search_stats()
+        
+        # 앱 공유 이벤트 루프에서 실행
+        results, stats = background_loop.run(_search())
         
         # 결과 변환
-        search_results = []
-        for result in results:
-            search_results.append({
-                'doc_id': result.doc_id,
-                'chunk_id': result.chunk_id,
-                'score': result.score,
-                'bm25_score': result.bm25_score,
-                'vector_score': result.vector_score,
-                'text': result.text,
-                'title': result.title,
-                'source': result.source,
-                'search_type': result.search_type,
-                'metadata': result.metadata
-            })
-        
-        # 통계 정보
-        stats = await advanced_rag.get_search_stats()
+        search_results = [_search_result_to_dict(result) for result in results]
         
         return jsonify({
             'success': True,
@@ -335,6 +337,9 @@ async def advanced_search():
             'total_results': len(search_results)
         })
         
+    except TimeoutError:
+        print("[Advanced Search] 시간 초과")
+        return _timeout_response()
     except Exception as e:
         print(f"[Advanced Search] 오류: {e}")
         return jsonify({
@@ -343,8 +348,134 @@ async def advanced_search():
         }), 500
 
 
+def _timeout_response():
+    """백그라운드 이벤트 루프 대기 시간 초과 응답 (검색 서비스 초기화 지연 등)"""
+    return jsonify({
+        'success': False,
+        'error': '검색 서비스가 준비되지 않았거나 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요.'
+    }), 503
+
+
+# 일괄 검색 요청당 최대 쿼리 수
+MAX_BATCH_QUERIES = 100
+
+
+@chat_bp.route('/search/batch', methods=['POST'])
+def batch_search():
+    """
+    일괄 고급 RAG 검색 API (쿼리 임베딩과 벡터 점수화를 한 번에 처리)
+    
+    Request Body:
+        {
+            "queries": ["검색 쿼리 1", "검색 쿼리 2", ...],
+            "top_k": 10,
+            "alpha": 0.5,
+            "use_rerank": true,
+            "fusion": "minmax|zscore|rrf"
+        }
+    
+    Returns:
+        {
+            "success": true,
+            "results": [{"query": "...", "results": [...], "total_results": 3}, ...],
+            "stats": {...}
+        }
+    """
+    try:
+        data = request.get_json() or {}
+        queries = data.get('queries')
+        top_k = data.get('top_k', 10)
+        alpha = data.get('alpha', 0.5)
+        use_rerank = data.get('use_rerank', True)
+        fusion = data.get('fusion')  # minmax | zscore | rrf (기본: RAG_FUSION)
+        
+        # 입력 검증
+        if not isinstance(queries, list) or not queries:
+            return jsonify({
+                'success': False,
+                'error': '검색 쿼리 목록(queries)이 비어있습니다.'
+            }), 400
+        if len(queries) > MAX_BATCH_QUERIES:
+            return jsonify({
+                'success': False,
+                'error': f'한 번에 최대 {MAX_BATCH_QUERIES}개 쿼리까지 검색할 수 있습니다.'
+            }), 400
+        queries = [query.strip() if isinstance(query, str) else '' for query in queries]
+        if not all(queries):
+            return jsonify({
+                'success': False,
+                'error': '비어있는 검색 쿼리가 있습니다.'
+            }), 400
+        
+        from ..domain.rag.fusion import FUSION_METHODS
+        if fusion is not None and str(fusion).lower() not in FUSION_METHODS:
+            return jsonify({
+                'success': False,
+                'error': f"지원하지 않는 융합 방식입니다: {fusion} ({', '.join(FUSION_METHODS)})"
+            }), 400
+        
+        async def _search():
+            # 고급 RAG 서비스 가져오기
+            advanced_rag = await get_advanced_rag_service()
+            
+            # 일괄 하이브리드 검색 실행
+            batch_results = await advanced_rag.hybrid_search_many(
+                queries=queries,
+                top_k=top_k,
+                alpha=alpha,
+                use_rerank=use_rerank,
+                fusion=fusion
+            )
+            
+            # 통계 정보
+            return batch_results, await advanced_rag.get_search_stats()
+        
+        # 앱 공유 이벤트 루프에서 실행
+        batch_results, stats = background_loop.run(_search())
+        
+        return jsonify({
+            'success': True,
+            'results': [
+                {
+                    'query': query,
+                    'results': [_search_result_to_dict(result) for result in results],
+                    'total_results': len(results)
+                }
+                for query, results in zip(queries, batch_results)
+            ],
+            'stats': stats,
+            'total_queries': len(queries)
+        })
+        
+    except TimeoutError:
+        print("[Batch Search] 시간 초과")
+        return _timeout_response()
+    except Exception as e:
+        print(f"[Batch Search] 오류: {e}")
+        return jsonify({
+            'success': False,
+            'error': f'일괄 검색 중 오류가 발생했습니다: {str(e)}'
+        }), 500
+
+
+def _search_result_to_dict(result) -> Dict[str, Any]:
+    """HybridSearchResult를 응답 딕셔너리로 변환"""
+    return {
+        'doc_id': result.doc_id,
+        'chunk_id': result.chunk_id,
+        'score': result.score,
+        'bm25_score': result.bm25_score,
+        'vector_score': result.vector_score,
+        'text': result.text,
+        'title': result.title,
+        'source': result.source,
+        'search_type': result.search_type,
+        'metadata': result.metadata
+    }
+
+
 @chat_bp.route('/search/stats', methods=['GET'])
-async def search_stats():
+def search_stats():
     """
     검색 통계 API
     
@@ -355,17 +486,23 @@ async def search_stats():
         }
     """
     try:
-        # 고급 RAG 서비스 가져오기
-        advanced_rag = await get_advanced_rag_service()
+        async def _stats():
+            # 고급 RAG 서비스 가져오기
+            advanced_rag = await get_advanced_rag_service()
+            
+            # 통계 정보
+            return await advanced_rag.get_search_stats()
         
-        # 통계 정보
-        stats = await advanced_rag.get_search_stats()
+        stats = background_loop.run(_stats())
         
         return jsonify({
             'success': True,
             'stats': stats
         })
         
+    except TimeoutError:
+        print("[Search Stats] 시간 초과")
+        return _timeout_response()
     except Exception as e:
         print(f"[Search Stats] 오류: {e}")
         return jsonify({
@@ -375,28 +512,36 @@ async def search_stats():
 
 
 @chat_bp.route('/search/optimize', methods=['POST'])
-async def optimize_search():
+def optimize_search():
     """
     검색 인덱스 최적화 API
     
     Returns:
         {
             "success": true,
-            "message": "인덱스 최적화가 완료되었습니다."
+            "message": "인덱스 최적화가 완료되었습니다.",
+            "result": {"merged_segments": 2, "purged_documents": 10, "segments": 1}
         }
     """
     try:
-        # 고급 RAG 서비스 가져오기
-        advanced_rag = await get_advanced_rag_service()
+        async def _optimize():
+            # 고급 RAG 서비스 가져오기
+            advanced_rag = await get_advanced_rag_service()
+            
+            # 인덱스 최적화 실행 (세그먼트 병합)
+            return await advanced_rag.optimize_index()
         
-        # 인덱스 최적화 실행
-        await advanced_rag.optimize_index()
+        result = background_loop.run(_optimize())
         
         return jsonify({
             'success': True,
-            'message': '인덱스 최적화가 완료되었습니다.'
+            'message': '인덱스 최적화가 완료되었습니다.',
+            'result': result
         })
         
+    except TimeoutError:
+        print("[Optimize Search] 시간 초과")
+        return _timeout_response()
     except Exception as e:
         print(f"[Optimize Search] 오류: {e}")
         return jsonify({
@@ -53,6 +53,8 @@ class Config:
     # RAG 설정
     RAG_PERSIST_DIR = str(PROJECT_ROOT / '.like' / 'persist')
     CHROMA_PERSIST_DIR = str(PROJECT_ROOT / '.like' / 'chroma')
+    # 앱 시작 시 고급 RAG 서비스(상주 인덱스) 미리 초기화
+    ADVANCED_RAG_WARMUP = os.environ.get('ADVANCED_RAG_WARMUP', 'True').lower() == 'true'
     
     # 로깅 설정
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -71,6 +73,7 @@ class TestingConfig(Config):
     
     # 테스트용 인메모리 데이터베이스
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    ADVANCED_RAG_WARMUP = False
 
 class ProductionConfig(Config):
     """프로덕션 환경 설정"""
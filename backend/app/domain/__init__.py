@@ -0,0 +1,3 @@
+"""
+도메인 로직 패키지
+"""
@@ -0,0 +1,42 @@
+"""
+RAG 검색 도메인 패키지
+
+프로세스마다 상주하는 BM25 인덱스 하나와 벡터 인덱스 하나(ResidentIndex)를
+RAGService, AdvancedRAGService, 관리자 API가 함께 사용합니다.
+
+- engine: RagDoc / RagHit, ResidentIndex, get_resident_index
+- engine_bm25: Bm25RagEngine (BM25 검색 어댑터)
+- vector_store: VectorStore, get_vector_store, load_embedding_model
+- vector_indexer: VectorIndexer, get_default_indexer, build_vector_index
+- hybrid_search: HybridSearcher, SearchMode, create_hybrid_search_engine
+- fusion: fuse (minmax / zscore / rrf 점수 융합)
+- retrieval_cache: RetrievalCache, retrieval_cache (인덱스 버전 키 LRU + TTL 결과 캐시)
+"""
+from .engine import RagDoc, RagHit, ResidentIndex, get_resident_index
+from .engine_bm25 import Bm25RagEngine
+from .vector_store import VectorStore, get_vector_store, load_embedding_model
+from .vector_indexer import VectorIndexer, build_vector_index, get_default_indexer
+from .hybrid_search import HybridSearcher, SearchMode, create_hybrid_search_engine
+from .fusion import FUSION_METHODS, fuse
+from .retrieval_cache import RetrievalCache, retrieval_cache
+
+__all__ = [
+    "RagDoc",
+    "RagHit",
+    "ResidentIndex",
+    "get_resident_index",
+    "Bm25RagEngine",
+    "VectorStore",
+    "get_vector_store",
+    "load_embedding_model",
+    "VectorIndexer",
+    "build_vector_index",
+    "get_default_indexer",
+    "HybridSearcher",
+    "SearchMode",
+    "create_hybrid_search_engine",
+    "FUSION_METHODS",
+    "fuse",
+    "RetrievalCache",
+    "retrieval_cache",
+]
@@ -0,0 +1,374 @@
+"""
+상주 RAG 인덱스 모듈
+
+프로세스마다 BM25 인덱스 하나와 벡터 인덱스 하나를 올려 두고
+RAGService, AdvancedRAGService, 관리자 API가 같은 인덱스를 검색합니다.
+(요청마다 청크를 다시 읽어 인덱스를 만들지 않음)
+
+인덱스는 RAGService 청크 스냅샷에서 만들며, 스냅샷이 교체되면(chunks.jsonl 변경)
+백그라운드에서 새 인덱스를 만든 뒤 교체합니다. 교체 전까지는 이전 인덱스로 검색합니다.
+add_document로 동적 추가한 문서(텍스트를 보관하는 BM25 문서)는 교체 직전에
+새 인덱스로 다시 색인하므로 스냅샷 교체/벡터 재구축 뒤에도 남습니다.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def result_ids(index_id: str, metadata: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    검색 결과 (doc_id, chunk_id)
+
+    인덱스 키는 청크 ID이고, doc_id는 청크가 속한 원본 문서 ID입니다
+    (RAGService 검색 결과와 같은 의미, 동적 추가 문서처럼 없으면 인덱스 키).
+    """
+    return metadata.get('doc_id') or index_id, index_id
+
+
+@dataclass
+class RagDoc:
+    """검색 대상 문서"""
+    doc_id: str
+    text: str
+    title: str = ''
+    source: str = ''
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RagHit:
+    """검색 결과"""
+    doc_id: str
+    chunk_id: str
+    title: str
+    text: str
+    score: float
+    source: str = ''
+    bm25_score: float = 0.0
+    vector_score: float = 0.0
+    search_type: str = 'hybrid'  # 'bm25', 'vector', 'hybrid'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'doc_id': self.doc_id,
+            'chunk_id': self.chunk_id,
+            'title': self.title,
+            'text': self.text,
+            'score': self.score,
+            'source': self.source,
+            'bm25_score': self.bm25_score,
+            'vector_score': self.vector_score,
+            'search_type': self.search_type
+        }
+
+
+class ResidentIndex:
+    """프로세스 상주 BM25 + 벡터 인덱스"""
+
+    def __init__(self, rag_service):
+        from ...services.advanced_rag_service import SegmentedBM25Engine, VectorEngine
+
+        self.rag_service = rag_service
+        self.bm25 = SegmentedBM25Engine()
+        self.vectors = VectorEngine()
+        self.source_version: Optional[int] = None  # 인덱스를 만든 청크 스냅샷 버전
+        self.generation = 0  # 인덱스 교체/문서 추가·삭제마다 증가
+        self.loaded_at = 0.0
+        self._load_lock = threading.Lock()
+        self._swap_lock = threading.RLock()  # 동적 문서 추가/삭제와 인덱스 교체 직렬화
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.source_version is not None
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        """검색 결과 캐시 키용 인덱스 버전 (스냅샷 버전, 세대)"""
+        return (self.source_version or 0, self.generation)
+
+    def touch(self) -> None:
+        """문서 추가/삭제로 인덱스 내용이 바뀜"""
+        self.generation += 1
+
+    def _iter_documents(self, snapshot) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        for doc in self.rag_service.iter_documents(snapshot):
+            yield doc['id'], doc['content'], doc['metadata']
+
+    def add_document(self, doc_id: str, text: str, metadata: Dict[str, Any] = None) -> None:
+        """동적 문서 추가 (BM25/벡터 인덱스, 같은 ID는 교체)"""
+        with self._swap_lock:
+            self.bm25.add_document(doc_id, text, metadata)
+            self.vectors.add_document(doc_id, text, metadata)
+
+    def remove_document(self, doc_id: str) -> None:
+        """문서 삭제 (BM25/벡터 인덱스)"""
+        with self._swap_lock:
+            self.bm25.remove_document(doc_id)
+            self.vectors.remove_document(doc_id)
+
+    def dynamic_documents(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """동적 추가 문서 (doc_id, 텍스트, 메타데이터)"""
+        bm25 = self.bm25
+        with bm25._lock:
+            return [
+                (doc_id, info['text'], dict(info.get('metadata') or {}))
+                for doc_id, info in bm25.docs.items() if info.get('text') is not None
+            ]
+
+    def _swap(self, bm25=None, vectors=None) -> int:
+        """
+        동적 추가 문서를 새 인덱스에 다시 색인한 뒤 교체 (_swap_lock 안에서 호출)
+
+        Returns:
+            int: 다시 색인한 동적 문서 수
+        """
+        dynamic = self.dynamic_documents()
+        if dynamic:
+            if bm25 is not None:
+                bm25.add_documents(dynamic)
+            if vectors is not None:
+                vectors.add_documents(dynamic)
+            logger.info(f"동적 추가 문서 {len(dynamic)}개를 새 인덱스에 다시 색인")
+        if bm25 is not None:
+            self.bm25 = bm25
+        if vectors is not None:
+            self.vectors = vectors
+        return len(dynamic)
+
+    def ensure_loaded(self) -> 'ResidentIndex':
+        """
+        최초 1회 인덱스 로드 (동시에 호출되어도 한 번만 구축)
+
+        이후 호출에서는 청크 스냅샷이 바뀌었는지 확인해 백그라운드 교체를 시작합니다.
+        """
+        if self.source_version is None:
+            with self._load_lock:
+                if self.source_version is None:
+                    self._load()
+            return self
+        self.ensure_current()
+        return self
+
+    def _load(self) -> None:
+        from .vector_store import load_embedding_model
+
+        started = time.time()
+        # 버전과 원본 해시, 색인할 청크를 모두 같은 스냅샷에서 읽음 (도중 교체돼도 섞이지 않게)
+        snapshot = self.rag_service.snapshot
+        version = snapshot.version
+        try:
+            model, model_name = load_embedding_model()
+            logger.info(f"벡터 엔진 초기화 완료: {model_name}")
+        except ImportError:
+            logger.warning("sentence-transformers가 설치되지 않음. 벡터 검색 비활성화")
+            model, model_name = None, ''
+        except Exception as e:
+            logger.warning(f"임베딩 모델 로드 실패. 벡터 검색 비활성화: {e}")
+            model, model_name = None, ''
+
+        self.bm25 = self._build_bm25(snapshot)
+        self.vectors = self._build_vectors(snapshot, model, model_name)
+        self.source_version = version
+        self.generation += 1
+        self.loaded_at = time.time()
+        logger.info(f"상주 인덱스 로드 완료 (스냅샷 버전 {version}, {time.time() - started:.1f}초)")
+
+    def _build_bm25(self, snapshot):
+        """
+        BM25 인덱스 구축
+
+        persist 디렉토리의 BM25 스냅샷이 청크 스냅샷의 chunks.jsonl 해시와 맞으면 그대로 읽고,
+        없거나 다르면 청크를 토큰화해 재구축한 뒤 스냅샷을 저장합니다.
+        """
+        from ...services.advanced_rag_service import SegmentedBM25Engine
+
+        source_hash = snapshot.source_hash
+        engine = SegmentedBM25Engine()
+        snapshot_path = self.rag_service.persist_dir / 'bm25_index.npz'
+        try:
+            frozen = None
+            try:
+                from ...services.bm25_index import FrozenBM25Index
+                frozen = FrozenBM25Index.load(
+                    snapshot_path, engine._tokenize, source_hash, k1=engine.k1, b=engine.b
+                )
+            except ImportError:
+                pass
+
+            if frozen is not None:
+                engine.load_frozen(frozen)
+                logger.info(f"BM25 스냅샷 로드 완료: {frozen.N}개 문서 ({snapshot_path})")
+                return engine
+
+            # RAG 서비스 청크를 BM25 엔진에 일괄 추가 (텍스트는 청크 저장소에서 조회)
+            count = engine.add_documents(
+                ((doc_id, text, None) for doc_id, text, _ in self._iter_documents(snapshot)),
+                keep_text=False
+            )
+            # CSR 인덱스로 고정 후 스냅샷 저장
+            frozen = engine.freeze()
+            if frozen is not None and count > 0:
+                try:
+                    frozen.save(snapshot_path, source_hash)
+                    logger.info(f"BM25 스냅샷 저장 완료: {snapshot_path}")
+                except OSError as e:
+                    logger.warning(f"BM25 스냅샷 저장 실패: {e}")
+            logger.info(f"BM25 인덱스 구축 완료: {count}개 문서")
+        except Exception as e:
+            logger.error(f"BM25 인덱스 구축 실패: {e}")
+        return engine
+
+    def _new_vector_engine(self, model, model_name: str, shared_dir: Optional[Path] = None):
+        from ...services.advanced_rag_service import VectorEngine
+
+        engine = VectorEngine(model, model_name)
+        if model is not None:
+            from ...services.embedding_cache import EmbeddingCache
+            persist_dir = self.rag_service.persist_dir
+            engine.cache = EmbeddingCache(persist_dir, model_name)
+            engine.ann_path = persist_dir / 'vector_ivf.npz'
+            engine.shared_dir = Path(shared_dir) if shared_dir else persist_dir / 'vectors'
+        return engine
+
+    def _build_vectors(self, snapshot, model, model_name: str, shared_dir: Optional[Path] = None):
+        """벡터 인덱스 구축 (다른 워커가 기록한 공유 행렬이 있으면 매핑만, 없으면 인코딩 후 기록)"""
+        engine = self._new_vector_engine(model, model_name, shared_dir)
+        if model is None:
+            return engine
+        source_hash = snapshot.source_hash
+        engine.ann_source_hash = source_hash
+        try:
+            if engine.open_shared(source_hash):
+                engine.index_sources(self._iter_documents(snapshot))
+            else:
+                engine.add_documents(self._iter_documents(snapshot))
+                engine.publish_shared(source_hash)
+        except Exception as e:
+            logger.error(f"벡터 인덱스 구축 실패: {e}")
+        return engine
+
+    def rebuild_vectors(self, model=None, model_name: str = '', shared_dir: Optional[Path] = None) -> int:
+        """
+        벡터 인덱스 재구축 후 교체 (구축 중에는 기존 인덱스로 검색)
+
+        Args:
+            model: 새 임베딩 모델 (없으면 현재 모델 유지)
+            model_name: 새 모델 이름
+            shared_dir: 공유 행렬 디렉토리 (없으면 현재 설정 유지)
+
+        Returns:
+            int: 색인된 문서 수
+        """
+        self.ensure_loaded()
+        current = self.vectors
+        if model is None:
+            model, model_name = current.embedding_model, current.model_name
+        if model is None:
+            return 0
+        snapshot = self.rag_service.snapshot
+        source_hash = snapshot.source_hash
+        engine = self._new_vector_engine(model, model_name, shared_dir or current.shared_dir)
+        engine.ann_source_hash = source_hash
+        count = engine.rebuild(self._iter_documents(snapshot))
+        engine.publish_shared(source_hash)
+        with self._swap_lock:
+            count += self._swap(vectors=engine)
+            self.touch()
+        return count
+
+    def ensure_current(self) -> bool:
+        """
+        청크 스냅샷이 바뀌었으면 백그라운드 재구축 시작
+
+        Returns:
+            bool: 재구축을 시작했는지 여부
+        """
+        if self.source_version is None or self.rag_service.index_version == self.source_version:
+            return False
+        with self._load_lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return False
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_worker, name="rag-resident-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+        return True
+
+    def _refresh_worker(self) -> None:
+        """새 스냅샷으로 BM25/벡터 인덱스를 만든 뒤 교체 (임베딩 모델은 유지)"""
+        try:
+            snapshot = self.rag_service.snapshot
+            version = snapshot.version
+            current = self.vectors
+            bm25 = self._build_bm25(snapshot)
+            vectors = self._build_vectors(
+                snapshot, current.embedding_model, current.model_name, current.shared_dir
+            )
+            with self._swap_lock:
+                self._swap(bm25, vectors)
+                self.source_version = version
+                self.generation += 1
+            self.loaded_at = time.time()
+            logger.info(f"상주 인덱스 교체 완료 (스냅샷 버전 {version})")
+        except Exception as e:
+            logger.error(f"상주 인덱스 교체 실패: {e}")
+
+    def document(self, doc_id: str) -> Tuple[str, Dict[str, Any]]:
+        """문서 텍스트/메타데이터 조회 (동적 추가 문서 또는 RAG 청크 저장소)"""
+        doc_info = self.bm25.docs.get(doc_id) or {}
+        if doc_info.get('text') is not None:
+            return doc_info['text'], dict(doc_info.get('metadata') or {})
+
+        chunk = self.rag_service.get_chunk(doc_id)
+        if chunk is None:
+            return '', {}
+        text = chunk.pop('text', '')
+        return text, chunk
+
+    def hit(self, doc_id: str, score: float, bm25_score: float = 0.0,
+            vector_score: float = 0.0, search_type: str = 'hybrid') -> RagHit:
+        """검색 결과 객체 생성 (문서 정보 채움)"""
+        text, metadata = self.document(doc_id)
+        source_doc_id, chunk_id = result_ids(doc_id, metadata)
+        return RagHit(
+            doc_id=source_doc_id,
+            chunk_id=chunk_id,
+            title=metadata.get('title', ''),
+            text=text,
+            score=score,
+            source=metadata.get('source', ''),
+            bm25_score=bm25_score,
+            vector_score=vector_score,
+            search_type=search_type
+        )
+
+
+# 프로세스 상주 인스턴스 (기본 RAGService 기준)
+_resident_index: Optional[ResidentIndex] = None
+_resident_lock = threading.Lock()
+
+
+def get_resident_index(rag_service=None) -> ResidentIndex:
+    """
+    상주 인덱스 반환 (로드는 ensure_loaded에서)
+
+    기본 RAGService가 아닌 서비스를 넘기면 해당 서비스 전용 인덱스를 새로 만듭니다.
+    """
+    global _resident_index
+    from ...services.rag_service import rag_service as default_rag_service
+
+    if rag_service is not None and rag_service is not default_rag_service:
+        return ResidentIndex(rag_service)
+    if _resident_index is None:
+        with _resident_lock:
+            if _resident_index is None:
+                _resident_index = ResidentIndex(default_rag_service)
+    return _resident_index
@@ -0,0 +1,76 @@
+"""
+BM25 검색 엔진 모듈
+
+기본은 상주 BM25 인덱스(ResidentIndex.bm25)를 검색합니다.
+index()로 문서를 넘기면 그 문서 집합만 담은 별도 인덱스를 만들어 검색합니다.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .engine import RagDoc, RagHit, ResidentIndex, get_resident_index
+
+
+class Bm25RagEngine:
+    """BM25 검색 어댑터"""
+
+    def __init__(self, index: Optional[ResidentIndex] = None):
+        self.resident = index or get_resident_index()
+        self._private = None  # index()로 만든 별도 SegmentedBM25Engine
+
+    @property
+    def engine(self):
+        """현재 SegmentedBM25Engine"""
+        if self._private is not None:
+            return self._private
+        return self.resident.ensure_loaded().bm25
+
+    def index(self, docs: Iterable[RagDoc]) -> int:
+        """
+        별도 문서 집합으로 인덱스 구축 (이후 검색은 이 문서들만 대상)
+
+        Returns:
+            int: 색인된 문서 수
+        """
+        from ...services.advanced_rag_service import SegmentedBM25Engine
+
+        engine = SegmentedBM25Engine()
+        count = engine.add_documents(
+            (doc.doc_id, doc.text, {'title': doc.title, 'source': doc.source, **doc.metadata})
+            for doc in docs
+        )
+        engine.flush()
+        self._private = engine
+        return count
+
+    def count(self) -> int:
+        return self.engine.N
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """(doc_id, BM25 점수) 리스트"""
+        return self.engine.search(query, top_k)
+
+    def document(self, doc_id: str) -> Tuple[str, Dict[str, Any]]:
+        """문서 텍스트/메타데이터"""
+        if self._private is None:
+            return self.resident.document(doc_id)
+        doc_info = self._private.docs.get(doc_id) or {}
+        return doc_info.get('text') or '', dict(doc_info.get('metadata') or {})
+
+    def hit(self, doc_id: str, score: float, bm25_score: float = 0.0,
+            vector_score: float = 0.0, search_type: str = 'bm25') -> RagHit:
+        """검색 결과 객체 생성"""
+        if self._private is None:
+            return self.resident.hit(doc_id, score, bm25_score, vector_score, search_type)
+        text, metadata = self.document(doc_id)
+        return RagHit(
+            doc_id=doc_id,
+            chunk_id=doc_id,
+            title=metadata.get('title', ''),
+            text=text,
+            score=score,
+            source=metadata.get('source', ''),
+            bm25_score=bm25_score,
+            vector_score=vector_score,
+            search_type=search_type
+        )
@@ -0,0 +1,94 @@
+"""
+검색 결과 융합 모듈
+
+BM25 점수(상한 없음)와 코사인 유사도(-1~1)는 척도가 달라 그대로 가중합하면
+alpha가 의미를 잃습니다. 두 후보 목록만 대상으로 척도를 맞춘 뒤 합칩니다.
+
+- minmax: 목록별 (s - min) / (max - min), 목록에 없는 문서는 0
+- zscore: 목록별 (s - 평균) / 표준편차, 목록에 없는 문서는 그 목록의 최저 z
+- rrf: 순위 기반 (k + 1) / (k + 순위) (Reciprocal Rank Fusion, 점수 척도 무시)
+모두 alpha는 BM25 쪽 가중치입니다 (0.0 = 벡터만, 1.0 = BM25만).
+
+RRF는 가능한 최대 점수 1 / (k + 1)로 나눠 두 목록 1위 문서가 1.0이 되게 합니다.
+그러지 않으면 점수가 0.016 이하라 리랭킹 증거 점수(0.05~0.3)가 순위를 정해 버립니다.
+"""
+from __future__ import annotations
+
+import math
+import os
+from typing import Dict, List, Sequence, Tuple
+
+FUSION_METHODS = ('minmax', 'zscore', 'rrf')
+DEFAULT_FUSION = os.getenv('RAG_FUSION', 'minmax')
+# RRF 순위 완화 상수
+RRF_K = int(os.getenv('RAG_RRF_K', '60'))
+
+Ranked = Sequence[Tuple[str, float]]
+
+
+def _minmax(results: Ranked) -> Tuple[Dict[str, float], float]:
+    if not results:
+        return {}, 0.0
+    scores = [score for _, score in results]
+    low, high = min(scores), max(scores)
+    if high - low <= 1e-12:
+        return {doc_id: 1.0 for doc_id, _ in results}, 0.0
+    span = high - low
+    return {doc_id: (score - low) / span for doc_id, score in results}, 0.0
+
+
+def _zscore(results: Ranked) -> Tuple[Dict[str, float], float]:
+    if not results:
+        return {}, 0.0
+    scores = [score for _, score in results]
+    mean = sum(scores) / len(scores)
+    std = math.sqrt(sum((score - mean) ** 2 for score in scores) / len(scores))
+    if std <= 1e-12:
+        return {doc_id: 0.0 for doc_id, _ in results}, 0.0
+    normalized = {doc_id: (score - mean) / std for doc_id, score in results}
+    return normalized, min(normalized.values())
+
+
+def _rrf(results: Ranked, k: int) -> Tuple[Dict[str, float], float]:
+    return {doc_id: (k + 1.0) / (k + rank) for rank, (doc_id, _) in enumerate(results, 1)}, 0.0
+
+
+def fuse(
+    bm25_results: Ranked,
+    vector_results: Ranked,
+    alpha: float = 0.5,
+    method: str = None,
+    rrf_k: int = None
+) -> List[Tuple[str, float]]:
+    """
+    두 후보 목록 융합
+
+    Args:
+        bm25_results: (doc_id, BM25 점수) 점수 내림차순
+        vector_results: (doc_id, 코사인 유사도) 점수 내림차순
+        alpha: BM25 가중치
+        method: minmax / zscore / rrf (기본: RAG_FUSION)
+
+    Returns:
+        List[Tuple[str, float]]: (doc_id, 융합 점수) 점수 내림차순 (동점은 doc_id 순)
+    """
+    method = (method or DEFAULT_FUSION).lower()
+    if method == 'minmax':
+        bm25, bm25_missing = _minmax(bm25_results)
+        vector, vector_missing = _minmax(vector_results)
+    elif method == 'zscore':
+        bm25, bm25_missing = _zscore(bm25_results)
+        vector, vector_missing = _zscore(vector_results)
+    elif method == 'rrf':
+        k = RRF_K if rrf_k is None else rrf_k
+        bm25, bm25_missing = _rrf(bm25_results, k)
+        vector, vector_missing = _rrf(vector_results, k)
+    else:
+        raise ValueError(f"지원하지 않는 융합 방식: {method} (가능: {', '.join(FUSION_METHODS)})")
+
+    fused = [
+        (doc_id, alpha * bm25.get(doc_id, bm25_missing) + (1 - alpha) * vector.get(doc_id, vector_missing))
+        for doc_id in bm25.keys() | vector.keys()
+    ]
+    fused.sort(key=lambda x: (-x[1], x[0]))
+    return fused
@@ -0,0 +1,147 @@
+"""
+하이브리드 검색 모듈
+
+상주 BM25 인덱스와 벡터 인덱스 결과를 합쳐 RagHit 리스트로 반환합니다.
+RAGService(use_hybrid=True)와 관리자 검색 테스트가 사용합니다.
+
+두 검색은 공유 스레드 풀에서 동시에 실행되므로 지연은 합이 아니라 느린 쪽이 정하고,
+점수는 두 후보 목록만 대상으로 융합합니다 (fusion 모듈).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from .engine import RagHit
+from .engine_bm25 import Bm25RagEngine
+from .fusion import DEFAULT_FUSION, FUSION_METHODS, fuse
+from .vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+# 검색 스레드 풀 크기
+SEARCH_WORKERS = int(os.getenv('RAG_SEARCH_WORKERS', '8'))
+# 융합 후보 수 = top_k × 배수 (각 검색기에서 가져오는 수)
+CANDIDATE_FACTOR = float(os.getenv('RAG_FUSION_CANDIDATE_FACTOR', '1.0'))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+Ranked = List[Tuple[str, float]]
+
+
+def get_search_executor() -> ThreadPoolExecutor:
+    """BM25/벡터 검색 공유 스레드 풀"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="rag-search")
+    return _executor
+
+
+def candidate_depth(top_k: int) -> int:
+    """검색기별로 가져올 후보 수"""
+    return max(top_k, int(top_k * CANDIDATE_FACTOR))
+
+
+def retrieve_both(
+    bm25_search: Callable[[str, int], Ranked],
+    vector_search: Callable[[str, int], Ranked],
+    query: str,
+    depth: int
+) -> Tuple[Ranked, Ranked]:
+    """벡터 검색은 스레드 풀에서, BM25 검색은 호출 스레드에서 동시에 실행"""
+    future = get_search_executor().submit(vector_search, query, depth)
+    try:
+        bm25_results = bm25_search(query, depth)
+    finally:
+        vector_results = future.result()
+    return bm25_results, vector_results
+
+
+class SearchMode(str, Enum):
+    """검색 모드"""
+    BM25 = 'bm25'
+    VECTOR = 'vector'
+    HYBRID = 'hybrid'
+
+
+class HybridSearcher:
+    """BM25 + 벡터 하이브리드 검색기"""
+
+    def __init__(
+        self,
+        bm25_engine: Optional[Bm25RagEngine] = None,
+        vector_store: Optional[VectorStore] = None,
+        mode: Union[SearchMode, str] = SearchMode.HYBRID,
+        alpha: float = 0.5,
+        fusion: str = None
+    ):
+        self.bm25 = bm25_engine or Bm25RagEngine()
+        self.vector_store = vector_store
+        self.mode = SearchMode(mode)
+        self.alpha = alpha  # BM25 가중치 (0.0 = 벡터만, 1.0 = BM25만)
+        self.fusion = (fusion or DEFAULT_FUSION).lower()  # minmax / zscore / rrf
+        if self.fusion not in FUSION_METHODS:
+            raise ValueError(f"지원하지 않는 융합 방식: {self.fusion}")
+
+    @property
+    def effective_mode(self) -> SearchMode:
+        """벡터 저장소가 없거나 임베딩 모델이 없으면 BM25로 검색"""
+        if self.vector_store is None or not self.vector_store.available:
+            return SearchMode.BM25
+        return self.mode
+
+    def search(self, query: str, top_k: int = 5) -> List[RagHit]:
+        """
+        검색
+
+        Returns:
+            List[RagHit]: 점수 내림차순 결과 (최대 top_k개)
+        """
+        mode = self.effective_mode
+        if mode == SearchMode.BM25:
+            return [
+                self.bm25.hit(doc_id, score, bm25_score=score, search_type='bm25')
+                for doc_id, score in self.bm25.search(query, top_k)
+            ]
+        if mode == SearchMode.VECTOR:
+            return [
+                self.bm25.hit(doc_id, score, vector_score=score, search_type='vector')
+                for doc_id, score in self.vector_store.search(query, top_k)
+            ]
+
+        bm25_results, vector_results = retrieve_both(
+            self.bm25.search, self.vector_store.search, query, candidate_depth(top_k)
+        )
+        bm25_scores: Dict[str, float] = dict(bm25_results)
+        vector_scores: Dict[str, float] = dict(vector_results)
+        fused = fuse(bm25_results, vector_results, self.alpha, self.fusion)
+        return [
+            self.bm25.hit(
+                doc_id, score,
+                bm25_score=bm25_scores.get(doc_id, 0.0),
+                vector_score=vector_scores.get(doc_id, 0.0),
+                search_type='hybrid'
+            )
+            for doc_id, score in fused[:top_k]
+        ]
+
+
+def create_hybrid_search_engine(
+    bm25_engine: Optional[Bm25RagEngine] = None,
+    vector_store: Optional[VectorStore] = None,
+    alpha: float = 0.5,
+    mode: Union[SearchMode, str] = SearchMode.HYBRID,
+    fusion: str = None
+) -> HybridSearcher:
+    """상주 인덱스 기반 하이브리드 검색기 생성 (인자를 생략하면 상주 BM25/벡터 인덱스 사용)"""
+    searcher = HybridSearcher(bm25_engine, vector_store or VectorStore(), mode=mode, alpha=alpha, fusion=fusion)
+    if searcher.effective_mode != searcher.mode:
+        logger.info("벡터 저장소 없음, BM25로만 검색 (벡터 인덱스가 구축되면 자동 전환)")
+    return searcher
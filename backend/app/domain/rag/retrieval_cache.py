@@ -0,0 +1,133 @@
+"""
+검색 결과 캐시 모듈
+
+RAGService.search와 AdvancedRAGService.hybrid_search가 함께 쓰는 LRU + TTL 캐시입니다.
+키는 (이름공간, 정규화한 쿼리, 검색 모드/top_k/융합 파라미터, 인덱스 버전)입니다.
+
+인덱스가 바뀌면 버전만 올리면 됩니다. 이전 버전 키는 더 이상 적중하지 않고,
+같은 이름공간에 더 새로운 버전 결과가 처음 저장될 때 이전 버전 항목을 한 번에 정리합니다.
+교체 전에 시작한 느린 요청이 나중에 이전 버전 결과를 저장하면 버려집니다
+(이름공간 버전은 커지기만 함). 버전 체계가 다른 검색 경로(상주 인덱스 / 청크 스냅샷)는
+이름공간을 따로 써야 합니다.
+
+결과 목록은 튜플로 보관하고 조회 때마다 새 리스트로 돌려주므로, 호출자가 목록을
+바꿔도 캐시는 그대로입니다. 목록 안의 결과 객체는 공유되므로 읽기 전용으로 다룹니다.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 쿼리 정규화 (NFC, 공백 정리)"""
+    return " ".join(unicodedata.normalize("NFC", query or "").split())
+
+
+class RetrievalCache:
+    """버전 키 LRU + TTL 검색 결과 캐시"""
+
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        self.max_entries = int(max_entries if max_entries is not None
+                               else os.getenv('RAG_RESULT_CACHE_SIZE', '2048'))
+        self.ttl = float(ttl if ttl is not None else os.getenv('RAG_RESULT_CACHE_TTL', '3600'))
+        self._entries: OrderedDict = OrderedDict()  # 키 -> (만료 시각, 결과)
+        self._versions: Dict[str, Hashable] = {}  # 이름공간 -> 최신 인덱스 버전 (증가만 함)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # 용량 초과로 밀려난 항목
+        self.expirations = 0  # TTL 만료 항목
+        self.invalidations = 0  # 인덱스 버전이 바뀌어 정리된 항목
+        self.stale_puts = 0  # 최신보다 이전 버전이라 저장하지 않은 결과
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(namespace: str, query: str, version: Hashable, **params: Any) -> Tuple:
+        """캐시 키 (파라미터는 이름순으로 고정)"""
+        return (namespace, version, normalize_query(query), tuple(sorted(params.items())))
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """캐시 조회 (없거나 만료되면 None, 결과 목록은 새 리스트로 반환)"""
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    value = entry[1]
+                    return list(value) if isinstance(value, tuple) else value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    @staticmethod
+    def _is_newer(version: Hashable, current: Hashable) -> bool:
+        """version이 current보다 새 버전인지 (비교할 수 없는 형식이면 새 버전으로 취급)"""
+        try:
+            return version > current
+        except TypeError:
+            return True
+
+    def put(self, key: Tuple, value: Any) -> None:
+        """
+        캐시 저장
+
+        이름공간의 최신 버전보다 새 버전이면 이전 버전 항목을 정리하고 최신 버전을 올리며,
+        이전 버전이면 저장하지 않습니다.
+        """
+        if self.max_entries <= 0:
+            return
+        namespace, version = key[0], key[1]
+        if isinstance(value, list):
+            value = tuple(value)
+        with self._lock:
+            current = self._versions.get(namespace, version)
+            if current != version:
+                if not self._is_newer(version, current):
+                    self.stale_puts += 1
+                    return
+                stale = [k for k in self._entries if k[0] == namespace and k[1] != version]
+                for k in stale:
+                    del self._entries[k]
+                self.invalidations += len(stale)
+            self._versions[namespace] = version
+
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'capacity': self.max_entries,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+            'stale_puts': self.stale_puts,
+        }
+
+
+# 프로세스 공유 인스턴스
+retrieval_cache = RetrievalCache()
@@ -0,0 +1,126 @@
+"""
+벡터 인덱서 모듈
+
+상주 벡터 인덱스의 상태 조회와 재구축(관리자 API)을 담당합니다.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .engine import ResidentIndex, get_resident_index
+from .vector_store import VectorStore, load_embedding_model
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndexer:
+    """상주 벡터 인덱스 관리"""
+
+    def __init__(self, index: Optional[ResidentIndex] = None):
+        self.resident = index or get_resident_index()
+
+    @property
+    def store(self) -> VectorStore:
+        return VectorStore(self.resident)
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        """벡터 인덱스 상태"""
+        engine = self.resident.ensure_loaded().vectors
+        index = engine.index
+        count = len(engine)
+        return {
+            'exists': count > 0,
+            'vector_count': count,
+            'embedding_provider': _provider_of(engine.model_name) if engine.embedding_model else None,
+            'embedding_model': engine.model_name or None,
+            'dimension': index.dim if index is not None else 0,
+            'storage': engine.STORAGE,
+            'ivf_lists': engine.ann_lists,
+            'shared_dir': str(engine.shared_dir) if engine.shared_dir else None,
+            'last_build': engine.last_build,
+        }
+
+    def build(self, provider: Optional[str] = None, model: Optional[str] = None,
+              vector_db_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        벡터 인덱스 재구축 (제공자/모델을 지정하면 해당 모델로 교체)
+
+        Returns:
+            Dict[str, Any]: indexed_count, dimension, provider, model, elapsed_ms
+        """
+        started = time.time()
+        embedding_model, model_name = None, ''
+        if provider or model:
+            embedding_model, model_name = load_embedding_model(provider, model)
+        count = self.resident.rebuild_vectors(
+            embedding_model, model_name, Path(vector_db_path) if vector_db_path else None
+        )
+        stats = self.get_index_stats()
+        return {
+            'success': count > 0,
+            'indexed_count': count,
+            'dimension': stats['dimension'],
+            'provider': stats['embedding_provider'] or '',
+            'model': stats['embedding_model'] or '',
+            'elapsed_ms': int((time.time() - started) * 1000),
+        }
+
+
+def _provider_of(model_name: str) -> str:
+    from ...services.hashing_embedder import HashingEmbedder
+    return 'hashing' if model_name.startswith(HashingEmbedder.NAME_PREFIX) else 'sentence-transformers'
+
+
+def get_default_indexer() -> VectorIndexer:
+    """상주 인덱스의 벡터 인덱서"""
+    return VectorIndexer()
+
+
+def build_vector_index(
+    chunks_file: Optional[str] = None,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+    vector_db_path: Optional[str] = None,
+    force_rebuild: bool = True,
+) -> Dict[str, Any]:
+    """
+    상주 벡터 인덱스 구축 (관리자 API용, 실패해도 예외 대신 결과 딕셔너리)
+
+    Args:
+        chunks_file: 색인할 chunks.jsonl (상주 인덱스의 원본과 같아야 함)
+        provider: 임베딩 제공자 (sentence-transformer / hashing / auto)
+        model: sentence-transformers 모델 이름
+        vector_db_path: 공유 행렬 디렉토리
+        force_rebuild: False면 이미 벡터가 있을 때 재구축하지 않음
+
+    Returns:
+        Dict[str, Any]: success, indexed_count, dimension, provider, model (실패 시 error)
+    """
+    indexer = get_default_indexer()
+    try:
+        if chunks_file is not None:
+            source = indexer.resident.rag_service.persist_dir / 'chunks.jsonl'
+            if Path(chunks_file).resolve() != source.resolve():
+                raise ValueError(f"상주 인덱스의 원본과 다른 chunks.jsonl입니다: {chunks_file} (원본: {source})")
+
+        if not force_rebuild and not (provider or model):
+            stats = indexer.get_index_stats()
+            if stats['exists']:
+                return {
+                    'success': True,
+                    'indexed_count': stats['vector_count'],
+                    'dimension': stats['dimension'],
+                    'provider': stats['embedding_provider'] or '',
+                    'model': stats['embedding_model'] or '',
+                    'skipped': True,
+                }
+
+        result = indexer.build(provider, model, vector_db_path)
+        logger.info(f"벡터 인덱스 구축 완료: {result['indexed_count']}개 ({result['model']})")
+        return result
+    except Exception as e:
+        logger.error(f"벡터 인덱스 구축 실패: {e}")
+        return {'success': False, 'error': str(e), 'indexed_count': 0, 'provider': provider or ''}
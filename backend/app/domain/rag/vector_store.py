@@ -0,0 +1,122 @@
+"""
+벡터 저장소 모듈
+
+상주 벡터 인덱스(ResidentIndex.vectors) 검색 어댑터와 임베딩 모델 로더를 제공합니다.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .engine import ResidentIndex, get_resident_index
+
+logger = logging.getLogger(__name__)
+
+# sentence-transformers 기본 임베딩 모델
+DEFAULT_EMBEDDING_MODEL = os.getenv('RAG_EMBED_MODEL', 'all-MiniLM-L6-v2')
+
+# 관리자 API 제공자 이름 -> RAG_EMBED_PROVIDER 값
+_PROVIDER_ALIASES = {
+    'auto': 'auto',
+    'sentence-transformer': 'sentence-transformers',
+    'sentence-transformers': 'sentence-transformers',
+    'st': 'sentence-transformers',
+    'hashing': 'hashing',
+    'hash': 'hashing',
+}
+
+
+def _load_sentence_model(model_name: str):
+    """
+    sentence-transformers 모델 준비
+
+    RAG_EMBED_SOCKET이 설정되어 있으면 호스트의 임베딩 서버를 쓰고
+    (서버에 연결할 수 없을 때만 프로세스 안 모델을 로드), 아니면 모델을 직접 로드합니다.
+    """
+    socket_path = os.getenv('RAG_EMBED_SOCKET')
+    if not socket_path:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    from ...services.embedding_server import EmbeddingClient
+
+    def fallback():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    client = EmbeddingClient(socket_path, model_name, fallback=fallback)
+    if client.available():
+        logger.info(f"임베딩 서버 사용: {socket_path}")
+    else:
+        # 서버가 없으면 폴백 모델을 미리 로드 (설치되어 있지 않으면 ImportError)
+        logger.warning(f"임베딩 서버에 연결할 수 없음, 프로세스 안 모델 사용: {socket_path}")
+        client.local_model()
+    return client
+
+
+def load_embedding_model(provider: Optional[str] = None, model_name: Optional[str] = None) -> Tuple[Any, str]:
+    """
+    임베딩 모델 준비
+
+    provider (기본: RAG_EMBED_PROVIDER):
+    - auto (기본): sentence-transformers 모델, 설치되어 있지 않거나 가중치를 받을 수 없으면 내장 해시 임베딩
+    - sentence-transformers: sentence-transformers 모델만 (실패하면 예외)
+    - hashing: 내장 해시 임베딩 (다운로드 없음)
+
+    Returns:
+        Tuple[Any, str]: (encode 인터페이스 모델, 캐시/공유 행렬 구분용 모델 이름)
+    """
+    requested = (provider or os.getenv('RAG_EMBED_PROVIDER', 'auto')).strip().lower()
+    provider = _PROVIDER_ALIASES.get(requested)
+    if provider is None:
+        raise ValueError(f"지원하지 않는 임베딩 제공자: {requested}")
+
+    if provider != 'hashing':
+        model_name = model_name or DEFAULT_EMBEDDING_MODEL
+        try:
+            return _load_sentence_model(model_name), model_name
+        except Exception as e:
+            if provider != 'auto':
+                raise
+            logger.warning(f"sentence-transformers 모델을 사용할 수 없어 내장 해시 임베딩 사용: {e}")
+
+    from ...services.hashing_embedder import HashingEmbedder
+    embedder = HashingEmbedder()
+    return embedder, embedder.model_name
+
+
+class VectorStore:
+    """상주 벡터 인덱스 검색 어댑터"""
+
+    def __init__(self, index: Optional[ResidentIndex] = None):
+        self.resident = index or get_resident_index()
+
+    @property
+    def engine(self):
+        """현재 VectorEngine (재구축되면 새 엔진)"""
+        return self.resident.ensure_loaded().vectors
+
+    @property
+    def available(self) -> bool:
+        return self.engine.embedding_model is not None
+
+    @property
+    def model_name(self) -> str:
+        return self.engine.model_name
+
+    def count(self) -> int:
+        return len(self.engine)
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """(doc_id, 코사인 유사도) 리스트"""
+        return self.engine.search(query, top_k)
+
+    def search_many(self, queries: Sequence[str], top_k: int = 10) -> List[List[Tuple[str, float]]]:
+        return self.engine.search_many(queries, top_k)
+
+
+def get_vector_store() -> Optional[VectorStore]:
+    """상주 벡터 저장소 (임베딩 모델이 없으면 None)"""
+    store = VectorStore()
+    return store if store.available else None
@@ -4,11 +4,15 @@
 """
 
 from __future__ import annotations
-from typing import List, Dict, Any, Optional, Tuple, Union
+from typing import List, Dict, Any, Optional, Tuple, Union, Iterable
 from dataclasses import dataclass
+from collections import Counter, OrderedDict
+import os
 import math
+import time
 import asyncio
 import logging
+import threading
 from pathlib import Path
 
 from .rag_service import RAGService
@@ -45,337 +49,1258 @@ class RerankResult:
 class BM25Engine:
     """BM25 검색 엔진"""
     
+    # 지연 삭제(tombstone)를 실제 포스팅에 병합하는 기준
+    TOMBSTONE_MERGE_MIN = 32
+    TOMBSTONE_MERGE_RATIO = 0.1
+    
     def __init__(self, k1: float = 1.5, b: float = 0.75):
         self.k1 = k1
         self.b = b
+        self._reset()
+    
+    def _reset(self):
+        """색인 상태 초기화"""
         self.N = 0  # 총 문서 수
         self.avg_len = 0.0  # 평균 문서 길이
+        self.total_len = 0  # 전체 문서 길이 합 (평균 길이 증분 계산용)
         self.doc_len = {}  # 문서별 길이
-        self.postings = {}  # 토큰별 포스팅 리스트
-        self.df = {}  # 토큰별 문서 빈도
+        self.postings: Dict[str, Dict[str, int]] = {}  # 토큰별 포스팅 {doc_id: tf}
+        self.df = {}  # 토큰별 문서 빈도 (삭제 문서 제외)
         self.docs = {}  # 문서 저장소
+        self.forward: Dict[str, Tuple[str, ...]] = {}  # 문서별 고유 토큰 (정방향 색인)
+        self.tombstones = set()  # 삭제됐지만 포스팅에서 아직 제거되지 않은 문서
+        self._frozen = None  # 고정된 CSR 인덱스 (변경 시 무효화)
     
     def _tokenize(self, text: str) -> List[str]:
         """텍스트 토큰화"""
         return [t.lower().strip() for t in text.split() if t.strip()]
     
     def add_document(self, doc_id: str, text: str, metadata: Dict[str, Any] = None):
-        """문서 추가"""
+        """문서 추가 (포스팅/df/평균 길이 증분 갱신)"""
+        self._index(doc_id, text, metadata)
+        self._update_stats()
+    
+    def add_documents(
+        self,
+        documents: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]],
+        keep_text: bool = True
+    ) -> int:
+        """
+        문서 일괄 추가 (한 번의 카운팅 패스, 통계는 마지막에 한 번만 갱신)
+        
+        Args:
+            documents: (doc_id, text, metadata) 이터러블
+            keep_text: 문서 저장소에 텍스트 보관 여부 (False면 외부 저장소에서 조회)
+            
+        Returns:
+            int: 추가된 문서 수
+        """
+        count = 0
+        for doc_id, text, metadata in documents:
+            self._index(doc_id, text, metadata, keep_text)
+            count += 1
+        
+        self._update_stats()
+        return count
+    
+    def remove_document(self, doc_id: str) -> bool:
+        """
+        문서 삭제 (정방향 색인으로 해당 문서의 토큰만 갱신)
+        
+        df/평균 길이는 즉시 반영하고, 포스팅 항목은 tombstone으로 표시했다가
+        일정량이 쌓이면 merge_tombstones()에서 한꺼번에 제거합니다.
+        
+        Returns:
+            bool: 삭제 여부
+        """
+        if doc_id not in self.docs:
+            return False
+        
+        self._frozen = None
+        del self.docs[doc_id]
+        self.total_len -= self.doc_len.pop(doc_id)
+        for token in self.forward[doc_id]:
+            if token in self.df:
+                self.df[token] -= 1
+        self.tombstones.add(doc_id)
+        
+        self._update_stats()
+        if len(self.tombstones) > max(self.TOMBSTONE_MERGE_MIN, self.N * self.TOMBSTONE_MERGE_RATIO):
+            self.merge_tombstones()
+        return True
+    
+    def merge_tombstones(self) -> int:
+        """
+        tombstone 문서를 포스팅에서 실제 제거 (삭제 문서의 토큰 포스팅만 접근)
+        
+        Returns:
+            int: 병합된 문서 수
+        """
+        merged = len(self.tombstones)
+        for doc_id in self.tombstones:
+            self._purge(doc_id)
+        self.tombstones.clear()
+        return merged
+    
+    def _purge(self, doc_id: str):
+        """정방향 색인을 따라 포스팅 항목 제거 (df는 이미 반영됨)"""
+        for token in self.forward.pop(doc_id, ()):
+            bucket = self.postings.get(token)
+            if bucket is None:
+                continue
+            bucket.pop(doc_id, None)
+            if not bucket:
+                del self.postings[token]
+                self.df.pop(token, None)
+    
+    def _index(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]], keep_text: bool = True):
+        """문서 하나의 포스팅/df 기록 (N/평균 길이 갱신은 호출자 책임)"""
+        if doc_id in self.docs:
+            # 기존 문서 교체
+            self.remove_document(doc_id)
+        if doc_id in self.tombstones:
+            self.tombstones.discard(doc_id)
+            self._purge(doc_id)
+        
         tokens = self._tokenize(text)
-        doc_len = len(tokens)
+        self._frozen = None
         
         self.docs[doc_id] = {
-            'text': text,
-            'tokens': tokens,
+            'text': text if keep_text else None,
             'metadata': metadata or {}
         }
-        self.doc_len[doc_id] = doc_len
-        
-        # 포스팅 업데이트
-        for token in set(tokens):
-            if token not in self.postings:
-                self.postings[token] = []
-                self.df[token] = 0
-            
-            # 중복 제거
-            existing = [p for p in self.postings[token] if p.doc_id != doc_id]
-            existing.append(self._InvPost(doc_id, tokens.count(token)))
-            self.postings[token] = existing
-            self.df[token] = len(set(p.doc_id for p in self.postings[token]))
+        self.doc_len[doc_id] = len(tokens)
+        self.total_len += len(tokens)
         
-        self._update_stats()
+        term_counts = Counter(tokens)
+        postings = self.postings
+        df = self.df
+        for token, tf in term_counts.items():
+            bucket = postings.get(token)
+            if bucket is None:
+                postings[token] = bucket = {}
+            bucket[doc_id] = tf
+            df[token] = df.get(token, 0) + 1
+        self.forward[doc_id] = tuple(term_counts)
     
     def _update_stats(self):
         """통계 정보 업데이트"""
         self.N = len(self.docs)
-        if self.N > 0:
-            self.avg_len = sum(self.doc_len.values()) / self.N
+        self.avg_len = self.total_len / self.N if self.N > 0 else 0.0
+    
+    def freeze(self):
+        """
+        현재 색인을 NumPy CSR 인덱스로 고정 (이후 변경 전까지 search가 사용)
+        
+        Returns:
+            FrozenBM25Index 또는 None (NumPy 미설치)
+        """
+        try:
+            from .bm25_index import FrozenBM25Index
+        except ImportError:
+            logger.warning("numpy가 설치되지 않음. BM25 순수 Python 검색 사용")
+            return None
+        
+        self._frozen = FrozenBM25Index.from_engine(self)
+        return self._frozen
+    
+    @property
+    def is_frozen(self) -> bool:
+        return self._frozen is not None
     
     def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
-        """BM25 검색"""
+        """BM25 검색 (고정 인덱스가 있으면 NumPy 벡터화 검색)"""
+        frozen = self._frozen
+        if frozen is not None:
+            return frozen.search(query, top_k)
+        
         query_tokens = self._tokenize(query)
         if not query_tokens:
             return []
         
+        idf = {
+            token: math.log((self.N - self.df[token] + 0.5) / (self.df[token] + 0.5))
+            for token in set(query_tokens) if token in self.postings
+        }
+        scores = self.score_tokens(query_tokens, idf, self.avg_len)
+        
+        # 상위 k개 결과 반환
+        sorted_results = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        return sorted_results[:top_k]
+    
+    def token_view(self, tokens: Iterable[str]) -> 'BM25Engine':
+        """
+        주어진 토큰의 포스팅/df와 해당 문서 길이, 삭제 대기 문서만 복사한 읽기 전용 사본
+        
+        호출자가 잠금 안에서 만들면, 잠금 밖에서 score_tokens로 점수화해도
+        동시 추가/삭제의 영향을 받지 않습니다.
+        """
+        view = BM25Engine(self.k1, self.b)
+        for token in set(tokens):
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            view.postings[token] = dict(postings)
+            view.df[token] = self.df.get(token, 0)
+            for doc_id in postings:
+                if doc_id in self.doc_len:  # 삭제 대기 문서는 길이 없음 (점수화에서 제외)
+                    view.doc_len[doc_id] = self.doc_len[doc_id]
+        view.tombstones = set(self.tombstones)
+        view.N, view.total_len, view.avg_len = self.N, self.total_len, self.avg_len
+        return view
+    
+    def score_tokens(self, query_tokens: List[str], idf: Dict[str, float], avg_len: float) -> Dict[str, float]:
+        """
+        주어진 idf/평균 길이로 문서 점수 계산 (세그먼트 색인의 전체 통계 적용용)
+        
+        Returns:
+            Dict[str, float]: doc_id -> BM25 점수 (삭제 대기 문서 제외)
+        """
         scores = {}
+        tombstones = self.tombstones
         
         for token in query_tokens:
             if token not in self.postings:
                 continue
             
-            idf = math.log((self.N - self.df[token] + 0.5) / (self.df[token] + 0.5))
+            token_idf = idf[token]
             
-            for posting in self.postings[token]:
-                doc_id = posting.doc_id
-                tf = posting.tf
+            for doc_id, tf in self.postings[token].items():
+                if doc_id in tombstones:
+                    continue
                 doc_len = self.doc_len[doc_id]
                 
                 # BM25 점수 계산
-                score = idf * (tf * (self.k1 + 1)) / (
-                    tf + self.k1 * (1 - self.b + self.b * (doc_len / self.avg_len))
+                score = token_idf * (tf * (self.k1 + 1)) / (
+                    tf + self.k1 * (1 - self.b + self.b * (doc_len / avg_len))
                 )
                 
                 scores[doc_id] = scores.get(doc_id, 0) + score
         
-        # 상위 k개 결과 반환
-        sorted_results = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        return sorted_results[:top_k]
+        return scores
+
+
+class SegmentedBM25Engine:
+    """
+    세그먼트(LSM) 방식 BM25 엔진
+    
+    - 새 문서는 변경 가능한 메모리 세그먼트(BM25Engine)에 추가
+    - 메모리 세그먼트가 MEMTABLE_FLUSH_DOCS개에 이르면 불변 CSR 세그먼트로 flush
+    - 삭제는 세그먼트별 tombstone 마스크로 표시하고 병합 시 실제로 제거
+    - 세그먼트 수가 MAX_SEGMENTS를 넘거나 삭제 비율이 SEGMENT_DELETE_RATIO를 넘으면
+      백그라운드 스레드에서 병합
+    
+    점수는 전체 세그먼트 기준 통계(N, 삭제 제외 df, 평균 길이)로 계산하므로
+    세그먼트 구성과 관계없이 단일 색인과 같은 BM25 점수를 냅니다.
+    NumPy가 없으면 메모리 세그먼트만 사용합니다.
+    """
+    
+    MEMTABLE_FLUSH_DOCS = 1000
+    MAX_SEGMENTS = 8
+    SEGMENT_DELETE_RATIO = 0.2
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.memtable = BM25Engine(k1, b)  # 변경 가능한 메모리 세그먼트
+        self.segments: Tuple = ()  # 불변 세그먼트 (오래된 순, 통째로 교체)
+        self.docs = {}  # 텍스트를 보관하는 문서 (동적 추가 문서)
+        self.N = 0  # 총 문서 수 (삭제 제외)
+        self.total_len = 0
+        self.avg_len = 0.0
+        self.merges = 0  # 완료된 병합 횟수
+        self._lock = threading.RLock()  # 세그먼트 목록/메모리 세그먼트 변경
+        self._merge_lock = threading.Lock()  # 병합은 한 번에 하나씩
+        self._merge_thread: Optional[threading.Thread] = None
+    
+    def _tokenize(self, text: str) -> List[str]:
+        return self.memtable._tokenize(text)
+    
+    def add_document(self, doc_id: str, text: str, metadata: Dict[str, Any] = None):
+        """문서 추가 (같은 ID가 있으면 교체)"""
+        self.add_documents([(doc_id, text, metadata)])
+    
+    def add_documents(
+        self,
+        documents: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]],
+        keep_text: bool = True
+    ) -> int:
+        """
+        문서 일괄 추가 (메모리 세그먼트에 색인 후 필요하면 flush)
+        
+        Args:
+            documents: (doc_id, text, metadata) 이터러블
+            keep_text: 텍스트 보관 여부 (False면 외부 저장소에서 조회)
+            
+        Returns:
+            int: 추가된 문서 수
+        """
+        def prepare():
+            for doc_id, text, metadata in documents:
+                self._delete(doc_id)
+                if keep_text:
+                    self.docs[doc_id] = {'text': text, 'metadata': metadata or {}}
+                yield doc_id, text, None
+        
+        with self._lock:
+            count = self.memtable.add_documents(prepare(), keep_text=False)
+            self._update_stats()
+            if self.memtable.N >= self.MEMTABLE_FLUSH_DOCS:
+                self.flush()
+        return count
+    
+    def remove_document(self, doc_id: str) -> bool:
+        """
+        문서 삭제 (세그먼트에는 tombstone 표시)
+        
+        Returns:
+            bool: 삭제 여부
+        """
+        with self._lock:
+            removed = self._delete(doc_id)
+            if removed:
+                self._update_stats()
+                self._schedule_merge()
+        return removed
     
-    @dataclass
-    class _InvPost:
-        doc_id: str
-        tf: int
+    def _delete(self, doc_id: str) -> bool:
+        """메모리 세그먼트 또는 최신 세그먼트부터 찾아 삭제 (통계 갱신은 호출자 책임)"""
+        self.docs.pop(doc_id, None)
+        if self.memtable.remove_document(doc_id):
+            return True
+        for segment in reversed(self.segments):
+            if segment.delete(doc_id):
+                return True
+        return False
+    
+    def _update_stats(self):
+        """전체 통계 갱신 (삭제 문서 제외)"""
+        segments = self.segments
+        self.N = self.memtable.N + sum(seg.live_count for seg in segments)
+        self.total_len = self.memtable.total_len + sum(seg.live_len for seg in segments)
+        self.avg_len = self.total_len / self.N if self.N > 0 else 0.0
+    
+    def flush(self) -> bool:
+        """
+        메모리 세그먼트를 불변 세그먼트로 변환
+        
+        Returns:
+            bool: flush 여부 (NumPy 미설치 또는 빈 메모리 세그먼트면 False)
+        """
+        try:
+            from .bm25_index import BM25Segment, FrozenBM25Index
+        except ImportError:
+            return False
+        
+        with self._lock:
+            if self.memtable.N == 0:
+                return False
+            segment = BM25Segment(FrozenBM25Index.from_engine(self.memtable))
+            self.segments = self.segments + (segment,)
+            self.memtable = BM25Engine(self.k1, self.b)
+            self._schedule_merge()
+        return True
+    
+    def _pick_merge(self, full: bool = False) -> List:
+        """병합 대상 세그먼트 (세그먼트 목록 순서 유지)"""
+        segments = self.segments
+        if full:
+            if len(segments) > 1 or any(seg.deleted_count for seg in segments):
+                return list(segments)
+            return []
+        
+        picked = [
+            seg for seg in segments
+            if seg.deleted_count > seg.index.N * self.SEGMENT_DELETE_RATIO
+        ]
+        if len(segments) > self.MAX_SEGMENTS:
+            # 작은 세그먼트부터 묶어 세그먼트 수를 한도 안으로
+            smallest = sorted(segments, key=lambda seg: seg.live_count)
+            for seg in smallest[:len(segments) - self.MAX_SEGMENTS + 1]:
+                if not any(seg is p for p in picked):
+                    picked.append(seg)
+        return [seg for seg in segments if any(seg is p for p in picked)]
+    
+    def merge(self, full: bool = False) -> Dict[str, int]:
+        """
+        세그먼트 병합 (삭제 문서 제거, 토큰화 없음)
+        
+        병합하는 동안에도 검색/추가/삭제가 가능하며, 그 사이 삭제된 문서는
+        병합 결과에 다시 반영합니다.
+        
+        Args:
+            full: 모든 세그먼트를 하나로 병합
+            
+        Returns:
+            Dict[str, int]: 병합한 세그먼트 수, 정리한 삭제 문서 수
+        """
+        try:
+            from .bm25_index import BM25Segment, FrozenBM25Index
+        except ImportError:
+            return {'merged_segments': 0, 'purged_documents': 0}
+        
+        with self._merge_lock:
+            with self._lock:
+                picked = self._pick_merge(full)
+                snapshots = [seg.deleted for seg in picked]
+            if not picked:
+                return {'merged_segments': 0, 'purged_documents': 0}
+            
+            index = FrozenBM25Index.merge(
+                [seg.index for seg in picked], snapshots,
+                self._tokenize, k1=self.k1, b=self.b
+            )
+            merged = BM25Segment(index)
+            purged = sum(int(mask.sum()) for mask in snapshots if mask is not None)
+            
+            with self._lock:
+                # 병합 중 삭제된 문서 반영
+                for seg, snapshot in zip(picked, snapshots):
+                    for doc_id in seg.deleted_since(snapshot):
+                        merged.delete(doc_id)
+                
+                segments = list(self.segments)
+                position = next(i for i, seg in enumerate(segments) if seg is picked[0])
+                rest = [seg for seg in segments if not any(seg is p for p in picked)]
+                if index.N > 0:
+                    rest.insert(position, merged)
+                self.segments = tuple(rest)
+                self.merges += 1
+                self._update_stats()
+        
+        logger.info(f"BM25 세그먼트 병합: {len(picked)}개 → 1개 (삭제 문서 {purged}개 정리)")
+        return {'merged_segments': len(picked), 'purged_documents': purged}
+    
+    def _schedule_merge(self):
+        """병합 정책에 해당하면 백그라운드 병합 스레드 시작"""
+        if not self._pick_merge():
+            return
+        if self._merge_thread is not None and self._merge_thread.is_alive():
+            return
+        self._merge_thread = threading.Thread(
+            target=self._merge_worker, name="bm25-merge", daemon=True
+        )
+        self._merge_thread.start()
+    
+    def _merge_worker(self):
+        """병합 정책에 해당하는 세그먼트가 없을 때까지 병합"""
+        try:
+            while self.merge()['merged_segments']:
+                pass
+        except Exception as e:
+            logger.error(f"BM25 세그먼트 병합 실패: {e}")
+    
+    def optimize(self) -> Dict[str, int]:
+        """메모리 세그먼트 flush 후 모든 세그먼트를 하나로 병합 (동기)"""
+        self.flush()
+        result = self.merge(full=True)
+        result['segments'] = len(self.segments)
+        return result
+    
+    def freeze(self):
+        """
+        전체를 단일 세그먼트로 병합 (스냅샷 저장용)
+        
+        Returns:
+            FrozenBM25Index 또는 None (NumPy 미설치, 빈 색인, 메모리 세그먼트 잔존)
+        """
+        self.optimize()
+        segments = self.segments
+        if len(segments) == 1 and self.memtable.N == 0 and not segments[0].deleted_count:
+            return segments[0].index
+        return None
+    
+    def load_frozen(self, frozen):
+        """고정 인덱스(스냅샷)를 단일 세그먼트로 사용"""
+        from .bm25_index import BM25Segment
+        
+        with self._lock:
+            self.memtable = BM25Engine(self.k1, self.b)
+            self.segments = (BM25Segment(frozen),)
+            self.docs = {}
+            self._update_stats()
+    
+    @property
+    def is_frozen(self) -> bool:
+        """삭제 없는 단일 세그먼트로만 구성됐는지 (가지치기 검색 경로)"""
+        segments = self.segments
+        return len(segments) == 1 and self.memtable.N == 0 and not segments[0].deleted_count
+    
+    @property
+    def pending_deletes(self) -> int:
+        return len(self.memtable.tombstones) + sum(seg.deleted_count for seg in self.segments)
+    
+    @property
+    def vocabulary_size(self) -> int:
+        """어휘 수 (병합 전에는 삭제 문서에만 있는 토큰 포함)"""
+        segments = self.segments
+        if len(segments) == 1 and not self.memtable.postings:
+            return len(segments[0].index.terms)
+        vocabulary = set(self.memtable.postings)
+        for seg in segments:
+            vocabulary.update(seg.index.terms)
+        return len(vocabulary)
+    
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """BM25 검색 (전체 통계로 세그먼트별 상위 k개를 구한 뒤 합침)"""
+        query_tokens = self._tokenize(query)
+        if not query_tokens:
+            return []
+        
+        # 잠금 안에서는 스냅샷만 잡고 점수 계산은 잠금 밖에서 (검색끼리는 병렬 실행)
+        # 세그먼트와 삭제 마스크는 copy-on-write, 메모리 세그먼트는 쿼리 토큰 부분만 복사
+        with self._lock:
+            segments = [(seg, seg.deleted) for seg in self.segments]
+            single = len(segments) == 1 and self.memtable.N == 0 and not segments[0][0].deleted_count
+            N, avg_len = self.N, self.avg_len
+            memtable = None if single else self.memtable.token_view(query_tokens)
+        
+        if single:
+            # 세그먼트 통계 = 전체 통계: MaxScore 가지치기 경로
+            return segments[0][0].index.search(query, top_k)
+        if N == 0:
+            return []
+        
+        idf = {}
+        for token in set(query_tokens):
+            df = memtable.df.get(token, 0)
+            for seg, deleted in segments:
+                df += seg.index.live_df(token, deleted)
+            if df > 0:
+                idf[token] = math.log((N - df + 0.5) / (df + 0.5))
+        query_tokens = [token for token in query_tokens if token in idf]
+        if not query_tokens:
+            return []
+        
+        results = list(memtable.score_tokens(query_tokens, idf, avg_len).items())
+        for seg, deleted in segments:
+            results.extend(seg.index.search_tokens(query_tokens, idf, avg_len, top_k, deleted))
+        
+        # 상위 k개 결과 반환
+        results.sort(key=lambda x: x[1], reverse=True)
+        return results[:top_k]
 
 
 class VectorEngine:
-    """벡터 검색 엔진"""
+    """벡터 검색 엔진 (정규화된 임베딩 행렬에 대한 내적 검색)"""
+    
+    # 일괄 색인 시 모델 호출 한 번에 넣는 문서 수
+    ENCODE_BATCH_SIZE = int(os.getenv('RAG_EMBED_BATCH_SIZE', '64'))
+    # 일괄 색인 진행 로그 간격 (초)
+    PROGRESS_INTERVAL = 5.0
+    # 이 문서 수 이상이면 IVF 근사 검색 사용
+    ANN_MIN_DOCS = int(os.getenv('RAG_ANN_MIN_DOCS', '20000'))
+    # IVF 검색 시 훑는 리스트 수 (클수록 재현율↑, 지연↑)
+    ANN_NPROBE = int(os.getenv('RAG_ANN_NPROBE', '32'))
+    # 임베딩 저장 형식 (benchmark_vector.py, 2만 문서 x 384차원 전수 검색 기준)
+    # - float32: 기본값, 가장 빠름 (약 2ms, 문서당 dim * 4바이트)
+    # - float16: 메모리 1/2, numpy의 float16→float32 변환 비용으로 약 10배 느림 (약 20ms)
+    #   IVF 근사 검색이면 훑는 행만 변환하므로 차이가 줄어듦
+    # - int8: 메모리 1/4, 약 2배 느림 (약 3.7ms), 재현율@10 약 0.98 → 메모리를 줄일 때 권장
+    STORAGE = os.getenv('RAG_VECTOR_STORAGE', 'float32')
+    # 양자화 점수 상위 top_k * RESCORE개를 임베딩 캐시의 float32 원본으로 다시 점수화 (0 = 사용 안 함)
+    # 원본은 이미 메모리에 있는 임베딩 캐시에서 읽으므로 인덱스 메모리는 늘지 않음
+    # (int8 + 4: 재현율@10 1.0, 약 3.9ms, 캐시에 없는 문서는 양자화 점수 유지)
+    RESCORE = int(os.getenv('RAG_VECTOR_RESCORE', '0'))
+    # 공유 행렬 메타 변경 확인 간격 (초)
+    SHARED_CHECK_INTERVAL = float(os.getenv('RAG_RELOAD_CHECK_INTERVAL', '2.0'))
+    # 쿼리 임베딩 LRU 캐시 크기 (0 = 사용 안 함)
+    QUERY_CACHE_SIZE = int(os.getenv('RAG_QUERY_EMBED_CACHE_SIZE', '1024'))
     
-    def __init__(self, embedding_model=None):
+    def __init__(self, embedding_model=None, model_name: str = ''):
         self.embedding_model = embedding_model
-        self.embeddings = {}  # doc_id -> embedding
+        self.model_name = model_name
+        self.index = None  # DenseVectorIndex (첫 임베딩 추가 시 생성)
         self.doc_metadata = {}  # doc_id -> metadata
+        self.cache = None  # EmbeddingCache (일괄 색인 시 재사용, 재점수화 원본)
+        self._source_keys: Dict[str, bytes] = {}  # doc_id -> 임베딩 캐시 키 (재점수화 원본 조회)
+        self.last_build: Dict[str, Any] = {}  # 마지막 일괄 색인 통계
+        self.ann_path: Optional[Path] = None  # IVF 저장 경로 (없으면 저장하지 않음)
+        self.ann_source_hash = ''  # IVF 저장 파일 검증용 원본 해시
+        self.shared_dir: Optional[Path] = None  # 공유 행렬(memmap) 디렉토리
+        self._last_shared_check = 0.0
+        self._query_cache: OrderedDict = OrderedDict()  # (모델, 정규화 쿼리 해시) -> 임베딩
+        self._query_cache_lock = threading.Lock()
+        self.query_cache_hits = 0
+        self.query_cache_misses = 0
+    
+    def _new_index(self):
+        from .vector_index import DenseVectorIndex
+        return self._configure(DenseVectorIndex(storage=self.STORAGE))
+    
+    def _configure(self, index):
+        """재점수화 설정 (원본 임베딩은 임베딩 캐시에서 조회)"""
+        index.rescore = self.RESCORE if index.storage != 'float32' else 0
+        index.source = self._source_vectors
+        return index
+    
+    def _source_vectors(self, doc_ids: List[str]) -> List[Optional[Any]]:
+        """재점수화용 원본 임베딩 (임베딩 캐시에 없는 문서는 None)"""
+        cache, keys = self.cache, self._source_keys
+        if cache is None:
+            return [None] * len(doc_ids)
+        return [cache.peek(keys[doc_id]) if doc_id in keys else None for doc_id in doc_ids]
+    
+    def index_sources(self, documents: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]]) -> int:
+        """
+        공유 행렬을 매핑한 워커용: 인코딩 없이 문서 텍스트로 재점수화 원본의 캐시 키만 계산
+        
+        Returns:
+            int: 키를 계산한 문서 수 (재점수화를 쓰지 않으면 0)
+        """
+        if self.cache is None or not self.RESCORE or self.STORAGE == 'float32':
+            return 0
+        from .embedding_cache import text_key
+        self._source_keys = {doc_id: text_key(text) for doc_id, text, _ in documents}
+        return len(self._source_keys)
+    
+    def _get_index(self):
+        if self.index is None:
+            self.index = self._new_index()
+        return self.index
+    
+    def __len__(self) -> int:
+        return len(self.index) if self.index is not None else 0
+    
+    @property
+    def ann_lists(self) -> int:
+        """IVF 리스트 수 (근사 검색 미사용이면 0)"""
+        index = self.index
+        return index.ivf.nlist if index is not None and index.ivf is not None else 0
     
     def add_document(self, doc_id: str, text: str, metadata: Dict[str, Any] = None):
         """문서 추가"""
         if self.embedding_model:
             embedding = self.embedding_model.encode(text)
-            self.embeddings[doc_id] = embedding
+            self._get_index().add(doc_id, embedding)
             self.doc_metadata[doc_id] = metadata or {}
+            self._source_keys.pop(doc_id, None)  # 캐시에 없는 임베딩 (양자화 점수 사용)
+    
+    def add_documents(
+        self,
+        documents: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]],
+        batch_size: Optional[int] = None
+    ) -> int:
+        """
+        문서 일괄 추가 (배치 인코딩)
+        
+        Args:
+            documents: (doc_id, text, metadata) 이터러블
+            batch_size: 모델 호출 한 번에 넣는 문서 수 (기본: ENCODE_BATCH_SIZE)
+            
+        Returns:
+            int: 추가된 문서 수
+        """
+        if not self.embedding_model:
+            return 0
+        index = self._get_index()
+        count = self._encode_into(index, self.doc_metadata, self._source_keys, list(documents), batch_size)
+        if index.ivf is None:
+            self._prepare_ann(index)
+        return count
+    
+    def rebuild(
+        self,
+        documents: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]],
+        batch_size: Optional[int] = None
+    ) -> int:
+        """
+        새 인덱스를 일괄 구축한 뒤 교체 (구축 중에는 기존 인덱스로 검색)
+        
+        Returns:
+            int: 색인된 문서 수
+        """
+        if not self.embedding_model:
+            return 0
+        index = self._new_index()
+        metadata, source_keys = {}, {}
+        count = self._encode_into(index, metadata, source_keys, list(documents), batch_size, prune_cache=True)
+        self._prepare_ann(index, retrain=True)
+        self.index, self.doc_metadata, self._source_keys = index, metadata, source_keys
+        return count
+    
+    def _prepare_ann(self, index, retrain: bool = False) -> bool:
+        """
+        문서 수가 ANN_MIN_DOCS 이상이면 IVF 근사 검색 준비 (저장본이 맞으면 로드, 아니면 학습 후 저장)
+        
+        Returns:
+            bool: IVF 사용 여부
+        """
+        if len(index) < self.ANN_MIN_DOCS:
+            index.ivf = None
+            return False
+        
+        index.nprobe = self.ANN_NPROBE
+        # 같은 차원의 다른 임베딩 모델 중심을 잘못 쓰지 않도록 모델 이름도 검증
+        ann_key = f"{self.model_name}:{self.ann_source_hash}"
+        if not retrain and self.ann_path is not None and index.load_ivf(self.ann_path, ann_key):
+            logger.info(f"IVF 인덱스 로드 완료: 리스트 {index.ivf.nlist}개")
+            return True
+        
+        started = time.time()
+        index.train_ivf()
+        logger.info(f"IVF 인덱스 학습 완료: 리스트 {index.ivf.nlist}개, {time.time() - started:.1f}초")
+        if self.ann_path is not None:
+            try:
+                index.save_ivf(self.ann_path, ann_key)
+            except OSError as e:
+                logger.warning(f"IVF 인덱스 저장 실패: {e}")
+        return True
+    
+    def _encode_into(
+        self,
+        index,
+        metadata: Dict[str, Any],
+        source_keys: Dict[str, bytes],
+        documents: List[Tuple],
+        batch_size: Optional[int],
+        prune_cache: bool = False
+    ) -> int:
+        """
+        캐시에 없는 문서만 텍스트 길이순으로 정렬해 배치마다 모델을 한 번 호출
+        (배치 안 패딩 낭비 감소)
+        
+        Args:
+            source_keys: doc_id -> 캐시 키를 기록할 딕셔너리 (재점수화 원본 조회)
+            prune_cache: 전체 재구축일 때 현재 문서에 없는 캐시 항목 정리
+        """
+        if not documents:
+            return 0
+        batch_size = batch_size or self.ENCODE_BATCH_SIZE
+        
+        # 캐시 적중 문서는 바로 색인
+        cache = self.cache
+        keys = None
+        pending = list(range(len(documents)))
+        if cache is not None:
+            from .embedding_cache import text_key
+            keys = [text_key(text) for _, text, _ in documents]
+            source_keys.update((doc[0], key) for doc, key in zip(documents, keys))
+            cached_ids, cached_vectors = [], []
+            pending = []
+            for i, key in enumerate(keys):
+                vector = cache.get(key)
+                if vector is None:
+                    pending.append(i)
+                else:
+                    cached_ids.append(documents[i][0])
+                    cached_vectors.append(vector)
+            index.add_many(cached_ids, cached_vectors)
+        for doc_id, _, doc_metadata in documents:
+            metadata[doc_id] = doc_metadata or {}
+        
+        order = sorted(pending, key=lambda i: len(documents[i][1] or ''))
+        started = last_report = time.time()
+        done = 0
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            embeddings = self.embedding_model.encode(
+                [documents[i][1] or '' for i in batch], batch_size=len(batch)
+            )
+            index.add_many([documents[i][0] for i in batch], embeddings)
+            if cache is not None:
+                cache.put_many([keys[i] for i in batch], embeddings)
+            done += len(batch)
+            
+            now = time.time()
+            if now - last_report >= self.PROGRESS_INTERVAL and done < len(order):
+                last_report = now
+                logger.info(f"벡터 색인 중: {done}/{len(order)} ({done / (now - started):.1f} docs/s)")
+        
+        if cache is not None:
+            try:
+                cache.save(keep=keys if prune_cache else None)
+            except OSError as e:
+                logger.warning(f"임베딩 캐시 저장 실패: {e}")
+        
+        elapsed = max(time.time() - started, 1e-6)
+        hits = len(documents) - len(order)
+        self.last_build = {
+            'documents': len(documents),
+            'encoded': done,
+            'cache_hits': hits,
+            'cache_hit_rate': round(hits / len(documents), 4),
+            'docs_per_second': round(done / elapsed, 1),
+        }
+        logger.info(
+            f"벡터 색인 완료: {len(documents)}개 문서 (인코딩 {done}개, 캐시 적중률 "
+            f"{hits / len(documents):.1%}), {elapsed:.1f}초 ({done / elapsed:.1f} docs/s)"
+        )
+        return len(documents)
+    
+    def open_shared(self, source_hash: str) -> bool:
+        """
+        공유 행렬이 현재 원본/모델/저장 형식과 맞으면 memmap으로 열어 사용 (인코딩 생략)
+        
+        Returns:
+            bool: 공유 행렬 사용 여부
+        """
+        if self.shared_dir is None:
+            return False
+        from .vector_index import DenseVectorIndex
+        
+        meta = DenseVectorIndex.read_shared_meta(self.shared_dir)
+        if meta is None or meta.get('source_hash') != source_hash or not self._shared_compatible(meta):
+            return False
+        index = DenseVectorIndex.open_shared(self.shared_dir, meta)
+        if index is None:
+            return False
+        
+        self._prepare_ann(index)
+        self.index = self._configure(index)
+        self._last_shared_check = time.time()
+        logger.info(f"공유 벡터 행렬 매핑: {len(index)}개 ({meta['generation']})")
+        return True
+    
+    def publish_shared(self, source_hash: str) -> bool:
+        """현재 인덱스를 공유 행렬로 기록 (다른 워커는 메타 세대 변경을 보고 다시 매핑)"""
+        if self.shared_dir is None or not len(self):
+            return False
+        from .vector_index import DenseVectorIndex
+        
+        index = self.index
+        try:
+            index.save_shared(self.shared_dir, source_hash, self.model_name)
+        except OSError as e:
+            logger.warning(f"공유 벡터 행렬 기록 실패: {e}")
+            return False
+        logger.info(f"공유 벡터 행렬 기록: {self.shared_dir} ({index.generation})")
+        
+        # 기록한 파일을 다시 매핑해 이 워커의 사본도 페이지 캐시로 공유 (행 순서 동일)
+        mapped = DenseVectorIndex.open_shared(self.shared_dir)
+        if mapped is not None and mapped.generation == index.generation:
+            mapped.ivf, mapped._assign, mapped.nprobe = index.ivf, index._assign, index.nprobe
+            self.index = self._configure(mapped)
+        return True
+    
+    def _shared_compatible(self, meta: Dict[str, Any]) -> bool:
+        return meta.get('provider') == self.model_name and meta.get('storage') == self.STORAGE
+    
+    def _check_shared(self):
+        """
+        공유 행렬 메타 세대가 바뀌었으면 다시 매핑 (확인은 SHARED_CHECK_INTERVAL마다)
+        
+        이 워커에서 문서를 직접 추가/삭제해 메모리로 복사된 인덱스는 교체하지 않습니다.
+        """
+        if self.shared_dir is None:
+            return
+        now = time.time()
+        if now - self._last_shared_check < self.SHARED_CHECK_INTERVAL:
+            return
+        self._last_shared_check = now
+        
+        index = self.index
+        if index is None or index.generation is None:
+            return
+        from .vector_index import DenseVectorIndex
+        
+        meta = DenseVectorIndex.read_shared_meta(self.shared_dir)
+        if meta is None or meta.get('generation') == index.generation or not self._shared_compatible(meta):
+            return
+        remapped = DenseVectorIndex.open_shared(self.shared_dir, meta)
+        if remapped is None:
+            return
+        if meta.get('source_hash', '') != self.ann_source_hash:
+            self._source_keys = {}  # 원본이 바뀌었으면 재점수화 키는 다음 재구축 때 다시 계산
+        self.ann_source_hash = meta.get('source_hash', '')
+        self._prepare_ann(remapped)
+        self.index = self._configure(remapped)
+        logger.info(f"공유 벡터 행렬 다시 매핑: {len(remapped)}개 ({meta['generation']})")
+    
+    def remove_document(self, doc_id: str) -> bool:
+        """문서 삭제"""
+        self.doc_metadata.pop(doc_id, None)
+        self._source_keys.pop(doc_id, None)
+        return self.index is not None and self.index.remove(doc_id)
     
     def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
-        """벡터 검색"""
-        if not self.embedding_model or not self.embeddings:
+        """벡터 검색 (행렬-벡터 곱 한 번)"""
+        if not self.embedding_model:
+            return []
+        self._check_shared()
+        if not len(self):
             return []
         
-        query_embedding = self.embedding_model.encode(query)
-        scores = {}
+        query_embedding = self._encode_queries([query])[0]
+        return self.index.search(query_embedding, top_k)
+    
+    def search_many(self, queries: List[str], top_k: int = 10) -> List[List[Tuple[str, float]]]:
+        """여러 쿼리 벡터 검색 (일괄 인코딩 + 행렬 곱 한 번)"""
+        if not self.embedding_model:
+            return [[] for _ in queries]
+        self._check_shared()
+        if not len(self):
+            return [[] for _ in queries]
         
-        for doc_id, doc_embedding in self.embeddings.items():
-            # 코사인 유사도 계산
-            similarity = self._cosine_similarity(query_embedding, doc_embedding)
-            scores[doc_id] = similarity
+        query_embeddings = self._encode_queries(list(queries))
+        return self.index.search_many(query_embeddings, top_k)
+    
+    def _encode_queries(self, queries: List[str]) -> List[Any]:
+        """
+        쿼리 임베딩 (LRU 캐시 적중분은 재사용, 나머지는 한 번에 인코딩)
         
-        # 상위 k개 결과 반환
-        sorted_results = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        return sorted_results[:top_k]
+        캐시 키는 (모델 이름, NFC/공백 정리한 쿼리 해시)입니다.
+        """
+        if self.QUERY_CACHE_SIZE <= 0:
+            return list(self.embedding_model.encode(queries))
+        from .embedding_cache import text_key
+        
+        keys = [(self.model_name, text_key(query)) for query in queries]
+        embeddings: List[Any] = [None] * len(queries)
+        missing: Dict[Any, List[int]] = {}
+        cache = self._query_cache
+        with self._query_cache_lock:
+            for i, key in enumerate(keys):
+                embedding = cache.get(key)
+                if embedding is not None:
+                    cache.move_to_end(key)
+                    embeddings[i] = embedding
+                    self.query_cache_hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+                    self.query_cache_misses += 1
+        if not missing:
+            return embeddings
+        
+        encoded = self.embedding_model.encode([queries[rows[0]] for rows in missing.values()])
+        with self._query_cache_lock:
+            for (key, rows), embedding in zip(missing.items(), encoded):
+                for i in rows:
+                    embeddings[i] = embedding
+                cache[key] = embedding
+                cache.move_to_end(key)
+            while len(cache) > self.QUERY_CACHE_SIZE:
+                cache.popitem(last=False)
+        return embeddings
     
-    def _cosine_similarity(self, a, b):
-        """코사인 유사도 계산"""
-        import numpy as np
-        return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+    def query_cache_stats(self) -> Dict[str, Any]:
+        """쿼리 임베딩 캐시 통계"""
+        total = self.query_cache_hits + self.query_cache_misses
+        return {
+            'size': len(self._query_cache),
+            'capacity': self.QUERY_CACHE_SIZE,
+            'hits': self.query_cache_hits,
+            'misses': self.query_cache_misses,
+            'hit_rate': round(self.query_cache_hits / total, 4) if total else 0.0,
+        }
 
 
 class RerankEngine:
-    """리랭킹 엔진"""
+    """리랭킹 엔진 (분류/증거 점수는 문서 색인 시 계산한 특징 사용)"""
     
     def __init__(self):
-        self.classifiers = {}
+        from .rerank_features import RerankFeatures
+        
         self.boost_factors = {
             'reason': 0.50,  # 이유문법/깨알문법
             'book': 0.20,    # 문법서/grammar 계열
             'other': 0.00    # 기타
         }
+        self.features = RerankFeatures(self.boost_factors)
     
     def classify_document(self, doc_metadata: Dict[str, Any]) -> str:
         """문서 분류"""
-        # 간단한 규칙 기반 분류
-        text = doc_metadata.get('text', '').lower()
-        source = doc_metadata.get('source', '').lower()
-        
-        if any(keyword in text for keyword in ['이유', '왜', 'because', 'reason']):
-            return 'reason'
-        elif any(keyword in source for keyword in ['grammar', '문법', 'book']):
-            return 'book'
-        else:
-            return 'other'
+        label, _ = self.features.compute(doc_metadata.get('text', ''), doc_metadata.get('source', ''))
+        return label
+    
+    def index_document(self, doc_id: str, text: str, metadata: Dict[str, Any] = None):
+        """문서 특징 계산 (문서 추가 시)"""
+        self.features.add(doc_id, text, (metadata or {}).get('source', ''))
+    
+    def index_documents(self, docs: Iterable[Tuple[str, str, Dict[str, Any]]], version: int = None) -> int:
+        """문서 특징 일괄 계산 (doc_id, 텍스트, 메타데이터)"""
+        return self.features.add_documents(docs, version)
+    
+    def remove_document(self, doc_id: str):
+        self.features.remove(doc_id)
     
     def rerank(self, results: List[HybridSearchResult]) -> List[HybridSearchResult]:
-        """검색 결과 리랭킹"""
-        for result in results:
-            # 문서 분류
-            classification = self.classify_document(result.metadata)
-            
-            # 증거 점수 계산
-            evidence_score = self._calculate_evidence_score(result, classification)
-            
-            # 부스트 팩터 적용
-            boost_factor = self.boost_factors.get(classification, 0.0)
-            
-            # 최종 점수 계산
-            result.score = result.score * (1 + boost_factor) + evidence_score
-            
-            # 메타데이터 업데이트
+        """검색 결과 리랭킹 (score * (1 + boost) + evidence를 후보 전체에 한 번에 적용)"""
+        if not results:
+            return results
+        
+        import numpy as np
+        
+        # 특징은 인덱스 키(청크 ID)로 저장
+        features = self.features.lookup([(result.chunk_id, result.text, result.source) for result in results])
+        scores = np.fromiter((result.score for result in results), dtype=np.float64, count=len(results))
+        adjusted = scores * (1.0 + features['boost']) + features['evidence']
+        
+        labels = self.features.labels
+        for result, score, (code, boost_factor, evidence_score) in zip(results, adjusted.tolist(), features.tolist()):
+            result.score = score
             result.metadata.update({
-                'classification': classification,
+                'classification': labels[code],
                 'evidence_score': evidence_score,
                 'boost_factor': boost_factor
             })
         
-        # 점수순으로 재정렬
-        return sorted(results, key=lambda x: x.score, reverse=True)
-    
-    def _calculate_evidence_score(self, result: HybridSearchResult, classification: str) -> float:
-        """증거 점수 계산"""
-        base_score = 0.0
-        
-        # 텍스트 길이 기반 점수
-        text_length = len(result.text)
-        if text_length > 500:
-            base_score += 0.1
-        elif text_length > 200:
-            base_score += 0.05
-        
-        # 소스 신뢰도 기반 점수
-        source = result.source.lower()
-        if 'official' in source or '공식' in source:
-            base_score += 0.2
-        elif 'academic' in source or '학술' in source:
-            base_score += 0.15
-        
-        return base_score
+        # 점수순으로 재정렬 (동점은 원래 순서 유지)
+        return [results[i] for i in np.argsort(-adjusted, kind='stable')]
 
 
 class AdvancedRAGService:
     """고급 RAG 서비스"""
     
     def __init__(self, rag_service: RAGService, indexing_service: IndexingService):
+        from ..domain.rag.engine import get_resident_index
+        from ..domain.rag.retrieval_cache import retrieval_cache
+        
         self.rag_service = rag_service
         self.indexing_service = indexing_service
         
-        # 검색 엔진 초기화
-        self.bm25_engine = BM25Engine()
-        self.vector_engine = VectorEngine()
+        # 검색 엔진 (프로세스 상주 인덱스를 RAGService, 관리자 API와 공유)
+        self.index = get_resident_index(rag_service)
         self.rerank_engine = RerankEngine()
+        self._feature_thread: Optional[threading.Thread] = None  # 리랭킹 특징 백그라운드 계산
+        self._feature_lock = threading.Lock()  # 스냅샷 버전 확인과 특징 초기화를 한 번만
         
         # 하이브리드 검색 설정
         self.alpha = 0.5  # BM25 가중치 (0.0 = 벡터만, 1.0 = BM25만)
-        self.cache = {}  # 검색 결과 캐시
-        self.cache_ttl = 3600  # 캐시 TTL (초)
+        self.cache = retrieval_cache  # 검색 결과 캐시 (RAGService와 공유, LRU + TTL)
+    
+    @property
+    def bm25_engine(self) -> SegmentedBM25Engine:
+        """상주 BM25 엔진 (스냅샷이 바뀌면 새 엔진으로 교체됨)"""
+        return self.index.bm25
+    
+    @property
+    def vector_engine(self) -> VectorEngine:
+        """상주 벡터 엔진"""
+        return self.index.vectors
     
     async def initialize(self):
-        """서비스 초기화"""
+        """서비스 초기화 (상주 인덱스 로드, 이미 로드되어 있으면 재사용)"""
         logger.info("고급 RAG 서비스 초기화 중...")
         
-        # 기존 인덱스 로드
-        await self._load_existing_index()
-        
-        # 벡터 엔진 설정
-        try:
-            from sentence_transformers import SentenceTransformer
-            self.vector_engine.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("벡터 엔진 초기화 완료")
-        except ImportError:
-            logger.warning("sentence-transformers가 설치되지 않음. 벡터 검색 비활성화")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.index.ensure_loaded)
+        await loop.run_in_executor(None, self._sync_rerank_features, True)
         
         logger.info("고급 RAG 서비스 초기화 완료")
     
-    async def _load_existing_index(self):
-        """기존 인덱스 로드"""
-        try:
-            # 기존 RAG 서비스에서 문서 로드
-            documents = await self.rag_service.get_all_documents()
-            
-            for doc in documents:
-                doc_id = doc.get('id', '')
-                text = doc.get('content', '')
-                metadata = doc.get('metadata', {})
-                
-                # BM25 엔진에 추가
-                self.bm25_engine.add_document(doc_id, text, metadata)
-                
-                # 벡터 엔진에 추가
-                self.vector_engine.add_document(doc_id, text, metadata)
-            
-            logger.info(f"기존 인덱스 로드 완료: {len(documents)}개 문서")
-            
-        except Exception as e:
-            logger.error(f"기존 인덱스 로드 실패: {e}")
+    def _sync_rerank_features(self, wait: bool = False) -> None:
+        """
+        상주 인덱스의 청크 스냅샷이 바뀌었으면 리랭킹 특징을 새 스냅샷 문서로 다시 계산
+        
+        Args:
+            wait: True면 계산이 끝날 때까지 대기 (기본은 전용 스레드에서 백그라운드 계산,
+                  그동안 특징이 없는 후보는 리랭킹 시 계산)
+        """
+        version = self.index.source_version
+        features = self.rerank_engine.features
+        with self._feature_lock:
+            if version is None or features.source_version == version:
+                return
+            features.reset(version)
+        docs = ((doc['id'], doc['content'], doc['metadata']) for doc in self.rag_service.iter_documents())
+        if wait:
+            count = self.rerank_engine.index_documents(docs, version)
+            logger.info(f"리랭킹 특징 계산 완료: {count}개 문서 (스냅샷 버전 {version})")
+        else:
+            # 전체 재계산이 검색 스레드 풀을 점유하지 않도록 전용 스레드에서 실행
+            # (이전 계산이 남아 있어도 reset으로 버전이 바뀌었으므로 곧 중단됨)
+            self._feature_thread = threading.Thread(
+                target=self.rerank_engine.index_documents, args=(docs, version),
+                name="rag-rerank-features", daemon=True
+            )
+            self._feature_thread.start()
+    
+    async def rebuild_vector_index(self) -> int:
+        """
+        벡터 인덱스 재구축 (RAG 청크 전체를 배치 인코딩한 뒤 교체)
+        
+        Returns:
+            int: 색인된 문서 수
+        """
+        loop = asyncio.get_running_loop()
+        count = await loop.run_in_executor(None, self.index.rebuild_vectors)
+        self._invalidate_cache()
+        return count
+    
+    def _get_document(self, doc_id: str) -> Tuple[str, Dict[str, Any]]:
+        """문서 텍스트/메타데이터 조회 (동적 추가 문서 또는 RAG 청크 저장소)"""
+        return self.index.document(doc_id)
     
     async def hybrid_search(
         self,
         query: str,
         top_k: int = 10,
         alpha: float = None,
-        use_rerank: bool = True
+        use_rerank: bool = True,
+        fusion: str = None
     ) -> List[HybridSearchResult]:
-        """하이브리드 검색"""
-        if alpha is None:
-            alpha = self.alpha
+        """
+        하이브리드 검색
         
-        # 캐시 확인
-        cache_key = f"hybrid:{query}:{top_k}:{alpha}:{use_rerank}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        BM25와 벡터 검색을 공유 스레드 풀에서 동시에 실행하고,
+        두 후보 목록을 fusion 방식(minmax / zscore / rrf)으로 합칩니다.
+        
+        Args:
+            alpha: BM25 가중치 (0.0 = 벡터만, 1.0 = BM25만)
+            fusion: 융합 방식 (기본: RAG_FUSION)
+        """
+        from ..domain.rag.hybrid_search import candidate_depth, get_search_executor
+        
+        alpha, fusion = self._prepare_search(alpha, fusion)
+        
+        # 캐시 확인 (인덱스 버전이 키에 포함되므로 문서 추가/삭제, 재구축 뒤에는 적중하지 않음)
+        cache_key = self._cache_key(query, top_k, alpha, fusion, use_rerank)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
         
         try:
-            # BM25 검색
-            bm25_results = self.bm25_engine.search(query, top_k * 2)
-            bm25_scores = {doc_id: score for doc_id, score in bm25_results}
-            
-            # 벡터 검색
-            vector_results = self.vector_engine.search(query, top_k * 2)
-            vector_scores = {doc_id: score for doc_id, score in vector_results}
-            
-            # 모든 문서 ID 수집
-            all_doc_ids = set(bm25_scores.keys()) | set(vector_scores.keys())
-            
-            # 하이브리드 점수 계산
-            hybrid_results = []
-            for doc_id in all_doc_ids:
-                bm25_score = bm25_scores.get(doc_id, 0.0)
-                vector_score = vector_scores.get(doc_id, 0.0)
-                
-                # 가중 평균 점수
-                hybrid_score = alpha * bm25_score + (1 - alpha) * vector_score
-                
-                # 문서 정보 가져오기
-                doc_info = self.bm25_engine.docs.get(doc_id, {})
-                text = doc_info.get('text', '')
-                metadata = doc_info.get('metadata', {})
-                
-                result = HybridSearchResult(
-                    doc_id=doc_id,
-                    chunk_id=doc_id,
-                    score=hybrid_score,
-                    bm25_score=bm25_score,
-                    vector_score=vector_score,
-                    text=text,
-                    title=metadata.get('title', ''),
-                    source=metadata.get('source', ''),
-                    search_type='hybrid',
-                    metadata=metadata
-                )
-                
-                hybrid_results.append(result)
-            
-            # 점수순 정렬
-            hybrid_results.sort(key=lambda x: x.score, reverse=True)
-            
-            # 상위 k개 선택
-            top_results = hybrid_results[:top_k]
-            
-            # 리랭킹 적용
-            if use_rerank:
-                top_results = self.rerank_engine.rerank(top_results)
+            # BM25 / 벡터 검색 동시 실행
+            loop = asyncio.get_running_loop()
+            executor = get_search_executor()
+            depth = candidate_depth(top_k)
+            bm25_results, vector_results = await asyncio.gather(
+                loop.run_in_executor(executor, self.bm25_engine.search, query, depth),
+                loop.run_in_executor(executor, self.vector_engine.search, query, depth)
+            )
+            # 융합/문서 조회/리랭킹도 스레드 풀에서 (이벤트 루프 스레드는 다른 요청 처리)
+            top_results = await loop.run_in_executor(
+                executor, self._fuse_results, bm25_results, vector_results, top_k, alpha, fusion, use_rerank
+            )
             
             # 캐시 저장
-            self.cache[cache_key] = top_results
+            self.cache.put(cache_key, top_results)
             
             logger.info(f"하이브리드 검색 완료: {len(top_results)}개 결과")
-            return top_results
+            return list(top_results)
             
         except Exception as e:
             logger.error(f"하이브리드 검색 실패: {e}")
             return []
     
+    async def hybrid_search_many(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        alpha: float = None,
+        use_rerank: bool = True,
+        fusion: str = None
+    ) -> List[List[HybridSearchResult]]:
+        """
+        여러 쿼리 하이브리드 검색 (hybrid_search와 같은 결과를 쿼리 순서대로 반환)
+        
+        캐시에 없는 쿼리만 검색하며, 벡터 검색은 모든 쿼리를 한 번에 인코딩하고
+        행렬 곱 한 번으로 점수화합니다 (VectorEngine.search_many).
+        BM25 검색은 그동안 다른 스레드에서 쿼리별로 실행합니다.
+        """
+        from ..domain.rag.hybrid_search import candidate_depth, get_search_executor
+        
+        alpha, fusion = self._prepare_search(alpha, fusion)
+        
+        results: List[Optional[List[HybridSearchResult]]] = [None] * len(queries)
+        pending: Dict[Tuple, List[int]] = {}  # 캐시 키 -> 쿼리 위치 (같은 쿼리는 한 번만 검색)
+        for i, query in enumerate(queries):
+            cache_key = self._cache_key(query, top_k, alpha, fusion, use_rerank)
+            if cache_key in pending:
+                pending[cache_key].append(i)
+                continue
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                results[i] = list(cached)
+            else:
+                pending[cache_key] = [i]
+        
+        if pending:
+            misses = [queries[rows[0]] for rows in pending.values()]
+            try:
+                loop = asyncio.get_running_loop()
+                executor = get_search_executor()
+                depth = candidate_depth(top_k)
+                bm25_engine = self.bm25_engine
+                bm25_lists, vector_lists = await asyncio.gather(
+                    loop.run_in_executor(executor, lambda: [bm25_engine.search(q, depth) for q in misses]),
+                    loop.run_in_executor(executor, self.vector_engine.search_many, misses, depth)
+                )
+                fused_lists = await loop.run_in_executor(executor, lambda: [
+                    self._fuse_results(bm25_results, vector_results, top_k, alpha, fusion, use_rerank)
+                    for bm25_results, vector_results in zip(bm25_lists, vector_lists)
+                ])
+                for (cache_key, rows), top_results in zip(pending.items(), fused_lists):
+                    self.cache.put(cache_key, top_results)
+                    for i in rows:
+                        results[i] = list(top_results)
+            except Exception as e:
+                logger.error(f"일괄 하이브리드 검색 실패: {e}")
+        
+        logger.info(f"일괄 하이브리드 검색 완료: 쿼리 {len(queries)}개 (검색 {len(pending)}개)")
+        return [result if result is not None else [] for result in results]
+    
+    def _prepare_search(self, alpha: Optional[float], fusion: Optional[str]) -> Tuple[float, str]:
+        """검색 파라미터 확인 후 상주 인덱스/리랭킹 특징 최신화"""
+        from ..domain.rag.fusion import DEFAULT_FUSION, FUSION_METHODS
+        
+        if alpha is None:
+            alpha = self.alpha
+        fusion = (fusion or DEFAULT_FUSION).lower()
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"지원하지 않는 융합 방식: {fusion}")
+        
+        # 청크 스냅샷이 바뀌었으면 백그라운드 재구축 시작
+        self.index.ensure_current()
+        self._sync_rerank_features()
+        return alpha, fusion
+    
+    def _cache_key(self, query: str, top_k: int, alpha: float, fusion: str, use_rerank: bool) -> Tuple:
+        return self.cache.make_key(
+            'advanced', query, self.index.version,
+            mode='hybrid', top_k=top_k, alpha=alpha, fusion=fusion, rerank=use_rerank
+        )
+    
+    def _fuse_results(
+        self,
+        bm25_results: List[Tuple[str, float]],
+        vector_results: List[Tuple[str, float]],
+        top_k: int,
+        alpha: float,
+        fusion: str,
+        use_rerank: bool
+    ) -> List[HybridSearchResult]:
+        """후보 목록만 대상으로 점수 융합 후 상위 top_k개 결과 생성 (리랭킹 포함)"""
+        from ..domain.rag.engine import result_ids
+        from ..domain.rag.fusion import fuse
+        
+        bm25_scores = dict(bm25_results)
+        vector_scores = dict(vector_results)
+        fused = fuse(bm25_results, vector_results, alpha, fusion)
+        
+        top_results = []
+        for doc_id, hybrid_score in fused[:top_k]:
+            # 문서 정보 가져오기
+            text, metadata = self._get_document(doc_id)
+            source_doc_id, chunk_id = result_ids(doc_id, metadata)
+            
+            top_results.append(HybridSearchResult(
+                doc_id=source_doc_id,
+                chunk_id=chunk_id,
+                score=hybrid_score,
+                bm25_score=bm25_scores.get(doc_id, 0.0),
+                vector_score=vector_scores.get(doc_id, 0.0),
+                text=text,
+                title=metadata.get('title', ''),
+                source=metadata.get('source', ''),
+                search_type='hybrid',
+                metadata=metadata
+            ))
+        
+        # 리랭킹 적용
+        if use_rerank:
+            top_results = self.rerank_engine.rerank(top_results)
+        return top_results
+    
     async def add_document(self, doc_id: str, text: str, metadata: Dict[str, Any] = None):
         """문서 추가 (동적 인덱싱)"""
         try:
-            # BM25 엔진에 추가
-            self.bm25_engine.add_document(doc_id, text, metadata)
+            # BM25/벡터 엔진에 추가 (인덱스 교체 시 새 인덱스로 다시 색인됨)
+            self.index.add_document(doc_id, text, metadata)
             
-            # 벡터 엔진에 추가
-            self.vector_engine.add_document(doc_id, text, metadata)
+            # 리랭킹 특징 계산
+            self.rerank_engine.index_document(doc_id, text, metadata)
             
             # 캐시 무효화
             self._invalidate_cache()
@@ -388,26 +1313,11 @@ class AdvancedRAGService:
     async def remove_document(self, doc_id: str):
         """문서 제거"""
         try:
-            # BM25 엔진에서 제거
-            if doc_id in self.bm25_engine.docs:
-                del self.bm25_engine.docs[doc_id]
-                del self.bm25_engine.doc_len[doc_id]
-                
-                # 포스팅에서 제거
-                for token, postings in self.bm25_engine.postings.items():
-                    self.bm25_engine.postings[token] = [
-                        p for p in postings if p.doc_id != doc_id
-                    ]
-                    self.bm25_engine.df[token] = len(set(
-                        p.doc_id for p in self.bm25_engine.postings[token]
-                    ))
-                
-                self.bm25_engine._update_stats()
+            # BM25 엔진(해당 문서의 토큰만 갱신)/벡터 엔진에서 제거
+            self.index.remove_document(doc_id)
             
-            # 벡터 엔진에서 제거
-            if doc_id in self.vector_engine.embeddings:
-                del self.vector_engine.embeddings[doc_id]
-                del self.vector_engine.doc_metadata[doc_id]
+            # 리랭킹 특징 제거
+            self.rerank_engine.remove_document(doc_id)
             
             # 캐시 무효화
             self._invalidate_cache()
@@ -418,54 +1328,109 @@ class AdvancedRAGService:
             logger.error(f"문서 제거 실패: {e}")
     
     def _invalidate_cache(self):
-        """캐시 무효화"""
-        self.cache.clear()
-        logger.info("캐시 무효화 완료")
+        """캐시 무효화 (인덱스 버전을 올려 이전 결과가 적중하지 않게 함)"""
+        self.index.touch()
+        logger.info(f"캐시 무효화 완료 (인덱스 버전 {self.index.version})")
     
     async def get_search_stats(self) -> Dict[str, Any]:
-        """검색 통계 정보"""
+        """검색 통계 정보 (어휘 집계 등은 스레드 풀에서 계산)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._collect_search_stats)
+    
+    def _collect_search_stats(self) -> Dict[str, Any]:
         return {
-            'total_documents': len(self.bm25_engine.docs),
-            'total_tokens': len(self.bm25_engine.postings),
+            'total_documents': self.bm25_engine.N,
+            'total_tokens': self.bm25_engine.vocabulary_size,
             'avg_doc_length': self.bm25_engine.avg_len,
+            'pending_deletes': self.bm25_engine.pending_deletes,
+            'bm25_frozen': self.bm25_engine.is_frozen,
+            'bm25_segments': len(self.bm25_engine.segments),
+            'bm25_memtable_docs': self.bm25_engine.memtable.N,
+            'bm25_merges': self.bm25_engine.merges,
             'cache_size': len(self.cache),
-            'vector_embeddings': len(self.vector_engine.embeddings)
+            'retrieval_cache': self.cache.stats(),
+            'rerank_features': len(self.rerank_engine.features),
+            'rerank_features_bytes': self.rerank_engine.features.memory_bytes(),
+            'vector_embeddings': len(self.vector_engine),
+            'vector_ivf_lists': self.vector_engine.ann_lists,
+            'vector_storage': self.vector_engine.STORAGE,
+            'vector_memory_bytes': self.vector_engine.index.memory_bytes() if self.vector_engine.index is not None else 0,
+            'vector_last_build': self.vector_engine.last_build,
+            'embedding_model': self.vector_engine.model_name or None,
+            'embedding_cache': self.vector_engine.cache.stats() if self.vector_engine.cache else None,
+            'query_embedding_cache': self.vector_engine.query_cache_stats(),
+            'embedding_server': self._embedding_server_stats()
         }
     
-    async def optimize_index(self):
-        """인덱스 최적화"""
+    def _embedding_server_stats(self) -> Optional[Dict[str, Any]]:
+        """임베딩 서버 클라이언트 통계 (서버를 쓰지 않으면 None)"""
+        model = self.vector_engine.embedding_model
+        if model is None or not os.getenv('RAG_EMBED_SOCKET'):
+            return None
+        from .embedding_server import EmbeddingClient
+        return model.stats() if isinstance(model, EmbeddingClient) else None
+    
+    async def optimize_index(self) -> Dict[str, int]:
+        """
+        인덱스 최적화 (메모리 세그먼트 flush 후 전체 세그먼트 병합, 삭제 문서 정리)
+        
+        병합은 토큰을 제거하지 않으므로 검색 결과는 바뀌지 않습니다.
+        """
         try:
-            # 불필요한 토큰 제거
-            tokens_to_remove = []
-            for token, df in self.bm25_engine.df.items():
-                if df < 2:  # 2개 미만 문서에만 나타나는 토큰 제거
-                    tokens_to_remove.append(token)
-            
-            for token in tokens_to_remove:
-                if token in self.bm25_engine.postings:
-                    del self.bm25_engine.postings[token]
-                if token in self.bm25_engine.df:
-                    del self.bm25_engine.df[token]
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, self.bm25_engine.optimize)
             
-            logger.info(f"인덱스 최적화 완료: {len(tokens_to_remove)}개 토큰 제거")
+            logger.info(
+                f"인덱스 최적화 완료: 세그먼트 {result['merged_segments']}개 병합, "
+                f"삭제 문서 {result['purged_documents']}개 정리"
+            )
+            return result
             
         except Exception as e:
             logger.error(f"인덱스 최적화 실패: {e}")
+            return {}
 
 
 # 전역 인스턴스
 advanced_rag_service = None
+_advanced_rag_init_lock: Optional[asyncio.Lock] = None
+_advanced_rag_init_task: Optional[asyncio.Future] = None
 
 
-async def get_advanced_rag_service() -> AdvancedRAGService:
-    """고급 RAG 서비스 인스턴스 반환"""
+async def _initialize_advanced_rag_service() -> AdvancedRAGService:
+    """고급 RAG 서비스 생성/초기화 후 공개"""
     global advanced_rag_service
+    from .rag_service import rag_service
+    from .indexing_service import indexing_service
     
-    if advanced_rag_service is None:
-        from .rag_service import rag_service
-        from .indexing_service import indexing_service
-        
-        advanced_rag_service = AdvancedRAGService(rag_service, indexing_service)
-        await advanced_rag_service.initialize()
+    service = AdvancedRAGService(rag_service, indexing_service)
+    await service.initialize()
+    advanced_rag_service = service
+    return service
+
+
+async def get_advanced_rag_service() -> AdvancedRAGService:
+    """
+    고급 RAG 서비스 인스턴스 반환
+    
+    동시에 들어온 첫 요청들은 초기화 잠금을 기다리므로 인덱스는 한 번만 구축되고,
+    인스턴스는 초기화가 끝난 뒤에 공개됩니다.
+    초기화는 별도 태스크로 실행되므로 기다리던 요청이 시간 초과로 취소되어도 계속 진행되고,
+    실패한 경우에만 다음 요청에서 다시 시도합니다.
+    (앱은 시작 시 백그라운드 이벤트 루프에서 미리 호출합니다)
+    """
+    global _advanced_rag_init_lock, _advanced_rag_init_task
+    
+    if advanced_rag_service is not None:
+        return advanced_rag_service
+    
+    if _advanced_rag_init_lock is None:
+        _advanced_rag_init_lock = asyncio.Lock()
+    async with _advanced_rag_init_lock:
+        if advanced_rag_service is None:
+            task = _advanced_rag_init_task
+            if task is None or task.done():
+                task = _advanced_rag_init_task = asyncio.ensure_future(_initialize_advanced_rag_service())
+            await asyncio.shield(task)
     
     return advanced_rag_service
@@ -0,0 +1,38 @@
+"""
+원자적 파일 기록 모듈
+
+임시 파일에 다 쓴 뒤 os.replace로 교체하므로 읽는 쪽은 항상 완성된 파일만 봅니다.
+임시 파일 이름에 프로세스 ID와 난수를 붙여, 같은 프로세스의 여러 스레드나 여러 워커가
+같은 파일을 동시에 기록해도 서로의 임시 파일을 덮어쓰지 않습니다.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, BinaryIO, Callable
+
+
+def write_atomic(path: Path, write: Callable[[BinaryIO], Any]) -> Any:
+    """
+    임시 파일에 기록한 뒤 path로 교체
+
+    Args:
+        path: 최종 경로
+        write: 열린 임시 파일(바이너리)에 내용을 쓰는 함수
+
+    Returns:
+        write의 반환값
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{os.urandom(3).hex()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            result = write(f)
+        os.replace(tmp_path, path)
+        return result
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
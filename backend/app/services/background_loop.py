@@ -0,0 +1,104 @@
+"""
+백그라운드 이벤트 루프 모듈
+
+앱이 소유하는 asyncio 이벤트 루프 하나를 전용 스레드에서 계속 실행합니다.
+Flask 뷰(동기)는 코루틴을 이 루프에 제출하고 결과를 기다리므로, 요청마다 루프를
+새로 만들지 않고 고급 RAG 서비스 같은 비동기 서비스 상태를 루프 하나에서 공유합니다.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Coroutine, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundEventLoop:
+    """전용 스레드에서 계속 실행되는 asyncio 이벤트 루프"""
+
+    # run() 기본 대기 시간 (초, 초기화가 멈춰도 요청 스레드가 무한 대기하지 않도록)
+    DEFAULT_TIMEOUT = float(os.getenv('APP_ASYNC_TIMEOUT', '120'))
+
+    def __init__(self, name: str = "app-event-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """루프 스레드 시작 (이미 실행 중이면 그대로 반환)"""
+        with self._lock:
+            if not self.running:
+                if self._loop is not None and not self._loop.is_closed():
+                    self._loop.close()  # stop()이 기다리다 포기한 뒤 스레드가 끝난 이전 루프
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+
+                def _run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+
+                self._loop = loop
+                self._thread = threading.Thread(target=_run, name=self.name, daemon=True)
+                self._thread.start()
+                started.wait()
+                logger.info("백그라운드 이벤트 루프 시작")
+            return self._loop
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        """코루틴을 루프에 제출 (루프가 없으면 시작)"""
+        loop = self.start()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """
+        코루틴을 루프에서 실행하고 결과를 기다림 (동기 코드용)
+
+        Args:
+            timeout: 최대 대기 시간 (초, 기본: DEFAULT_TIMEOUT). 초과하면 코루틴을 취소
+
+        Raises:
+            RuntimeError: 루프 스레드 안에서 호출한 경우 (교착 방지)
+            concurrent.futures.TimeoutError: timeout 초과
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("백그라운드 이벤트 루프 안에서는 run()을 호출할 수 없습니다. await를 사용하세요.")
+        future = self.submit(coro)
+        try:
+            return future.result(self.DEFAULT_TIMEOUT if timeout is None else timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        루프 종료 (스레드가 끝날 때까지 최대 timeout초 대기)
+
+        그 안에 스레드가 끝나지 않으면(오래 걸리는 콜백 실행 중) 실행 중인 루프는 닫을 수
+        없으므로 경고만 남기고 그대로 둡니다. 스레드가 끝난 뒤 stop()을 다시 호출하면 닫힙니다.
+        """
+        with self._lock:
+            if self._thread is None:
+                return
+            if self._thread.is_alive():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout)
+                if self._thread.is_alive():
+                    logger.warning(f"백그라운드 이벤트 루프가 {timeout}초 안에 끝나지 않아 닫지 않고 둡니다")
+                    return
+            self._loop.close()
+            self._loop, self._thread = None, None
+
+
+# 앱 공유 인스턴스
+background_loop = BackgroundEventLoop()
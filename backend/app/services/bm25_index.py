@@ -0,0 +1,560 @@
+"""
+BM25 CSR 인덱스 모듈
+
+BM25Engine의 포스팅을 읽기 전용 배열 표현(CSR)으로 고정하고 NumPy로 점수를 계산합니다.
+- 토큰별 포스팅: offsets[t]:offsets[t+1] 구간의 doc 번호(int32) / tf(float32), doc 번호 오름차순
+- 토큰별 idf, 문서별 길이 정규화 계수 k1 * (1 - b + b * len / avg_len) 사전 계산
+- 쿼리 점수는 NumPy 누적, 상위 k개는 argpartition으로 선택
+
+BM25Engine.search와 같은 시그니처/점수 공식을 사용하므로 그대로 대체할 수 있습니다.
+
+포스팅이 긴 쿼리(흔한 조사/어미 토큰)는 MaxScore 방식으로 가지치기합니다.
+- 토큰별 점수 상한과 BLOCK_SIZE 포스팅 블록별 최대 점수(block-max)를 사전 계산
+- 상위 토큰의 상위 k개 문서를 정확히 점수화해 k번째 점수(임계값)를 얻고,
+  상한 합이 임계값 미만인 토큰들(비필수 토큰)에만 나오는 문서는 후보에서 제외
+- 남은 후보는 비필수 토큰의 block-max로 상한을 다시 계산해 걸러낸 뒤 정확히 점수화
+상한 비교는 여유를 두고 엄격 부등호로만 제외하고, 살아남은 문서는 전수 점수화와
+같은 순서로 누적하므로 결과(문서, 점수, 동점 순서)는 전수 점수화와 동일합니다.
+
+세그먼트 색인(SegmentedBM25Engine)에서는 고정 인덱스가 불변 세그먼트로 쓰입니다.
+이때 점수는 전체 세그먼트 기준 통계(idf, 평균 길이)로 search_tokens에서 계산하고,
+merge로 여러 세그먼트를 삭제 문서를 제외하고 하나로 합칩니다.
+
+고정 인덱스는 persist 디렉토리(chunks.jsonl 옆)의 bm25_index.npz로 저장됩니다.
+헤더에 형식 버전과 원본 chunks.jsonl 해시가 있어, 워커는 다시 토큰화하지 않고
+스냅샷을 읽고 원본이 바뀌었을 때만 재구축합니다.
+"""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .atomic_file import write_atomic
+
+SNAPSHOT_FILENAME = "bm25_index.npz"
+SNAPSHOT_VERSION = 1
+
+# block-max 블록 크기 (포스팅 수)
+BLOCK_SIZE = 128
+# 쿼리 토큰 포스팅 합이 이보다 작으면 가지치기 없이 전수 점수화
+PRUNE_MIN_POSTINGS = 2048
+# 상한 비교 여유 (float32 누적 오차 보정)
+_BOUND_SLACK = 1e-4
+
+
+def _pack_strings(strings: List[str]) -> np.ndarray:
+    """문자열 리스트를 NUL 구분 UTF-8 바이트 배열로 변환"""
+    return np.frombuffer("\0".join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack_strings(blob: np.ndarray, count: int) -> List[str]:
+    if count == 0:
+        return []
+    return blob.tobytes().decode("utf-8").split("\0")
+
+
+class FrozenBM25Index:
+    """읽기 전용 BM25 CSR 인덱스"""
+
+    def __init__(
+        self,
+        doc_ids: List[str],
+        doc_len: np.ndarray,
+        terms: Dict[str, int],
+        offsets: np.ndarray,
+        post_docs: np.ndarray,
+        post_tf: np.ndarray,
+        tokenize: Callable[[str], List[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.doc_ids = doc_ids
+        self.doc_len = doc_len.astype(np.int32, copy=False)
+        self.terms = terms
+        self.offsets = offsets.astype(np.int64, copy=False)
+        self.post_docs = post_docs.astype(np.int32, copy=False)
+        self.post_tf = post_tf.astype(np.float32, copy=False)
+        self._tokenize = tokenize
+        self.k1 = k1
+        self.b = b
+
+        self.N = len(doc_ids)
+        self.avg_len = float(self.doc_len.sum()) / self.N if self.N > 0 else 0.0
+        self.df = np.diff(self.offsets).astype(np.int32)
+
+        # 토큰별 idf (BM25Engine.search와 같은 식)
+        df = self.df.astype(np.float64)
+        self.idf = np.log((self.N - df + 0.5) / (df + 0.5)).astype(np.float32)
+        # 문서별 길이 정규화 계수
+        if self.N > 0:
+            self.norm = (k1 * (1 - b + b * (self.doc_len / self.avg_len))).astype(np.float32)
+        else:
+            self.norm = np.zeros(0, dtype=np.float32)
+
+        self._build_block_max()
+        self._doc_index: Optional[Dict[str, int]] = None
+        self._global_norm: Tuple[float, Optional[np.ndarray]] = (0.0, None)
+
+    def _build_block_max(self) -> None:
+        """토큰별 점수 상한과 포스팅 블록별 (마지막 doc 번호, 최대 점수) 계산"""
+        num_terms = len(self.offsets) - 1
+        lengths = np.diff(self.offsets)
+        # 토큰별 블록 수와 블록 시작 위치
+        num_blocks = (lengths + BLOCK_SIZE - 1) // BLOCK_SIZE
+        self.block_offsets = np.zeros(num_terms + 1, dtype=np.int64)
+        np.cumsum(num_blocks, out=self.block_offsets[1:])
+        total_blocks = int(self.block_offsets[-1])
+
+        if total_blocks == 0:
+            self.block_last = np.zeros(0, dtype=np.int32)
+            self.block_max = np.zeros(0, dtype=np.float32)
+            self.term_max = np.zeros(num_terms, dtype=np.float32)
+            return
+
+        block_term = np.repeat(np.arange(num_terms), num_blocks)
+        block_rank = np.arange(total_blocks) - self.block_offsets[block_term]
+        block_start = self.offsets[block_term] + block_rank * BLOCK_SIZE
+        block_end = np.minimum(block_start + BLOCK_SIZE, self.offsets[block_term + 1])
+
+        term_of_posting = np.repeat(np.arange(num_terms), lengths)
+        tf = self.post_tf
+        scores = self.idf[term_of_posting] * (tf * (self.k1 + 1)) / (tf + self.norm[self.post_docs])
+
+        self.block_last = self.post_docs[block_end - 1]
+        self.block_max = np.maximum.reduceat(scores, block_start).astype(np.float32)
+        self.term_max = np.maximum.reduceat(self.block_max, self.block_offsets[:-1]).astype(np.float32)
+
+    @classmethod
+    def from_engine(cls, engine) -> 'FrozenBM25Index':
+        """
+        BM25Engine의 현재 상태를 고정 (삭제 대기 문서 제외)
+
+        Args:
+            engine: BM25Engine 인스턴스
+        """
+        doc_ids = list(engine.docs)
+        doc_index = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        doc_len = np.fromiter((engine.doc_len[d] for d in doc_ids), dtype=np.int32, count=len(doc_ids))
+
+        terms: Dict[str, int] = {}
+        term_col: List[int] = []
+        doc_col: List[int] = []
+        tf_col: List[int] = []
+        for token, bucket in engine.postings.items():
+            start = len(doc_col)
+            for doc_id, tf in bucket.items():
+                idx = doc_index.get(doc_id)
+                if idx is None:  # tombstone
+                    continue
+                doc_col.append(idx)
+                tf_col.append(tf)
+            if len(doc_col) > start:
+                tid = terms[token] = len(terms)
+                term_col.extend([tid] * (len(doc_col) - start))
+
+        term_arr = np.asarray(term_col, dtype=np.int32)
+        doc_arr = np.asarray(doc_col, dtype=np.int32)
+        order = np.lexsort((doc_arr, term_arr))
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_arr, minlength=len(terms)), out=offsets[1:])
+
+        return cls(
+            doc_ids, doc_len, terms, offsets,
+            doc_arr[order], np.asarray(tf_col, dtype=np.float32)[order],
+            engine._tokenize, k1=engine.k1, b=engine.b,
+        )
+
+    @classmethod
+    def merge(
+        cls,
+        indexes: List['FrozenBM25Index'],
+        deleted: List[Optional[np.ndarray]],
+        tokenize: Callable[[str], List[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> 'FrozenBM25Index':
+        """
+        여러 고정 인덱스를 하나로 병합 (삭제 문서 제외, 토큰화 없음)
+
+        Args:
+            indexes: 병합할 인덱스 (문서 순서 유지)
+            deleted: 인덱스별 삭제 문서 마스크 (bool 배열, 없으면 None)
+        """
+        doc_ids: List[str] = []
+        doc_lens: List[np.ndarray] = []
+        terms: Dict[str, int] = {}
+        term_cols: List[np.ndarray] = []
+        doc_cols: List[np.ndarray] = []
+        tf_cols: List[np.ndarray] = []
+
+        base = 0
+        for index, mask in zip(indexes, deleted):
+            keep = np.ones(index.N, dtype=bool) if mask is None else ~mask
+            live = np.flatnonzero(keep)
+            renumber = np.full(index.N, -1, dtype=np.int64)
+            renumber[live] = base + np.arange(len(live))
+            doc_ids.extend(index.doc_ids[i] for i in live.tolist())
+            doc_lens.append(index.doc_len[live])
+            base += len(live)
+
+            # 로컬 토큰 번호 -> 병합 토큰 번호 (terms는 토큰 번호 순서로 저장됨)
+            remap = np.fromiter(
+                (terms.setdefault(t, len(terms)) for t in index.terms),
+                dtype=np.int64, count=len(index.terms),
+            )
+            new_docs = renumber[index.post_docs]
+            alive = new_docs >= 0
+            term_cols.append(np.repeat(remap, np.diff(index.offsets))[alive])
+            doc_cols.append(new_docs[alive])
+            tf_cols.append(index.post_tf[alive])
+
+        term_arr = np.concatenate(term_cols) if term_cols else np.zeros(0, dtype=np.int64)
+        doc_arr = np.concatenate(doc_cols) if doc_cols else np.zeros(0, dtype=np.int64)
+        tf_arr = np.concatenate(tf_cols) if tf_cols else np.zeros(0, dtype=np.float32)
+
+        # 삭제 문서에만 있던 토큰 제거 후 번호 재부여
+        counts = np.bincount(term_arr, minlength=len(terms))
+        used = counts > 0
+        compact = np.cumsum(used) - 1
+        term_list = [t for t, tid in terms.items() if used[tid]]
+        term_arr = compact[term_arr]
+
+        order = np.lexsort((doc_arr, term_arr))
+        offsets = np.zeros(len(term_list) + 1, dtype=np.int64)
+        np.cumsum(counts[used], out=offsets[1:])
+
+        return cls(
+            doc_ids,
+            np.concatenate(doc_lens) if doc_lens else np.zeros(0, dtype=np.int32),
+            {t: i for i, t in enumerate(term_list)},
+            offsets, doc_arr[order], tf_arr[order],
+            tokenize, k1=k1, b=b,
+        )
+
+    @property
+    def doc_index(self) -> Dict[str, int]:
+        """doc_id -> doc 번호 (처음 접근 시 생성)"""
+        if self._doc_index is None:
+            self._doc_index = {doc_id: i for i, doc_id in enumerate(self.doc_ids)}
+        return self._doc_index
+
+    def live_df(self, token: str, deleted: Optional[np.ndarray] = None) -> int:
+        """삭제 문서를 제외한 토큰 문서 빈도"""
+        tid = self.terms.get(token)
+        if tid is None:
+            return 0
+        df = int(self.df[tid])
+        if deleted is not None:
+            start, end = self.offsets[tid], self.offsets[tid + 1]
+            df -= int(deleted[self.post_docs[start:end]].sum())
+        return df
+
+    def search_tokens(
+        self,
+        tokens: List[str],
+        idf: Dict[str, float],
+        avg_len: float,
+        top_k: int,
+        deleted: Optional[np.ndarray] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        외부(전체 세그먼트) 통계로 점수 계산
+
+        Args:
+            tokens: 쿼리 토큰 (중복 포함)
+            idf: 토큰별 전체 idf
+            avg_len: 전체 평균 문서 길이
+            deleted: 삭제 문서 마스크 (결과에서 제외)
+        """
+        if self.N == 0 or top_k <= 0:
+            return []
+
+        cached_avg, norm = self._global_norm
+        if norm is None or cached_avg != avg_len:
+            norm = (self.k1 * (1 - self.b + self.b * (self.doc_len / avg_len))).astype(np.float32)
+            self._global_norm = (avg_len, norm)
+
+        acc = np.zeros(self.N, dtype=np.float32)
+        touched = []
+        for token in tokens:
+            tid = self.terms.get(token)
+            if tid is None:
+                continue
+            start, end = self.offsets[tid], self.offsets[tid + 1]
+            docs = self.post_docs[start:end]
+            tf = self.post_tf[start:end]
+            acc[docs] += np.float32(idf[token]) * (tf * (self.k1 + 1)) / (tf + norm[docs])
+            touched.append(docs)
+        if not touched:
+            return []
+
+        candidates = np.unique(np.concatenate(touched)) if len(touched) > 1 else touched[0]
+        if deleted is not None:
+            candidates = candidates[~deleted[candidates]]
+        return self._top_k(candidates, acc[candidates], top_k)
+
+    def _term_scores(self, tid: int) -> Tuple[np.ndarray, np.ndarray]:
+        """토큰 하나의 (doc 번호, 점수) 배열"""
+        start, end = self.offsets[tid], self.offsets[tid + 1]
+        docs = self.post_docs[start:end]
+        tf = self.post_tf[start:end]
+        scores = self.idf[tid] * (tf * (self.k1 + 1)) / (tf + self.norm[docs])
+        return docs, scores
+
+    def _lookup(self, tid: int, docs: np.ndarray) -> np.ndarray:
+        """문서들의 토큰 점수 (포스팅에 없으면 0)"""
+        start, end = self.offsets[tid], self.offsets[tid + 1]
+        segment = self.post_docs[start:end]
+        pos = np.searchsorted(segment, docs)
+        found = pos < len(segment)
+        found[found] = segment[pos[found]] == docs[found]
+        scores = np.zeros(len(docs), dtype=np.float32)
+        hit = start + pos[found]
+        tf = self.post_tf[hit]
+        scores[found] = self.idf[tid] * (tf * (self.k1 + 1)) / (tf + self.norm[docs[found]])
+        return scores
+
+    def _block_bound(self, tid: int, docs: np.ndarray) -> np.ndarray:
+        """문서들이 속할 포스팅 블록의 최대 점수 (블록 범위 밖이면 0)"""
+        start, end = self.block_offsets[tid], self.block_offsets[tid + 1]
+        pos = np.searchsorted(self.block_last[start:end], docs)
+        bounds = np.zeros(len(docs), dtype=np.float32)
+        inside = pos < end - start
+        bounds[inside] = self.block_max[start + pos[inside]]
+        return bounds
+
+    def _exact_scores(self, tids: List[int], docs: np.ndarray) -> np.ndarray:
+        """후보 문서의 정확한 점수 (전수 점수화와 같은 순서로 float32 누적)"""
+        acc = np.zeros(len(docs), dtype=np.float32)
+        contributions: Dict[int, np.ndarray] = {}
+        for tid in tids:
+            if tid not in contributions:
+                contributions[tid] = self._lookup(tid, docs)
+            acc += contributions[tid]
+        return acc
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """BM25 검색 (BM25Engine.search 대체)"""
+        if self.N == 0:
+            return []
+
+        tids = [self.terms[t] for t in self._tokenize(query) if t in self.terms]
+        if not tids:
+            return []
+
+        if top_k > 0 and int(self.df[np.unique(tids)].sum()) >= PRUNE_MIN_POSTINGS:
+            return self._search_pruned(tids, top_k)
+        return self._search_exhaustive(tids, top_k)
+
+    def search_exhaustive(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """가지치기 없이 모든 포스팅을 점수화 (비교/검증용)"""
+        if self.N == 0:
+            return []
+        tids = [self.terms[t] for t in self._tokenize(query) if t in self.terms]
+        if not tids:
+            return []
+        return self._search_exhaustive(tids, top_k)
+
+    def _search_pruned(self, tids: List[int], top_k: int) -> List[Tuple[str, float]]:
+        """
+        MaxScore + block-max 가지치기 검색
+
+        Args:
+            tids: 쿼리 토큰 번호 (쿼리 순서, 중복 포함)
+            top_k: 반환할 결과 수
+        """
+        counts: Dict[int, int] = {}
+        for tid in tids:
+            counts[tid] = counts.get(tid, 0) + 1
+        # 토큰 상한 (중복 토큰은 출현 수만큼, 음수 idf 토큰은 0)
+        upper = {tid: max(float(self.term_max[tid]), 0.0) * n for tid, n in counts.items()}
+
+        # 1) 임계값: 상한이 가장 큰 토큰의 상위 k개 문서를 정확히 점수화한 k번째 점수
+        lead = max(upper, key=lambda t: (upper[t], -t))
+        docs, scores = self._term_scores(lead)
+        if len(docs) > top_k:
+            docs = docs[np.argpartition(-scores, top_k - 1)[:top_k]]
+        seed = self._exact_scores(tids, np.sort(docs))
+        if len(seed) < top_k:
+            return self._search_exhaustive(tids, top_k)
+        threshold = float(np.partition(seed, len(seed) - top_k)[len(seed) - top_k])
+        threshold -= _BOUND_SLACK * max(1.0, abs(threshold))
+
+        # 2) 상한 오름차순으로 누적 상한이 임계값 미만인 토큰까지 비필수 토큰
+        ordered = sorted(upper, key=lambda t: (upper[t], t))
+        non_essential = []
+        bound = 0.0
+        for tid in ordered:
+            if bound + upper[tid] >= threshold:
+                break
+            bound += upper[tid]
+            non_essential.append(tid)
+        essential = [tid for tid in ordered if tid not in non_essential]
+        if not non_essential:
+            return self._search_exhaustive(tids, top_k)
+
+        # 필수 토큰 포스팅에 나오는 문서만 후보 (비필수 토큰에만 나오는 문서는 임계값 미만)
+        segments = [self.post_docs[self.offsets[t]:self.offsets[t + 1]] for t in essential]
+        candidates = np.unique(np.concatenate(segments)) if len(segments) > 1 else segments[0]
+
+        # 3) 필수 토큰 정확 점수 + 비필수 토큰 block-max로 상한을 다시 계산해 제외
+        partial = np.zeros(len(candidates), dtype=np.float32)
+        for tid in essential:
+            partial += self._lookup(tid, candidates) * counts[tid]
+        doc_bound = partial.astype(np.float64)
+        for tid in non_essential:
+            doc_bound += np.maximum(self._block_bound(tid, candidates), 0.0) * counts[tid]
+        doc_bound += _BOUND_SLACK * np.maximum(1.0, np.abs(doc_bound))
+        candidates = candidates[doc_bound >= threshold]
+
+        # 4) 남은 후보 정확 점수화
+        return self._top_k(candidates, self._exact_scores(tids, candidates), top_k)
+
+    def _search_exhaustive(self, tids: List[int], top_k: int) -> List[Tuple[str, float]]:
+        acc = np.zeros(self.N, dtype=np.float32)
+        touched = []
+        for tid in tids:
+            docs, scores = self._term_scores(tid)
+            # 한 토큰의 포스팅 안에서 doc 번호는 중복되지 않음
+            acc[docs] += scores
+            touched.append(docs)
+
+        candidates = np.unique(np.concatenate(touched)) if len(touched) > 1 else touched[0]
+        return self._top_k(candidates, acc[candidates], top_k)
+
+    def _top_k(self, candidates: np.ndarray, scores: np.ndarray, top_k: int) -> List[Tuple[str, float]]:
+        """후보 중 상위 k개 (점수 내림차순, 동점은 doc 번호 오름차순)"""
+        if top_k <= 0 or len(candidates) == 0:
+            return []
+        if len(candidates) > top_k:
+            part = np.argpartition(-scores, top_k - 1)[:top_k]
+            # 경계 동점 문서를 포함해 결정적으로 정렬
+            threshold = scores[part].min()
+            keep = np.flatnonzero(scores >= threshold)
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))[:top_k]
+        return [(self.doc_ids[candidates[i]], float(scores[i])) for i in order]
+
+    def save(self, path: Path, source_hash: str) -> None:
+        """
+        스냅샷 저장 (임시 파일에 쓴 뒤 원자적으로 교체)
+
+        Args:
+            path: 저장 경로 (bm25_index.npz)
+            source_hash: 원본 chunks.jsonl 해시
+        """
+        header = {
+            'version': SNAPSHOT_VERSION,
+            'source_hash': source_hash,
+            'k1': self.k1,
+            'b': self.b,
+            'doc_count': self.N,
+            'term_count': len(self.terms),
+            'created_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        write_atomic(path, lambda f: np.savez(
+            f,
+            header=np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+            doc_ids=_pack_strings(self.doc_ids),
+            terms=_pack_strings(list(self.terms)),
+            doc_len=self.doc_len,
+            offsets=self.offsets,
+            post_docs=self.post_docs,
+            post_tf=self.post_tf,
+        ))
+
+    @staticmethod
+    def read_header(path: Path) -> Optional[Dict]:
+        """스냅샷 헤더만 읽기 (없거나 손상되면 None)"""
+        try:
+            with np.load(path) as data:
+                return json.loads(data["header"].tobytes().decode("utf-8"))
+        except Exception:
+            return None
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        tokenize: Callable[[str], List[str]],
+        source_hash: str,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> Optional['FrozenBM25Index']:
+        """
+        스냅샷 로드
+
+        Returns:
+            FrozenBM25Index 또는 None (파일 없음, 형식 버전/원본 해시/파라미터 불일치)
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                header = json.loads(data["header"].tobytes().decode("utf-8"))
+                if (header.get('version') != SNAPSHOT_VERSION
+                        or header.get('source_hash') != source_hash
+                        or header.get('k1') != k1 or header.get('b') != b):
+                    return None
+                doc_ids = _unpack_strings(data["doc_ids"], header['doc_count'])
+                term_list = _unpack_strings(data["terms"], header['term_count'])
+                return cls(
+                    doc_ids, data["doc_len"], {t: i for i, t in enumerate(term_list)},
+                    data["offsets"], data["post_docs"], data["post_tf"],
+                    tokenize, k1=k1, b=b,
+                )
+        except Exception:
+            return None
+
+    def memory_bytes(self) -> int:
+        """배열 메모리 사용량 (바이트)"""
+        arrays = (self.doc_len, self.offsets, self.post_docs, self.post_tf, self.df, self.idf, self.norm,
+                  self.block_offsets, self.block_last, self.block_max, self.term_max)
+        return int(sum(a.nbytes for a in arrays))
+
+
+class BM25Segment:
+    """
+    불변 BM25 세그먼트 (고정 인덱스 + 삭제 문서 마스크)
+
+    삭제 마스크는 copy-on-write로 교체되므로, 검색/병합 스레드가 잡은 배열은 바뀌지 않습니다.
+    """
+
+    def __init__(self, index: FrozenBM25Index):
+        self.index = index
+        self.deleted: Optional[np.ndarray] = None  # bool 배열 (삭제 없으면 None)
+        self.deleted_count = 0
+        self.live_len = int(index.doc_len.sum())
+
+    @property
+    def live_count(self) -> int:
+        return self.index.N - self.deleted_count
+
+    def contains(self, doc_id: str) -> bool:
+        idx = self.index.doc_index.get(doc_id)
+        return idx is not None and (self.deleted is None or not self.deleted[idx])
+
+    def delete(self, doc_id: str) -> bool:
+        """문서 삭제 표시"""
+        idx = self.index.doc_index.get(doc_id)
+        if idx is None or (self.deleted is not None and self.deleted[idx]):
+            return False
+        deleted = np.zeros(self.index.N, dtype=bool) if self.deleted is None else self.deleted.copy()
+        deleted[idx] = True
+        self.deleted = deleted
+        self.deleted_count += 1
+        self.live_len -= int(self.index.doc_len[idx])
+        return True
+
+    def deleted_since(self, snapshot: Optional[np.ndarray]) -> List[str]:
+        """snapshot 마스크 이후 새로 삭제된 문서 ID"""
+        current = self.deleted
+        if current is None or current is snapshot:
+            return []
+        newly = current if snapshot is None else current & ~snapshot
+        return [self.index.doc_ids[i] for i in np.flatnonzero(newly).tolist()]
@@ -0,0 +1,321 @@
+"""
+청크 저장소 모듈
+
+chunks.jsonl 옆에 컬럼형 바이너리 청크 저장소(chunks.bin)를 만들고 mmap으로 읽습니다.
+워커마다 JSONL 전체를 파싱해 딕셔너리 리스트로 들고 있지 않고,
+필요한 청크의 텍스트만 그때그때 디코딩합니다.
+
+파일 구성 (모든 섹션 8바이트 정렬, 네이티브 바이트 순서):
+- 헤더: 매직/버전, 행 수, 문자열 수, 원본 chunks.jsonl의 크기/mtime/MD5
+- 고정폭 컬럼: text_off(Q), text_len(I), chunk_id/doc_id/title/source/category/extra(I, 문자열 번호)
+- 문자열 테이블: 오프셋(Q) 배열 + UTF-8 blob (title/source/category 등 중복 제거)
+- 텍스트 blob: 청크 텍스트 UTF-8 연결
+
+저장소는 호스트 로컬 캐시이므로 언제든 chunks.jsonl에서 다시 만들 수 있습니다.
+    python -m app.services.chunk_store [chunks.jsonl 경로]
+"""
+from __future__ import annotations
+
+import io
+import json
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .atomic_file import write_atomic
+
+STORE_FILENAME = "chunks.bin"
+
+_MAGIC = b"LKCHUNKS"
+_VERSION = 1
+_BYTEORDER = 1 if sys.byteorder == "little" else 2
+
+# magic, version, byteorder, rows, strings, skipped, source_size, source_mtime_ns,
+# source_md5, str_blob_pos, text_blob_pos, text_blob_len
+_HEADER = struct.Struct("=8sHHIIIQq16sQQQ")
+_HEADER_SIZE = 128
+
+# 문자열 번호 컬럼 (extra: 나머지 필드의 JSON)
+STRING_COLUMNS = ("chunk_id", "doc_id", "title", "source", "category", "extra")
+# 값이 없는 필드
+MISSING = 0xFFFFFFFF
+
+
+def _align(pos: int) -> int:
+    return (pos + 7) & ~7
+
+
+def _file_md5(path: Path) -> bytes:
+    import hashlib
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+class ChunkStore:
+    """mmap 기반 읽기 전용 청크 저장소"""
+
+    def __init__(self, buf: Union[mmap.mmap, bytes], path: Optional[Path] = None):
+        self._buf = buf
+        self.path = path
+
+        (magic, version, byteorder, rows, strings, skipped, source_size,
+         source_mtime_ns, source_md5, str_blob_pos, text_blob_pos,
+         text_blob_len) = _HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC or version != _VERSION or byteorder != _BYTEORDER:
+            raise ValueError("지원하지 않는 청크 저장소 형식입니다")
+
+        self._rows = rows
+        self.skipped = skipped  # 파싱 실패로 제외된 줄 수
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+        self.source_md5 = source_md5
+
+        view = memoryview(buf)
+        pos = _HEADER_SIZE
+        self._text_off = view[pos:pos + 8 * rows].cast("Q")
+        pos = _align(pos + 8 * rows)
+        self._text_len = view[pos:pos + 4 * rows].cast("I")
+        pos = _align(pos + 4 * rows)
+        self._columns: Dict[str, memoryview] = {}
+        for name in STRING_COLUMNS:
+            self._columns[name] = view[pos:pos + 4 * rows].cast("I")
+            pos = _align(pos + 4 * rows)
+        self._str_off = view[pos:pos + 8 * (strings + 1)].cast("Q")
+        self._str_blob_pos = str_blob_pos
+        self._text_blob_pos = text_blob_pos
+        self._text_blob_len = text_blob_len
+
+    @classmethod
+    def open(cls, path: Path) -> 'ChunkStore':
+        """저장소 파일을 mmap으로 열기"""
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buf, Path(path))
+
+    @classmethod
+    def empty(cls) -> 'ChunkStore':
+        """빈 저장소 (chunks.jsonl이 없을 때)"""
+        out = io.BytesIO()
+        _write_store(out, [], None)
+        return cls(out.getvalue())
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        """청크 딕셔너리 (chunks.jsonl 한 줄과 같은 내용)"""
+        if idx < 0:
+            idx += self._rows
+        if not 0 <= idx < self._rows:
+            raise IndexError(idx)
+
+        chunk: Dict[str, Any] = {}
+        for name in STRING_COLUMNS[:-1]:
+            sid = self._columns[name][idx]
+            if sid != MISSING:
+                chunk[name] = self._string(sid)
+        chunk["text"] = self.text(idx)
+        extra = self._columns["extra"][idx]
+        if extra != MISSING:
+            chunk.update(json.loads(self._string(extra)))
+        return chunk
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for idx in range(self._rows):
+            yield self[idx]
+
+    def _string(self, sid: int) -> str:
+        start = self._str_blob_pos + self._str_off[sid]
+        end = self._str_blob_pos + self._str_off[sid + 1]
+        return self._buf[start:end].decode("utf-8")
+
+    def text(self, idx: int) -> str:
+        """청크 텍스트만 디코딩"""
+        start = self._text_blob_pos + self._text_off[idx]
+        return self._buf[start:start + self._text_len[idx]].decode("utf-8")
+
+    def field(self, idx: int, name: str) -> Optional[str]:
+        """문자열 컬럼 값 (없으면 None)"""
+        sid = self._columns[name][idx]
+        return None if sid == MISSING else self._string(sid)
+
+    def field_ids(self, name: str) -> memoryview:
+        """문자열 컬럼의 문자열 번호 배열 (디코딩 없이 고유값 집계용)"""
+        return self._columns[name]
+
+    def iter_texts(self) -> Iterator[str]:
+        for idx in range(self._rows):
+            yield self.text(idx)
+
+    def matches_source(self, source: Path) -> bool:
+        """원본 chunks.jsonl과 내용이 같은지 (크기/mtime, 다르면 MD5로 확인)"""
+        try:
+            st = source.stat()
+        except OSError:
+            return False
+        if st.st_size != self.source_size:
+            return False
+        if st.st_mtime_ns == self.source_mtime_ns:
+            return True
+        return _file_md5(source) == self.source_md5
+
+
+def _iter_jsonl(path: Path, skipped: List[int]) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except Exception as e:
+                print(f"[ChunkStore] 청크 파싱 실패: {e}")
+                skipped[0] += 1
+                continue
+            if isinstance(obj, dict):
+                yield obj
+            else:
+                skipped[0] += 1
+
+
+def _write_store(out, chunks, source: Optional[Path], skipped: Optional[List[int]] = None) -> int:
+    """청크 이터러블을 저장소 형식으로 out에 기록"""
+    strings: Dict[str, int] = {}
+    str_blob = bytearray()
+    str_off = array("Q", [0])
+
+    def intern(value: Optional[str]) -> int:
+        if value is None:
+            return MISSING
+        sid = strings.get(value)
+        if sid is None:
+            sid = strings[value] = len(strings)
+            str_blob.extend(value.encode("utf-8"))
+            str_off.append(len(str_blob))
+        return sid
+
+    text_off = array("Q")
+    text_len = array("I")
+    columns = {name: array("I") for name in STRING_COLUMNS}
+
+    with tempfile.TemporaryFile() as text_blob:
+        written = 0
+        for chunk in chunks:
+            text = chunk.get("text")
+            data = ("" if text is None else str(text)).encode("utf-8")
+            text_off.append(written)
+            text_len.append(len(data))
+            text_blob.write(data)
+            written += len(data)
+
+            extra = {}
+            for key, value in chunk.items():
+                if key == "text":
+                    continue
+                if key in STRING_COLUMNS[:-1] and isinstance(value, str):
+                    continue
+                extra[key] = value
+            for name in STRING_COLUMNS[:-1]:
+                value = chunk.get(name)
+                columns[name].append(intern(value if isinstance(value, str) else None))
+            columns["extra"].append(
+                intern(json.dumps(extra, ensure_ascii=False)) if extra else MISSING
+            )
+
+        rows = len(text_off)
+        pos = _HEADER_SIZE
+        sections: List[Tuple[int, bytes]] = []
+        for arr in (text_off, text_len, *(columns[name] for name in STRING_COLUMNS), str_off):
+            sections.append((pos, arr.tobytes()))
+            pos = _align(pos + len(sections[-1][1]))
+        str_blob_pos = pos
+        text_blob_pos = _align(str_blob_pos + len(str_blob))
+
+        if source is not None:
+            st = source.stat()
+            source_info = (st.st_size, st.st_mtime_ns, _file_md5(source))
+        else:
+            source_info = (0, 0, b"\0" * 16)
+
+        header = _HEADER.pack(
+            _MAGIC, _VERSION, _BYTEORDER, rows, len(strings),
+            skipped[0] if skipped else 0, *source_info,
+            str_blob_pos, text_blob_pos, written,
+        )
+        out.write(header.ljust(_HEADER_SIZE, b"\0"))
+        cursor = _HEADER_SIZE
+        for section_pos, data in sections:
+            out.write(b"\0" * (section_pos - cursor))
+            out.write(data)
+            cursor = section_pos + len(data)
+        out.write(b"\0" * (str_blob_pos - cursor))
+        out.write(str_blob)
+        out.write(b"\0" * (text_blob_pos - str_blob_pos - len(str_blob)))
+        text_blob.seek(0)
+        shutil.copyfileobj(text_blob, out)
+    return rows
+
+
+def build_chunk_store(jsonl_path: Path, store_path: Optional[Path] = None) -> Path:
+    """
+    chunks.jsonl에서 청크 저장소 생성 (임시 파일에 쓴 뒤 원자적으로 교체)
+
+    Args:
+        jsonl_path: 원본 chunks.jsonl 경로
+        store_path: 저장소 경로 (기본: chunks.jsonl 옆 chunks.bin)
+
+    Returns:
+        Path: 생성된 저장소 경로
+    """
+    jsonl_path = Path(jsonl_path)
+    store_path = Path(store_path) if store_path else jsonl_path.with_name(STORE_FILENAME)
+
+    # 백그라운드 재로드와 요청 경로가 함께 만들어도 임시 파일이 겹치지 않음
+    skipped = [0]
+    rows = write_atomic(
+        store_path, lambda out: _write_store(out, _iter_jsonl(jsonl_path, skipped), jsonl_path, skipped)
+    )
+
+    print(f"[ChunkStore] {rows}개 청크 저장소 생성: {store_path}")
+    return store_path
+
+
+def open_chunk_store(jsonl_path: Path) -> ChunkStore:
+    """
+    chunks.jsonl에 대응하는 청크 저장소 열기
+
+    저장소가 없거나 원본과 다르면 다시 만들고, 디렉토리에 쓸 수 없으면 메모리에 만듭니다.
+    """
+    jsonl_path = Path(jsonl_path)
+    store_path = jsonl_path.with_name(STORE_FILENAME)
+
+    if store_path.exists():
+        try:
+            store = ChunkStore.open(store_path)
+            if store.matches_source(jsonl_path):
+                return store
+        except Exception as e:
+            print(f"[ChunkStore] 저장소 읽기 실패, 재생성: {e}")
+
+    try:
+        return ChunkStore.open(build_chunk_store(jsonl_path, store_path))
+    except OSError as e:
+        print(f"[ChunkStore] 저장소 파일 생성 실패, 메모리 저장소 사용: {e}")
+        out = io.BytesIO()
+        skipped = [0]
+        _write_store(out, _iter_jsonl(jsonl_path, skipped), jsonl_path, skipped)
+        return ChunkStore(out.getvalue())
+
+
+if __name__ == "__main__":
+    from ..config import Config
+
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(Config.RAG_PERSIST_DIR) / "chunks.jsonl"
+    build_chunk_store(source)
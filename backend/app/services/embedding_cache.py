@@ -0,0 +1,156 @@
+"""
+임베딩 캐시 모듈
+
+(모델 이름, 정규화한 청크 텍스트 해시) → 임베딩을 persist 디렉토리에 보관합니다.
+재구축 시 내용이 바뀌지 않은 청크는 다시 인코딩하지 않고 캐시에서 읽습니다.
+
+파일: persist/embedding_cache/<모델 이름>.npz
+- keys: 텍스트 해시 (blake2b 16바이트, uint8 [n, 16])
+- vectors: 임베딩 (float32 [n, dim])
+- header: 형식 버전, 모델 이름, 차원 (JSON)
+저장은 임시 파일에 쓴 뒤 원자적으로 교체합니다.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from .atomic_file import write_atomic
+
+CACHE_DIRNAME = "embedding_cache"
+CACHE_VERSION = 1
+
+_UNSAFE_RE = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+def text_key(text: str) -> bytes:
+    """정규화한 텍스트의 해시 (NFC, 공백 정리)"""
+    normalized = " ".join(unicodedata.normalize("NFC", text or "").split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """모델별 임베딩 캐시"""
+
+    def __init__(self, persist_dir: Path, model_name: str):
+        self.model_name = model_name
+        self.path = Path(persist_dir) / CACHE_DIRNAME / f"{_UNSAFE_RE.sub('_', model_name)}.npz"
+        self.dim: Optional[int] = None
+        self._rows: Dict[bytes, int] = {}  # 텍스트 해시 -> 행 번호
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._pending: Dict[bytes, np.ndarray] = {}  # 아직 저장하지 않은 임베딩
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as data:
+                header = json.loads(data["header"].tobytes().decode("utf-8"))
+                if header.get("version") != CACHE_VERSION or header.get("model") != self.model_name:
+                    return
+                keys = data["keys"]
+                self._vectors = data["vectors"].astype(np.float32, copy=False)
+            self.dim = int(header["dim"])
+            self._rows = {keys[i].tobytes(): i for i in range(len(keys))}
+        except Exception as e:
+            print(f"[EmbeddingCache] 캐시 읽기 실패, 무시: {e}")
+            self._rows = {}
+            self._vectors = np.zeros((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._pending)
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """캐시된 임베딩 (없으면 None, 적중/미스 집계)"""
+        row = self._rows.get(key)
+        if row is not None:
+            self.hits += 1
+            return self._vectors[row]
+        vector = self._pending.get(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+        self.misses += 1
+        return None
+
+    def peek(self, key: bytes) -> Optional[np.ndarray]:
+        """캐시된 임베딩 (적중/미스 집계 없음, 검색 시 재점수화용)"""
+        row = self._rows.get(key)
+        if row is not None:
+            return self._vectors[row]
+        return self._pending.get(key)
+
+    def put_many(self, keys: List[bytes], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(keys), -1)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            # 같은 이름으로 다른 차원의 모델이 로드된 경우: 기존 캐시 폐기
+            self._rows, self._pending = {}, {}
+            self._vectors = np.zeros((0, 0), dtype=np.float32)
+            self.dim = vectors.shape[1]
+        for key, vector in zip(keys, vectors):
+            self._pending[key] = vector
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset_counters(self) -> None:
+        self.hits = self.misses = 0
+
+    def save(self, keep: Optional[Iterable[bytes]] = None) -> bool:
+        """
+        캐시 저장
+
+        Args:
+            keep: 남길 키 (전체 재구축 시 현재 청크 키만 남겨 캐시를 정리)
+
+        Returns:
+            bool: 저장 여부 (변경 없으면 False)
+        """
+        keep_set: Optional[Set[bytes]] = set(keep) if keep is not None else None
+        stale = keep_set is not None and any(key not in keep_set for key in self._rows)
+        if not self._pending and not stale:
+            return False
+
+        keys = [k for k in self._rows if keep_set is None or k in keep_set]
+        rows = [self._rows[k] for k in keys]
+        pending = [k for k in self._pending if keep_set is None or k in keep_set]
+        vectors = [self._vectors[rows]] if rows else []
+        if pending:
+            vectors.append(np.stack([self._pending[k] for k in pending]))
+        keys.extend(pending)
+        matrix = np.concatenate(vectors) if vectors else np.zeros((0, self.dim or 0), dtype=np.float32)
+
+        header = {'version': CACHE_VERSION, 'model': self.model_name, 'dim': int(matrix.shape[1])}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.path, lambda f: np.savez(
+            f,
+            header=np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+            keys=np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(len(keys), 16),
+            vectors=matrix,
+        ))
+
+        self._rows = {k: i for i, k in enumerate(keys)}
+        self._vectors = matrix
+        self._pending = {}
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'entries': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate, 4),
+        }
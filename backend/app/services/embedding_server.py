@@ -0,0 +1,310 @@
+"""
+임베딩 사이드카 모듈
+
+호스트마다 임베딩 서버 프로세스 하나가 모델을 올리고 Unix 도메인 소켓으로 요청을 받습니다.
+워커는 모델을 직접 로드하지 않고 EmbeddingClient로 서버에 인코딩을 맡깁니다.
+
+서버는 동시에 들어온 요청을 짧은 시간 창(RAG_EMBED_WINDOW_MS) 동안 모아 한 번에 인코딩합니다.
+(워커마다 쿼리를 하나씩 인코딩하던 것을 마이크로 배치로 합침)
+클라이언트는 서버에 연결할 수 없으면 프로세스 안 모델로 폴백하고, 잠시 뒤 다시 연결을 시도합니다.
+
+프로토콜 (네이티브 바이트 순서):
+- 요청: 길이(I) + JSON {"model": 모델 이름, "texts": [...]}
+- 응답: 종류(c) + 행 수(I) + 차원(I) + 본문
+  - b"V": float32 [행 수, 차원] 임베딩
+  - b"E": UTF-8 오류 메시지 (행 수 자리에 바이트 길이)
+
+    RAG_EMBED_SOCKET=/tmp/like-opt-embed.sock python -m app.services.embedding_server
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Union
+
+import numpy as np
+
+DEFAULT_SOCKET = str(Path(tempfile.gettempdir()) / "like-opt-embed.sock")
+
+_REQUEST = struct.Struct("=I")
+_RESPONSE = struct.Struct("=cII")
+# 요청 한 건의 최대 크기 (비정상 길이 방어)
+_MAX_REQUEST_BYTES = 256 * 1024 * 1024
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(min(size - len(buf), 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("연결이 닫혔습니다")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+class _Request:
+    """배치 대기 중인 요청"""
+
+    __slots__ = ("texts", "done", "result", "error")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[str] = None
+
+
+class MicroBatcher:
+    """동시 요청을 시간 창 동안 모아 한 번에 인코딩"""
+
+    def __init__(self, model, max_batch: int = 64, window: float = 0.005):
+        self.model = model
+        self.max_batch = max_batch
+        self.window = window
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self.batches = 0
+        self.requests = 0
+        self._thread = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+        self._thread.start()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """배치에 합류해 인코딩 결과를 기다림"""
+        request = _Request(texts)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise RuntimeError(request.error)
+        return request.result
+
+    def _collect(self) -> List[_Request]:
+        first = self._queue.get()
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.monotonic() + self.window
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            # 배치 안 중복 텍스트는 한 번만 인코딩
+            unique = list(dict.fromkeys(text for request in batch for text in request.texts))
+            try:
+                vectors = np.asarray(
+                    self.model.encode(unique, batch_size=max(1, min(len(unique), self.max_batch))),
+                    dtype=np.float32,
+                ).reshape(len(unique), -1)
+                rows = {text: i for i, text in enumerate(unique)}
+                for request in batch:
+                    request.result = vectors[[rows[text] for text in request.texts]]
+            except Exception as e:
+                for request in batch:
+                    request.error = f"인코딩 실패: {e}"
+            self.batches += 1
+            self.requests += len(batch)
+            for request in batch:
+                request.done.set()
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """연결 하나에서 요청을 반복 처리"""
+
+    def handle(self) -> None:
+        server: EmbeddingServer = self.server  # type: ignore[assignment]
+        sock = self.request
+        while True:
+            try:
+                (size,) = _REQUEST.unpack(_recv_exact(sock, _REQUEST.size))
+                if size > _MAX_REQUEST_BYTES:
+                    return
+                payload = json.loads(_recv_exact(sock, size).decode("utf-8"))
+            except (ConnectionError, OSError, ValueError):
+                return
+
+            try:
+                if payload.get("model") != server.model_name:
+                    raise RuntimeError(f"모델 불일치: {payload.get('model')} != {server.model_name}")
+                texts = [str(text) for text in payload.get("texts", [])]
+                vectors = server.batcher.encode(texts) if texts else np.zeros((0, 0), np.float32)
+                response = _RESPONSE.pack(b"V", *vectors.shape) + vectors.tobytes()
+            except Exception as e:
+                message = str(e).encode("utf-8")
+                response = _RESPONSE.pack(b"E", len(message), 0) + message
+            try:
+                sock.sendall(response)
+            except OSError:
+                return
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix 소켓 임베딩 서버 (연결마다 스레드, 인코딩은 MicroBatcher 하나로)"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, model, model_name: str,
+                 max_batch: int = 64, window: float = 0.005):
+        self.socket_path = socket_path
+        self.model_name = model_name
+        self.batcher = MicroBatcher(model, max_batch=max_batch, window=window)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # 이전 실행이 남긴 소켓 파일
+        super().__init__(socket_path, _Handler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+class EmbeddingClient:
+    """
+    임베딩 서버 클라이언트 (SentenceTransformer.encode와 같은 인터페이스)
+
+    서버에 연결할 수 없으면 fallback()으로 만든 프로세스 안 모델을 사용하고,
+    RETRY_INTERVAL이 지나면 다시 서버 연결을 시도합니다.
+    """
+
+    # 요청 한 번에 보내는 최대 텍스트 수 (대량 색인이 쿼리 배치를 오래 막지 않도록)
+    REQUEST_TEXTS = 256
+    RETRY_INTERVAL = 5.0
+
+    def __init__(self, socket_path: str, model_name: str,
+                 fallback: Optional[Callable[[], Any]] = None, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.model_name = model_name
+        self.timeout = timeout
+        self._fallback_factory = fallback
+        self._fallback = None
+        self._fallback_lock = threading.Lock()
+        self._local = threading.local()  # 스레드별 연결 (동시 요청이 서버에서 배치로 합쳐지도록)
+        self._down_until = 0.0
+        self.remote_calls = 0
+        self.fallback_calls = 0
+
+    def available(self) -> bool:
+        """서버 연결 가능 여부"""
+        try:
+            self._connection()
+            return True
+        except OSError:
+            return False
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _disconnect(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def _remote(self, texts: List[str]) -> np.ndarray:
+        sock = self._connection()
+        payload = json.dumps({"model": self.model_name, "texts": texts}, ensure_ascii=False).encode("utf-8")
+        sock.sendall(_REQUEST.pack(len(payload)) + payload)
+        kind, rows, dim = _RESPONSE.unpack(_recv_exact(sock, _RESPONSE.size))
+        if kind == b"E":
+            raise RuntimeError(_recv_exact(sock, rows).decode("utf-8"))
+        return np.frombuffer(_recv_exact(sock, rows * dim * 4), dtype=np.float32).reshape(rows, dim)
+
+    def local_model(self):
+        """프로세스 안 폴백 모델 (처음 필요할 때 로드)"""
+        if self._fallback is None:
+            with self._fallback_lock:
+                if self._fallback is None:
+                    if self._fallback_factory is None:
+                        raise RuntimeError(f"임베딩 서버에 연결할 수 없습니다: {self.socket_path}")
+                    print("[EmbeddingClient] 서버를 사용할 수 없어 프로세스 안 모델 로드")
+                    self._fallback = self._fallback_factory()
+        return self._fallback
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """텍스트 인코딩 (문자열 하나면 1차원, 리스트면 [n, dim] float32)"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else [text or "" for text in sentences]
+
+        vectors = None
+        if time.monotonic() >= self._down_until:
+            try:
+                parts = [
+                    self._remote(texts[start:start + self.REQUEST_TEXTS])
+                    for start in range(0, len(texts), self.REQUEST_TEXTS)
+                ]
+                vectors = np.concatenate(parts) if len(parts) != 1 else parts[0]
+                self.remote_calls += 1
+            except (OSError, RuntimeError) as e:
+                self._disconnect()
+                self._down_until = time.monotonic() + self.RETRY_INTERVAL
+                print(f"[EmbeddingClient] 서버 요청 실패, 프로세스 안 모델로 폴백: {e}")
+
+        if vectors is None:
+            vectors = np.asarray(
+                self.local_model().encode(texts, batch_size=batch_size), dtype=np.float32
+            ).reshape(len(texts), -1)
+            self.fallback_calls += 1
+        return vectors[0] if single else vectors
+
+    def stats(self) -> dict:
+        return {
+            "socket": self.socket_path,
+            "remote_calls": self.remote_calls,
+            "fallback_calls": self.fallback_calls,
+            "fallback_loaded": self._fallback is not None,
+        }
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="임베딩 사이드카 서버")
+    parser.add_argument("--socket", default=os.getenv("RAG_EMBED_SOCKET", DEFAULT_SOCKET))
+    parser.add_argument("--model", default=os.getenv("RAG_EMBED_MODEL", "all-MiniLM-L6-v2"))
+    parser.add_argument("--max-batch", type=int, default=int(os.getenv("RAG_EMBED_MAX_BATCH", "64")))
+    parser.add_argument("--window-ms", type=float, default=float(os.getenv("RAG_EMBED_WINDOW_MS", "5")))
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(args.model)
+    server = EmbeddingServer(args.socket, model, args.model,
+                             max_batch=args.max_batch, window=args.window_ms / 1000)
+    print(f"[EmbeddingServer] {args.model} 대기 중: {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+해시 임베딩 모듈
+
+sentence-transformers나 모델 가중치를 받을 수 없는 환경(폐쇄망 등)에서 쓰는 내장 임베딩입니다.
+다운로드 없이 CPU에서 빠르게, 항상 같은 결과를 냅니다.
+
+특징 (NFC 정규화 + 소문자):
+- 단어 unigram / bigram (키워드 검색과 같은 토큰 규칙)
+- 단어 안 문자 n-gram (2~3글자, 단어 경계 표시 포함) - 조사가 붙은 한국어 어절도 어간이 겹치도록
+가중치는 특징 종류별 가중치 × (1 + log tf)입니다.
+
+각 특징은 blake2b 해시로 PROBES개의 차원과 부호(±1)를 정하는 희소 랜덤 투영으로
+dim차원에 더해지고, 마지막에 L2 정규화합니다.
+(Python hash()는 프로세스마다 달라지므로 쓰지 않음)
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Union
+
+import numpy as np
+
+from .keyword_index import tokenize_query
+
+HASHING_VERSION = 1
+
+# 특징 종류별 가중치
+_WORD_WEIGHT = 1.0
+_BIGRAM_WEIGHT = 0.7
+_CHAR_WEIGHT = 0.4
+_CHAR_NGRAMS = (2, 3)
+
+# 특징 해시 캐시 최대 크기
+_HASH_CACHE_SIZE = 200000
+
+
+class HashingEmbedder:
+    """해시 n-gram + 희소 랜덤 투영 임베딩 (SentenceTransformer.encode와 같은 인터페이스)"""
+
+    # 특징 하나가 더해지는 차원 수
+    PROBES = 4
+    # 모델 이름 접두사 (sentence-transformers 모델과 구분)
+    NAME_PREFIX = "hashing-"
+
+    def __init__(self, dim: int = None):
+        self.dim = int(dim or os.getenv('RAG_HASH_EMBED_DIM', '384'))
+        if not 0 < self.dim <= 65536:
+            raise ValueError(f"지원하지 않는 해시 임베딩 차원: {self.dim}")
+        self.model_name = f"{self.NAME_PREFIX}v{HASHING_VERSION}-{self.dim}"
+        self._hashes: Dict[str, bytes] = {}  # 특징 -> blake2b 다이제스트
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _features(self, text: str) -> Counter:
+        """텍스트 특징과 가중치"""
+        words = tokenize_query(unicodedata.normalize("NFC", text or ""))
+        features: Counter = Counter()
+        for word, tf in Counter(words).items():
+            features["w:" + word] = _WORD_WEIGHT * (1.0 + math.log(tf))
+            padded = f"<{word}>"
+            grams: Counter = Counter(
+                padded[i:i + n]
+                for n in _CHAR_NGRAMS
+                for i in range(len(padded) - n + 1)
+            )
+            for gram, count in grams.items():
+                features["c:" + gram] += _CHAR_WEIGHT * count * tf
+        for pair, tf in Counter(zip(words, words[1:])).items():
+            features["b:" + " ".join(pair)] = _BIGRAM_WEIGHT * (1.0 + math.log(tf))
+        # 문자 n-gram은 합산 뒤 log 스케일 (긴 문서에서 과도하게 커지지 않도록)
+        for feature, weight in features.items():
+            if feature[0] == "c" and weight > _CHAR_WEIGHT:
+                features[feature] = _CHAR_WEIGHT * (1.0 + math.log(weight / _CHAR_WEIGHT))
+        return features
+
+    def _digest(self, feature: str) -> bytes:
+        digest = self._hashes.get(feature)
+        if digest is None:
+            if len(self._hashes) >= _HASH_CACHE_SIZE:
+                self._hashes.clear()
+            digest = self._hashes[feature] = hashlib.blake2b(
+                feature.encode("utf-8"), digest_size=16
+            ).digest()
+        return digest
+
+    def _project(self, rows: List[int], features: List[str], weights: List[float], count: int) -> np.ndarray:
+        """특징을 희소 랜덤 투영으로 [count, dim] 행렬에 누적"""
+        matrix = np.zeros((count, self.dim), dtype=np.float32)
+        if not features:
+            return matrix
+        digests = np.frombuffer(b"".join(self._digest(f) for f in features), dtype="<u2")
+        digests = digests.reshape(len(features), 8)
+        # 앞 PROBES개 16비트 값은 차원, 다음 값의 하위 PROBES비트는 부호
+        columns = digests[:, :self.PROBES].astype(np.int64) % self.dim
+        signs = ((digests[:, self.PROBES:self.PROBES + 1] >> np.arange(self.PROBES, dtype=np.uint16)) & 1)
+        values = (1.0 - 2.0 * signs) * np.asarray(weights, dtype=np.float64)[:, None]
+        flat = np.asarray(rows, dtype=np.int64)[:, None] * self.dim + columns
+        matrix += np.bincount(
+            flat.ravel(), weights=values.ravel(), minlength=count * self.dim
+        ).reshape(count, self.dim).astype(np.float32)
+        return matrix
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 256, **kwargs) -> np.ndarray:
+        """텍스트 인코딩 (문자열 하나면 1차원, 리스트면 [n, dim] float32, 행은 L2 정규화)"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        parts = []
+        batch_size = max(1, batch_size)
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            rows: List[int] = []
+            features: List[str] = []
+            weights: List[float] = []
+            for row, text in enumerate(batch):
+                for feature, weight in self._features(text).items():
+                    rows.append(row)
+                    features.append(feature)
+                    weights.append(weight)
+            parts.append(self._project(rows, features, weights, len(batch)))
+
+        matrix = np.concatenate(parts) if parts else np.zeros((0, self.dim), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.maximum(norms, 1e-12)
+        return matrix[0] if single else matrix
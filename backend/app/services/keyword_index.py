@@ -0,0 +1,175 @@
+"""
+키워드 역색인 모듈
+
+RAGService 폴백 키워드 검색용 토큰 → 포스팅 역색인을 제공합니다.
+청크 로드 시 한 번만 구축하고, 검색 시에는 쿼리 토큰을 포함한 청크만 점수화합니다.
+
+점수 규칙은 기존 선형 스캔과 동일합니다.
+- 정확한 단어 매칭(\\b토큰\\b): 출현 횟수만큼 가산
+- 정확 매칭이 없으면 부분 문자열 매칭: text.lower().count(토큰) * 0.5
+
+쿼리 토큰은 모두 단어 문자(\\w)로만 이루어지므로, 텍스트 안의 모든 출현은
+하나의 \\w+ 구간(용어) 안에 완전히 들어갑니다. 따라서
+- 정확 매칭 횟수 = 해당 토큰과 같은 용어의 출현 횟수(tf)
+- 부분 매칭 횟수 = Σ tf(용어) × 용어.count(토큰)  (토큰을 포함하는 용어들에 대해)
+로 텍스트를 다시 읽지 않고 계산할 수 있습니다.
+
+토큰을 포함하는 용어는 어휘에 대한 문자 n-gram(1~3) 색인으로 찾습니다.
+한국어는 조사가 명사에 붙어(예: '현재시제는') 부분 매칭이 잦으므로,
+어휘 전체를 훑지 않고 가장 짧은 n-gram 후보 목록만 검증합니다.
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+# 쿼리 토큰 (기존 RAGService.search와 동일한 규칙)
+_QUERY_TOKEN_RE = re.compile(r'[가-힣A-Za-z0-9]+')
+# 텍스트 용어: \b 경계와 일치하도록 \w+ 구간 단위로 분리
+_TERM_RE = re.compile(r'\w+')
+
+# 어휘 n-gram 색인 길이 (1글자 토큰은 unigram, 2글자는 bigram, 그 이상은 trigram)
+_MAX_GRAM = 3
+# 부분 매칭 확장 결과 캐시 최대 크기
+_EXPANSION_CACHE_SIZE = 4096
+
+
+def tokenize_query(query: str) -> List[str]:
+    """쿼리를 소문자 토큰 리스트로 변환 (중복 유지)"""
+    return _QUERY_TOKEN_RE.findall(query.lower())
+
+
+class KeywordIndex:
+    """청크 키워드 역색인"""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}  # 용어 -> {청크 번호: tf}
+        self._grams: Dict[str, List[str]] = {}  # 문자 n-gram -> 해당 n-gram을 포함하는 용어들
+        self._expansions: Dict[str, List[Tuple[str, int]]] = {}  # 토큰 -> [(포함 용어, 출현 수)]
+        self.size = 0  # 색인된 청크 수
+
+    @classmethod
+    def build(cls, texts: Iterable[str]) -> 'KeywordIndex':
+        """청크 텍스트 순서대로 역색인 구축 (청크 번호 = 순서)"""
+        index = cls()
+        for idx, text in enumerate(texts):
+            index.add(idx, text)
+        return index
+
+    def add(self, idx: int, text: str) -> None:
+        """청크 하나를 색인"""
+        postings = self._postings
+        for term, tf in Counter(_TERM_RE.findall((text or '').lower())).items():
+            bucket = postings.get(term)
+            if bucket is None:
+                postings[term] = bucket = {}
+                self._index_grams(term)
+            bucket[idx] = tf
+        self.size = max(self.size, idx + 1)
+        self._expansions.clear()
+
+    def _index_grams(self, term: str) -> None:
+        """새 용어의 문자 n-gram 등록"""
+        grams = self._grams
+        seen = set()
+        for n in range(1, min(_MAX_GRAM, len(term)) + 1):
+            for i in range(len(term) - n + 1):
+                gram = term[i:i + n]
+                if gram in seen:
+                    continue
+                seen.add(gram)
+                bucket = grams.get(gram)
+                if bucket is None:
+                    grams[gram] = bucket = []
+                bucket.append(term)
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings)
+
+    def _candidate_terms(self, substring: str) -> List[str]:
+        """substring을 포함할 수 있는 용어 후보 (가장 짧은 n-gram 목록)"""
+        if len(substring) <= _MAX_GRAM:
+            return self._grams.get(substring, [])
+
+        shortest: List[str] = []
+        for i in range(len(substring) - _MAX_GRAM + 1):
+            bucket = self._grams.get(substring[i:i + _MAX_GRAM])
+            if not bucket:
+                return []
+            if not shortest or len(bucket) < len(shortest):
+                shortest = bucket
+        return shortest
+
+    def _expand(self, token: str) -> List[Tuple[str, int]]:
+        """토큰을 부분 문자열로 포함하는 용어와 용어 내 출현 수"""
+        cached = self._expansions.get(token)
+        if cached is not None:
+            return cached
+
+        if len(token) <= _MAX_GRAM:
+            # n-gram 목록이 곧 포함 용어 목록 (검증 불필요)
+            expansions = [(term, term.count(token)) for term in self._candidate_terms(token)]
+        else:
+            expansions = [
+                (term, term.count(token))
+                for term in self._candidate_terms(token)
+                if token in term
+            ]
+
+        if len(self._expansions) >= _EXPANSION_CACHE_SIZE:
+            self._expansions.clear()
+        self._expansions[token] = expansions
+        return expansions
+
+    def substring_counts(self, token: str) -> Dict[int, int]:
+        """
+        토큰(단어 문자만으로 구성)을 부분 문자열로 포함하는 청크와 출현 수
+
+        선형 스캔의 text.lower().count(token)과 같은 값을 청크별로 반환합니다.
+        """
+        counts: Dict[int, int] = {}
+        postings = self._postings
+        for term, occurrences in self._expand(token):
+            for idx, tf in postings[term].items():
+                counts[idx] = counts.get(idx, 0) + tf * occurrences
+        return counts
+
+    def score(self, query: str) -> List[Tuple[int, float]]:
+        """
+        쿼리 점수 계산
+
+        Returns:
+            List[Tuple[int, float]]: (청크 번호, 점수) 리스트, 점수 내림차순
+            (동점은 청크 순서 유지)
+        """
+        query_tokens = tokenize_query(query)
+        if not query_tokens:
+            return []
+
+        exact: Dict[str, Dict[int, int]] = {}
+        partial: Dict[str, Dict[int, int]] = {}
+        candidates = set()
+        for token in query_tokens:
+            if token in exact:
+                continue
+            exact[token] = self._postings.get(token, {})
+            partial[token] = self.substring_counts(token)
+            candidates.update(exact[token])
+            candidates.update(partial[token])
+
+        results = []
+        for idx in candidates:
+            score = 0
+            for token in query_tokens:
+                count = exact[token].get(idx, 0)
+                if count > 0:
+                    score += count
+                else:
+                    score += partial[token].get(idx, 0) * 0.5
+            if score > 0:
+                results.append((idx, score))
+
+        results.sort(key=lambda x: (-x[1], x[0]))
+        return results
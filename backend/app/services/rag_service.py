@@ -2,15 +2,21 @@
 RAG 서비스 모듈
 
 RAG 인덱스 관리 및 검색 기능을 제공합니다.
+chunks.jsonl이 교체되면(관리자 복원, 재인덱싱) 백그라운드에서 새 인덱스를 만들어
+스냅샷을 원자적으로 교체합니다. 진행 중인 요청은 이전 스냅샷으로 끝까지 처리됩니다.
 """
 from __future__ import annotations
 
-import json
-import re
+import os
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from dataclasses import dataclass
 
+from .chunk_store import ChunkStore, open_chunk_store
+from .keyword_index import KeywordIndex
+
 
 @dataclass
 class RAGResult:
@@ -33,63 +39,241 @@ class RAGResult:
         }
 
 
+@dataclass(frozen=True)
+class ChunkIndexSnapshot:
+    """청크 인덱스 스냅샷 (불변, 교체 단위)"""
+    version: int
+    signature: Tuple
+    store: ChunkStore
+    keyword_index: KeywordIndex
+    chunk_rows: Dict[str, int]  # chunk_id -> 저장소 행 번호
+
+    @property
+    def source_hash(self) -> str:
+        """원본 chunks.jsonl MD5 (파생 인덱스 스냅샷 검증용)"""
+        return self.store.source_md5.hex()
+
+
 class RAGService:
     """RAG 서비스 클래스 (하이브리드 검색 지원)"""
     
+    # 원본 변경 확인 간격 (초)
+    RELOAD_CHECK_INTERVAL = float(os.getenv('RAG_RELOAD_CHECK_INTERVAL', '2.0'))
+    # 파일 쓰기가 끝났다고 판단하기까지 서명이 유지되어야 하는 시간 (초)
+    RELOAD_SETTLE_SECONDS = 0.5
+    
     def __init__(self):
-        self._chunks: Optional[List[Dict]] = None
-        self._chunks_loaded = False
+        self._snapshot: Optional[ChunkIndexSnapshot] = None
+        self._version = 0
+        self._version_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+        self._last_check = 0.0
+        self._failed_signature: Optional[Tuple] = None  # 재구축에 실패한 원본 서명 (다시 바뀔 때까지 재시도 안 함)
         self._hybrid_engine = None
         self._retrieval_mode = 'hybrid'  # 'bm25', 'vector', 'hybrid'
     
-    def _load_chunks(self) -> List[Dict]:
+    def _chunks_file(self) -> Path:
+        """chunks.jsonl 경로"""
+        # Like-Opt용 persist 디렉토리 설정
+        from ..config import Config
+        config = Config()
+        effective_persist_dir = lambda: config.RAG_PERSIST_DIR
+        
+        return Path(effective_persist_dir()) / "chunks.jsonl"
+    
+    def _source_signature(self, chunks_file: Path) -> Tuple:
+        """원본 서명: chunks.jsonl mtime/크기 + manifest.json 해시"""
+        try:
+            st = chunks_file.stat()
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = (None, None)
+        
+        manifest = chunks_file.with_name("manifest.json")
+        manifest_hash = None
+        if manifest.exists():
+            from .indexing_service import indexing_service
+            manifest_hash = indexing_service.get_file_hash(manifest)
+        return signature + (manifest_hash,)
+    
+    def _build_snapshot(self, chunks_file: Path, signature: Tuple, fallback_empty: bool = False) -> ChunkIndexSnapshot:
         """
-        chunks.jsonl 파일에서 청크 로드
+        chunks.jsonl로 새 스냅샷 구축 (청크 저장소 + 키워드 역색인)
+        
+        Args:
+            fallback_empty (bool): 로드 실패 시 빈 저장소 사용 (최초 로드에서만,
+                재구축에서는 예외를 올려 기존 스냅샷을 유지)
         
         Returns:
-            List[Dict]: 청크 리스트
+            ChunkIndexSnapshot: 새 스냅샷
         """
-        if self._chunks_loaded and self._chunks is not None:
-            return self._chunks
-        
         try:
-            # Like-Opt용 persist 디렉토리 설정
-            from ..config import Config
-            config = Config()
-            effective_persist_dir = lambda: config.RAG_PERSIST_DIR
-            
-            persist_dir = Path(effective_persist_dir())
-            chunks_file = persist_dir / "chunks.jsonl"
-            
             # persist 디렉토리가 없으면 생성
-            persist_dir.mkdir(parents=True, exist_ok=True)
+            chunks_file.parent.mkdir(parents=True, exist_ok=True)
             
             if not chunks_file.exists():
                 print(f"[RAG] chunks.jsonl 파일이 없습니다: {chunks_file}")
-                self._chunks = []
-                self._chunks_loaded = True
-                return []
-            
-            chunks = []
-            with open(chunks_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if line.strip():
-                        try:
-                            chunks.append(json.loads(line))
-                        except Exception as e:
-                            print(f"[RAG] 청크 파싱 실패: {e}")
-                            continue
+                store = ChunkStore.empty()
+                keyword_index = KeywordIndex()
+            else:
+                store = open_chunk_store(chunks_file)
+                # 키워드 역색인 구축 (폴백 검색용, 텍스트는 메모리에 유지하지 않음)
+                keyword_index = KeywordIndex.build(store.iter_texts())
+                print(f"[RAG] {len(store)}개 청크 로드 완료 (어휘 {keyword_index.vocabulary_size}개)")
+        except Exception as e:
+            print(f"[RAG] 청크 로드 실패: {e}")
+            if not fallback_empty:
+                raise
+            store = ChunkStore.empty()
+            keyword_index = KeywordIndex()
+        
+        chunk_rows = {}
+        for i in range(len(store)):
+            chunk_id = store.field(i, 'chunk_id')
+            if chunk_id is not None:
+                chunk_rows.setdefault(chunk_id, i)
+        
+        with self._version_lock:
+            self._version += 1
+            version = self._version
+        return ChunkIndexSnapshot(version, signature, store, keyword_index, chunk_rows)
+    
+    def _get_snapshot(self) -> ChunkIndexSnapshot:
+        """
+        현재 스냅샷 반환 (최초 1회는 동기 로드, 이후 변경 감지 시 백그라운드 재구축)
+        
+        요청은 반환된 스냅샷 하나만 끝까지 사용해야 합니다.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._load_lock:
+                if self._snapshot is None:
+                    chunks_file = self._chunks_file()
+                    signature = self._source_signature(chunks_file)
+                    self._snapshot = self._build_snapshot(chunks_file, signature, fallback_empty=True)
+                    self._last_check = time.time()
+                return self._snapshot
+        
+        now = time.time()
+        if now - self._last_check >= self.RELOAD_CHECK_INTERVAL:
+            self._last_check = now
+            self.check_for_update()
+        return snapshot
+    
+    def check_for_update(self) -> bool:
+        """
+        원본 변경 확인 후 백그라운드 재구축 시작
+        
+        Returns:
+            bool: 재구축을 시작했는지 여부
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return False
+        signature = self._source_signature(self._chunks_file())
+        if signature == snapshot.signature or signature == self._failed_signature:
+            return False
+        return self.reload(wait=False)
+    
+    def reload(self, wait: bool = False) -> bool:
+        """
+        인덱스 재구축 후 원자적 교체
+        
+        Args:
+            wait (bool): 재구축 완료까지 대기 여부
             
-            self._chunks = chunks
-            self._chunks_loaded = True
-            print(f"[RAG] {len(chunks)}개 청크 로드 완료")
-            return chunks
+        Returns:
+            bool: 새 재구축을 시작했는지 여부 (이미 진행 중이면 False)
+        """
+        with self._load_lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                thread, started = self._reload_thread, False
+            else:
+                thread = threading.Thread(target=self._reload_worker, name="rag-index-reload", daemon=True)
+                self._reload_thread, started = thread, True
+                thread.start()
+        if wait:
+            thread.join()
+        return started
+    
+    def _reload_worker(self):
+        """백그라운드 재구축: 파일 쓰기가 멈출 때까지 기다린 뒤 구축하고 교체"""
+        signature = None
+        try:
+            chunks_file = self._chunks_file()
+            signature = self._source_signature(chunks_file)
+            while True:
+                time.sleep(self.RELOAD_SETTLE_SECONDS)
+                current = self._source_signature(chunks_file)
+                if current == signature:
+                    break
+                signature = current
             
+            snapshot = self._build_snapshot(chunks_file, signature)
+            # 참조 교체는 원자적: 이후 요청부터 새 스냅샷 사용
+            self._snapshot = snapshot
+            self._failed_signature = None
+            print(f"[RAG] 인덱스 교체 완료 (버전 {snapshot.version})")
         except Exception as e:
-            print(f"[RAG] 청크 로드 실패: {e}")
-            self._chunks = []
-            self._chunks_loaded = True
-            return []
+            # 기존 스냅샷 유지, 같은 원본으로는 재시도하지 않음 (원본이 다시 바뀌거나 reload()를 직접 호출하면 재시도)
+            self._failed_signature = signature
+            print(f"[RAG] 인덱스 재구축 실패, 기존 스냅샷(버전 {self._snapshot.version if self._snapshot else 0}) 유지: {e}")
+    
+    @property
+    def index_version(self) -> int:
+        """현재 인덱스 버전 (교체될 때마다 증가)"""
+        return self._get_snapshot().version
+    
+    @property
+    def persist_dir(self) -> Path:
+        """chunks.jsonl이 있는 persist 디렉토리"""
+        return self._chunks_file().parent
+    
+    @property
+    def source_hash(self) -> str:
+        """현재 인덱스의 원본 chunks.jsonl MD5 (파생 인덱스 스냅샷 검증용)"""
+        return self._get_snapshot().source_hash
+    
+    @property
+    def snapshot(self) -> ChunkIndexSnapshot:
+        """현재 스냅샷 (버전/원본 해시/청크를 같은 스냅샷에서 함께 읽어야 할 때)"""
+        return self._get_snapshot()
+    
+    def iter_documents(self, snapshot: Optional[ChunkIndexSnapshot] = None) -> Iterator[Dict[str, Any]]:
+        """
+        스냅샷의 모든 청크를 문서 형식으로 순회 (고급 RAG 색인용)
+        
+        Args:
+            snapshot: 순회할 스냅샷 (기본: 현재 스냅샷)
+        
+        Yields:
+            Dict[str, Any]: {'id': chunk_id, 'content': text, 'metadata': {...}}
+        """
+        store = (snapshot or self._get_snapshot()).store
+        for i in range(len(store)):
+            chunk = store[i]
+            text = chunk.pop('text', '')
+            yield {
+                'id': chunk.get('chunk_id', ''),
+                'content': text,
+                'metadata': chunk
+            }
+    
+    def get_chunk(self, chunk_id: str) -> Optional[Dict[str, Any]]:
+        """chunk_id로 청크 조회 (없으면 None)"""
+        snapshot = self._get_snapshot()
+        row = snapshot.chunk_rows.get(chunk_id)
+        return None if row is None else snapshot.store[row]
+    
+    def _load_chunks(self) -> ChunkStore:
+        """
+        현재 스냅샷의 청크 저장소 (chunks.jsonl 옆 chunks.bin을 mmap으로 열기, 없으면 생성)
+        
+        Returns:
+            ChunkStore: 청크 저장소 (인덱스로 청크 딕셔너리 접근)
+        """
+        return self._get_snapshot().store
     
     def _get_hybrid_engine(self):
         """하이브리드 검색 엔진 지연 로딩"""
@@ -97,33 +281,18 @@ class RAGService:
             return self._hybrid_engine
         
         try:
-            import os
             from ..domain.rag.hybrid_search import create_hybrid_search_engine
-            from ..domain.rag.vector_indexer import get_default_indexer
             
             # 검색 모드 설정
             self._retrieval_mode = os.getenv('RAG_RETRIEVAL_MODE', 'hybrid')
+            if self._retrieval_mode not in ('bm25', 'vector', 'hybrid'):
+                self._retrieval_mode = 'hybrid'
             
-            # BM25 엔진 (기존 키워드 검색을 BM25로 업그레이드)
-            # 현재는 간단한 키워드 검색을 유지하고, 벡터 검색과 병합
-            bm25_engine = self  # self.search()를 BM25로 사용
-            
-            # 벡터 인덱서
-            try:
-                vector_indexer = get_default_indexer()
-            except Exception as e:
-                print(f"[RAG] Vector indexer not available: {e}")
-                vector_indexer = None
-            
-            # 하이브리드 엔진 생성
+            # 프로세스 상주 BM25/벡터 인덱스 사용 (AdvancedRAGService, 관리자 API와 공유)
             alpha = float(os.getenv('RAG_ALPHA', '0.5'))
-            self._hybrid_engine = create_hybrid_search_engine(
-                bm25_engine=bm25_engine,
-                vector_indexer=vector_indexer,
-                alpha=alpha
-            )
+            self._hybrid_engine = create_hybrid_search_engine(alpha=alpha, mode=self._retrieval_mode)
             
-            print(f"[RAG] Hybrid search engine initialized (mode: {self._retrieval_mode}, alpha: {alpha})")
+            print(f"[RAG] Hybrid search engine initialized (mode: {self._hybrid_engine.effective_mode.value}, alpha: {alpha})")
             return self._hybrid_engine
             
         except Exception as e:
@@ -146,11 +315,23 @@ class RAGService:
         Returns:
             List[RAGResult]: 검색 결과 리스트
         """
+        from ..domain.rag.retrieval_cache import retrieval_cache
+        
         # 하이브리드 검색 시도
         if use_hybrid:
             try:
                 hybrid_engine = self._get_hybrid_engine()
                 if hybrid_engine:
+                    # 캐시 확인 (상주 인덱스 버전이 바뀌면 이전 결과는 적중하지 않음)
+                    cache_key = retrieval_cache.make_key(
+                        'rag-hybrid', query, hybrid_engine.bm25.resident.version,
+                        mode=hybrid_engine.effective_mode.value, top_k=top_k,
+                        alpha=hybrid_engine.alpha, fusion=hybrid_engine.fusion
+                    )
+                    cached = retrieval_cache.get(cache_key)
+                    if cached is not None:
+                        return list(cached)
+                    
                     hybrid_results = hybrid_engine.search(query, top_k=top_k)
                     
                     # HybridSearchResult를 RAGResult로 변환
@@ -165,51 +346,38 @@ class RAGService:
                             source=hr.source
                         ))
                     
+                    retrieval_cache.put(cache_key, rag_results)
                     print(f"[RAG] Hybrid search found {len(rag_results)} results")
-                    return rag_results
+                    return list(rag_results)
             except Exception as e:
                 print(f"[RAG] Hybrid search failed, falling back to keyword search: {e}")
         
-        # 폴백: 기존 키워드 기반 검색
-        chunks = self._load_chunks()
+        # 폴백: 기존 키워드 기반 검색 (요청 동안 같은 스냅샷 사용)
+        snapshot = self._get_snapshot()
+        chunks = snapshot.store
         
         if not chunks:
             return []
         
-        # 간단한 키워드 기반 검색
-        query_lower = query.lower()
-        query_tokens = re.findall(r'[가-힣A-Za-z0-9]+', query_lower)
-        
-        if not query_tokens:
-            return []
+        cache_key = retrieval_cache.make_key('rag-keyword', query, snapshot.version, mode='keyword', top_k=top_k)
+        cached = retrieval_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
         
-        results = []
+        # 역색인 기반 키워드 검색 (쿼리 토큰을 포함한 청크만 점수화)
+        scored = snapshot.keyword_index.score(query)
         
-        for chunk in chunks:
-            text = chunk.get('text', '')
-            text_lower = text.lower()
-            
-            # 점수 계산: 쿼리 토큰이 몇 개나 포함되어 있는지
-            score = 0
-            for token in query_tokens:
-                # 정확한 단어 매칭
-                count = len(re.findall(r'\b' + re.escape(token) + r'\b', text_lower, re.IGNORECASE))
-                if count > 0:
-                    score += count
-                else:
-                    # 부분 문자열 매칭
-                    score += text_lower.count(token) * 0.5
-            
-            if score > 0:
-                results.append({
-                    'chunk': chunk,
-                    'score': score,
-                    'text': text
-                })
+        if not scored:
+            return []
         
-        # 점수 순 정렬
-        results.sort(key=lambda x: x['score'], reverse=True)
-        top_results = results[:top_k]
+        top_results = []
+        for idx, score in scored[:top_k]:
+            chunk = chunks[idx]
+            top_results.append({
+                'chunk': chunk,
+                'score': score,
+                'text': chunk.get('text', '')
+            })
         
         # RAGResult 객체로 변환
         rag_results = []
@@ -224,7 +392,8 @@ class RAGService:
                 source=chunk.get('source', '')
             ))
         
-        return rag_results
+        retrieval_cache.put(cache_key, rag_results)
+        return list(rag_results)
     
     def get_context_for_query(self, query: str, max_chunks: int = 3) -> str:
         """
@@ -284,8 +453,8 @@ class RAGService:
                 'file_count': 0
             }
         
-        # 고유 문서 ID 개수
-        doc_ids = set(chunk.get('doc_id', '') for chunk in chunks)
+        # 고유 문서 ID 개수 (문자열 번호로 집계, 디코딩 없음)
+        doc_ids = set(chunks.field_ids('doc_id'))
         
         return {
             'ready': True,
@@ -300,11 +469,15 @@ class RAGService:
         Returns:
             Dict[str, Any]: 통계 정보
         """
+        from ..domain.rag.retrieval_cache import retrieval_cache
+        
         stats = self.get_index_stats()
         stats.update({
             'index_ready': self.is_index_ready(),
+            'index_version': self.index_version,
             'retrieval_mode': self._retrieval_mode,
-            'hybrid_engine_available': self._hybrid_engine is not None
+            'hybrid_engine_available': self._hybrid_engine is not None,
+            'retrieval_cache': retrieval_cache.stats()
         })
         return stats
 
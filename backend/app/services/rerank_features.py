@@ -0,0 +1,189 @@
+"""
+리랭킹 특징 모듈
+
+RerankEngine의 분류/부스트/증거 점수는 문서 내용(텍스트, 소스)에만 의존하므로
+쿼리마다 다시 계산하지 않고 문서 색인 시 한 번 계산해 문서별 특징 배열에 저장합니다.
+- label: 분류 코드 (uint8, labels 순서)
+- boost: 분류별 부스트 팩터
+- evidence: 텍스트 길이/소스 신뢰도 기반 증거 점수
+
+키워드 규칙은 필드(텍스트/소스)별로 이름 있는 그룹을 가진 정규식 하나로 컴파일해
+한 번의 스캔으로 어떤 규칙이 맞는지 확인합니다.
+리랭킹은 후보들의 특징 행을 모아 score * (1 + boost) + evidence를 한 번에 계산합니다.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# (분류, 검사 필드, 키워드) - 위에서부터 먼저 맞는 분류 사용
+CLASS_RULES = (
+    ('reason', 'text', ('이유', '왜', 'because', 'reason')),
+    ('book', 'source', ('grammar', '문법', 'book')),
+)
+DEFAULT_LABEL = 'other'
+
+# (소스 키워드, 점수) - 먼저 맞는 항목 하나만 적용
+SOURCE_EVIDENCE = (
+    (('official', '공식'), 0.2),
+    (('academic', '학술'), 0.15),
+)
+# (텍스트 길이 하한(초과), 점수) - 먼저 맞는 항목 하나만 적용
+LENGTH_EVIDENCE = ((500, 0.1), (200, 0.05))
+
+FEATURE_DTYPE = np.dtype([('label', 'u1'), ('boost', '<f8'), ('evidence', '<f8')])
+
+
+class KeywordMatcher:
+    """키워드 그룹 여러 개를 정규식 하나로 검사 (대소문자 무시)"""
+
+    def __init__(self, groups: Dict[str, Sequence[str]]):
+        alternatives = [
+            f"(?P<{name}>{'|'.join(re.escape(keyword) for keyword in keywords)})"
+            for name, keywords in groups.items()
+        ]
+        self.pattern = re.compile('|'.join(alternatives), re.IGNORECASE) if alternatives else None
+
+    def groups_in(self, text: str) -> Set[str]:
+        """텍스트에 키워드가 나타나는 그룹 이름"""
+        if self.pattern is None or not text:
+            return set()
+        return {match.lastgroup for match in self.pattern.finditer(text)}
+
+
+class RerankFeatures:
+    """문서별 리랭킹 특징 배열 (doc_id -> 행)"""
+
+    def __init__(self, boost_factors: Dict[str, float]):
+        self.labels: Tuple[str, ...] = tuple(dict.fromkeys([*boost_factors, DEFAULT_LABEL]))
+        self._label_codes = {label: code for code, label in enumerate(self.labels)}
+        self._boosts = [float(boost_factors.get(label, 0.0)) for label in self.labels]
+
+        fields: Dict[str, Dict[str, Sequence[str]]] = {'text': {}, 'source': {}}
+        for i, (_, field, keywords) in enumerate(CLASS_RULES):
+            fields[field][f"c{i}"] = keywords
+        for i, (keywords, _) in enumerate(SOURCE_EVIDENCE):
+            fields['source'][f"e{i}"] = keywords
+        self._text_matcher = KeywordMatcher(fields['text'])
+        self._source_matcher = KeywordMatcher(fields['source'])
+
+        self.source_version: Optional[int] = None  # 특징을 계산한 청크 스냅샷 버전
+        self.rows: Dict[str, int] = {}
+        self._array = np.zeros(64, dtype=FEATURE_DTYPE)
+        self._size = 0
+        self._free: List[int] = []  # 제거된 문서의 행 (다음 추가 문서가 재사용)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def memory_bytes(self) -> int:
+        return int(self._array.nbytes)
+
+    def compute(self, text: str, source: str) -> Tuple[str, float]:
+        """
+        문서 하나의 분류와 증거 점수 계산
+
+        Returns:
+            Tuple[str, float]: (분류, 증거 점수)
+        """
+        matched = self._text_matcher.groups_in(text) | self._source_matcher.groups_in(source)
+
+        label = DEFAULT_LABEL
+        for i, (name, _, _) in enumerate(CLASS_RULES):
+            if f"c{i}" in matched:
+                label = name
+                break
+
+        evidence = 0.0
+        text_length = len(text)
+        for min_length, score in LENGTH_EVIDENCE:
+            if text_length > min_length:
+                evidence += score
+                break
+        for i, (_, score) in enumerate(SOURCE_EVIDENCE):
+            if f"e{i}" in matched:
+                evidence += score
+                break
+        return label, evidence
+
+    def _put(self, doc_id: str, text: str, source: str) -> int:
+        """특징 계산 후 저장 (잠금 안에서 호출, 같은 doc_id는 같은 행을 덮어씀)"""
+        label, evidence = self.compute(text or '', source or '')
+        code = self._label_codes[label]
+        row = self.rows.get(doc_id)
+        if row is None and self._free:
+            row = self._free.pop()
+            self.rows[doc_id] = row
+        elif row is None:
+            if self._size == len(self._array):
+                grown = np.zeros(len(self._array) * 2, dtype=FEATURE_DTYPE)
+                grown[:self._size] = self._array[:self._size]
+                self._array = grown
+            row = self._size
+            self._size += 1
+            self.rows[doc_id] = row
+        self._array[row] = (code, self._boosts[code], evidence)
+        return row
+
+    def add(self, doc_id: str, text: str, source: str) -> None:
+        """문서 특징 계산 (색인/문서 추가 시)"""
+        with self._lock:
+            self._put(doc_id, text, source)
+
+    def add_documents(self, docs: Iterable[Tuple[str, str, Dict[str, Any]]],
+                      version: Optional[int] = None) -> int:
+        """
+        문서 특징 일괄 계산
+
+        Args:
+            docs: (doc_id, 텍스트, 메타데이터)
+            version: 청크 스냅샷 버전 (도중에 reset으로 버전이 바뀌면 중단)
+
+        Returns:
+            int: 계산한 문서 수
+        """
+        count = 0
+        for doc_id, text, metadata in docs:
+            with self._lock:
+                if version is not None and self.source_version != version:
+                    break
+                self._put(doc_id, text, (metadata or {}).get('source', ''))
+            count += 1
+        return count
+
+    def remove(self, doc_id: str) -> None:
+        """문서 특징 제거 (비운 행은 다음에 추가되는 문서가 재사용)"""
+        with self._lock:
+            row = self.rows.pop(doc_id, None)
+            if row is not None:
+                self._free.append(row)
+
+    def reset(self, version: Optional[int] = None) -> None:
+        """모든 특징 제거 (새 청크 스냅샷)"""
+        with self._lock:
+            self.source_version = version
+            self.rows = {}
+            self._array = np.zeros(64, dtype=FEATURE_DTYPE)
+            self._size = 0
+            self._free = []
+
+    def lookup(self, docs: Sequence[Tuple[str, str, str]]) -> np.ndarray:
+        """
+        후보 문서들의 특징 행 (색인되지 않은 문서는 이때 계산해 저장)
+
+        Args:
+            docs: (doc_id, 텍스트, 소스)
+
+        Returns:
+            np.ndarray: FEATURE_DTYPE 배열 (docs 순서)
+        """
+        with self._lock:
+            rows = [
+                self.rows[doc_id] if doc_id in self.rows else self._put(doc_id, text, source)
+                for doc_id, text, source in docs
+            ]
+            return self._array[np.asarray(rows, dtype=np.int64)]
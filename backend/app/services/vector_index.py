@@ -0,0 +1,675 @@
+"""
+벡터 인덱스 모듈
+
+VectorEngine의 임베딩을 하나의 연속 float32 행렬(행 단위 L2 정규화)과
+같은 순서의 doc_id 배열로 보관합니다.
+- 쿼리 하나: 행렬-벡터 곱 한 번 + argpartition으로 상위 k개 선택
+- 쿼리 여러 개: 행렬 곱 한 번으로 모든 쿼리 점수 계산
+행을 미리 정규화하므로 내적이 곧 코사인 유사도입니다.
+
+대규모 코퍼스용 근사 검색(IVF)을 선택적으로 붙일 수 있습니다.
+- 구면 k-means로 nlist개 중심을 학습하고 행마다 가장 가까운 중심(리스트)을 기록
+- 쿼리는 중심 점수 상위 nprobe개 리스트의 행만 점수화 (nprobe↑ = 재현율↑, 지연↑)
+- 추가/삭제 시 리스트 번호를 함께 갱신하므로 재학습 없이 사용 가능
+- 중심과 doc_id별 리스트 번호는 persist 디렉토리(vector_ivf.npz)에 저장
+
+메모리를 줄이기 위해 행렬을 float16 또는 행별 스케일 int8로 저장할 수 있습니다
+(DenseVectorIndex storage/rescore 참고).
+
+공유 행렬: 구축한 행렬을 persist/vectors 아래 읽기 전용 .npy로 기록하면, 워커들은
+numpy memmap으로 열어 호스트당 한 벌의 페이지 캐시를 공유합니다.
+- vector_index.meta.json: 형태/dtype/저장 형식/원본 해시/모델, 세대(generation) 파일 이름
+- vector_index.<세대>.npy (+ .scales.npy), vector_index.<세대>.ids
+세대별 파일을 다 쓴 뒤 메타 파일만 원자적으로 교체하므로, 워커는 메타 세대가 바뀌면
+새 파일을 다시 매핑합니다. 매핑된 인덱스는 첫 변경 시 메모리로 복사됩니다.
+여러 워커가 동시에 기록해도 메타 교체와 이전 세대 정리는 파일 잠금(vector_index.lock)
+안에서 하고, 교체 직전 메타가 가리키던 세대보다 오래된 세대만 지웁니다.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .atomic_file import write_atomic
+
+try:
+    import fcntl
+except ImportError:  # Windows: 잠금 없이 기록 (단일 워커 개발 환경)
+    fcntl = None
+
+IVF_FILENAME = "vector_ivf.npz"
+IVF_VERSION = 1
+SHARED_DIRNAME = "vectors"
+SHARED_META_FILENAME = "vector_index.meta.json"
+SHARED_LOCK_FILENAME = "vector_index.lock"
+SHARED_VERSION = 1
+# 중심 배정 시 한 번에 곱하는 행 수 (메모리 제한)
+_ASSIGN_CHUNK = 8192
+# 양자화 행렬 점수 계산 시 한 번에 float32로 복원하는 행 수 (캐시에 들어가는 크기)
+_SCORE_BLOCK = 4096
+# IVF 학습 표본 수
+_TRAIN_SAMPLES = 50_000
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (영벡터는 그대로)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _new_generation() -> str:
+    """공유 행렬 세대 이름 (UTC 마이크로초 시각 순으로 정렬됨)"""
+    now = time.time()
+    stamp = time.strftime('%Y%m%d%H%M%S', time.gmtime(now)) + f"{int(now % 1 * 1_000_000):06d}"
+    return f"{stamp}-{os.getpid()}-{os.urandom(3).hex()}"
+
+
+class _shared_lock:
+    """공유 행렬 디렉토리 배타 잠금 (fcntl이 없으면 잠금 없음)"""
+
+    def __init__(self, directory: Path):
+        self.path = Path(directory) / SHARED_LOCK_FILENAME
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self.path, "a")
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+def _remove_generations_before(directory: Path, generation: str, keep: str = '') -> int:
+    """generation보다 오래된 세대 파일 삭제 (이미 매핑한 워커는 열린 파일을 계속 사용)"""
+    removed = 0
+    for path in Path(directory).glob("vector_index.*"):
+        name = path.name
+        if name in (SHARED_META_FILENAME, SHARED_LOCK_FILENAME) or name.endswith(".tmp"):
+            continue
+        file_generation = name.split(".")[1]
+        if file_generation == keep or not file_generation < generation:
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+class IVFQuantizer:
+    """IVF 조대 양자화기 (정규화된 k-means 중심)"""
+
+    def __init__(self, centroids: np.ndarray):
+        self.centroids = normalize_rows(centroids)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        nlist: int,
+        iterations: int = 10,
+        max_samples: int = 50_000,
+        seed: int = 0,
+    ) -> 'IVFQuantizer':
+        """
+        구면 k-means 학습 (정규화된 행 기준)
+
+        Args:
+            vectors: 정규화된 임베딩 [n, dim]
+            nlist: 중심 수
+            max_samples: 학습에 쓰는 최대 표본 수
+        """
+        rng = np.random.default_rng(seed)
+        n = len(vectors)
+        nlist = max(1, min(nlist, n))
+        sample = vectors if n <= max_samples else vectors[np.sort(rng.choice(n, max_samples, replace=False))]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = cls(centroids).assign(sample)
+            order = np.argsort(labels, kind="stable")
+            counts = np.bincount(labels, minlength=nlist)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            filled = counts > 0
+            sums = np.add.reduceat(sample[order], starts[filled], axis=0)
+            centroids[filled] = sums
+            # 빈 중심은 임의 표본으로 다시 시작
+            empty = np.flatnonzero(~filled)
+            if len(empty):
+                centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+            centroids = normalize_rows(centroids)
+        return cls(centroids)
+
+    def assign(self, vectors: np.ndarray) -> np.ndarray:
+        """행별 가장 가까운 중심 번호"""
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), _ASSIGN_CHUNK):
+            block = vectors[start:start + _ASSIGN_CHUNK]
+            labels[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        return labels
+
+
+class DenseVectorIndex:
+    """
+    정규화된 임베딩 행렬 + doc_id 배열 (전수 내적 검색)
+
+    storage로 행렬 저장 형식을 고를 수 있습니다.
+    - float32: 그대로 저장
+    - float16: 절반 크기, 점수 계산 시 블록 단위로 float32 변환
+      (numpy의 float16 변환이 느려 전수 검색이 float32보다 수 배~10배 느림)
+    - int8: 행마다 스케일(최대 절댓값 / 127)로 양자화, 1/4 크기 (전수 검색 약 2배)
+    rescore > 0이고 source가 있으면 양자화 점수 상위 top_k * rescore개를 source가
+    돌려주는 원본 임베딩으로 다시 점수화합니다. 원본 사본은 인덱스에 두지 않으므로
+    메모리는 양자화 행렬 크기 그대로입니다.
+
+    변경(add_many/remove/IVF 학습·로드)과 검색은 인스턴스 잠금 안에서 실행되므로
+    여러 스레드에서 함께 호출해도 됩니다.
+    """
+
+    STORAGE_TYPES = {'float32': np.float32, 'float16': np.float16, 'int8': np.int8}
+
+    def __init__(self, dim: Optional[int] = None, storage: str = 'float32', rescore: int = 0):
+        if storage not in self.STORAGE_TYPES:
+            raise ValueError(f"지원하지 않는 저장 형식: {storage}")
+        self.dim = dim
+        self.storage = storage
+        self.rescore = rescore if storage != 'float32' else 0
+        self.ids: List[str] = []  # 행 번호 -> doc_id
+        self.id_index: Dict[str, int] = {}  # doc_id -> 행 번호
+        self._matrix = np.zeros((0, dim or 0), dtype=self.STORAGE_TYPES[storage])  # 여유 용량 포함
+        self._scales = np.zeros(0, dtype=np.float32)  # int8 행별 스케일
+        # 재점수화용 원본 임베딩 조회 (doc_id 목록 -> 행별 float32 벡터, 없는 행은 None)
+        self.source: Optional[Callable[[List[str]], List[Optional[np.ndarray]]]] = None
+        self.ivf: Optional[IVFQuantizer] = None  # 근사 검색 중심 (학습 전 None)
+        self.nprobe = 32  # 근사 검색 시 훑는 리스트 수
+        self._assign = np.zeros(0, dtype=np.int32)  # 행별 리스트 번호 (여유 용량 포함)
+        self._lists: Optional[Tuple[np.ndarray, np.ndarray]] = None  # (행 순서, 리스트 오프셋)
+        self.generation: Optional[str] = None  # 공유 행렬 세대 (매핑 중일 때)
+        self._mapped = False  # 행 배열이 읽기 전용 memmap인지
+        # 추가/삭제와 검색 직렬화 (삭제는 마지막 행을 옮기고 확장은 행렬을 교체하므로
+        # 검색 도중 바뀌면 다른 doc_id를 반환할 수 있음, 행렬 곱은 BLAS가 이미 병렬)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.id_index
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """사용 중인 행만의 뷰 (저장 형식 그대로, 복사 없음)"""
+        return self._matrix[:len(self.ids)]
+
+    def vectors(self, rows=None) -> np.ndarray:
+        """float32로 복원한 행 (rows 없으면 전체)"""
+        with self._lock:
+            if rows is None:
+                rows = slice(0, len(self.ids))
+            block = self._matrix[rows].astype(np.float32)
+            if self.storage == 'int8':
+                block *= self._scales[rows][..., None]
+            return block
+
+    # ---- 저장 ----
+
+    def _quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """정규화된 float32 행을 저장 형식으로 변환 (int8이면 행별 스케일 포함)"""
+        if self.storage == 'int8':
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            return quantized, scales.astype(np.float32)
+        return vectors.astype(self.STORAGE_TYPES[self.storage]), None
+
+    def _write(self, rows, vectors: np.ndarray) -> None:
+        stored, scales = self._quantize(vectors)
+        self._matrix[rows] = stored
+        if scales is not None:
+            self._scales[rows] = scales
+
+    def _grow(self, needed: int) -> None:
+        """행 배열들을 두 배씩 확장"""
+        size = len(self.ids)
+        capacity = max(needed, 2 * len(self._matrix), 64)
+
+        def grown(array: np.ndarray) -> np.ndarray:
+            out = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            out[:size] = array[:size]
+            return out
+
+        self._matrix = grown(self._matrix)
+        if self.storage == 'int8':
+            self._scales = grown(self._scales)
+        if self.ivf is not None:
+            self._assign = grown(self._assign)
+
+    def add(self, doc_id: str, vector: np.ndarray) -> None:
+        """임베딩 하나 추가 (같은 ID가 있으면 교체)"""
+        self.add_many([doc_id], np.asarray(vector).reshape(1, -1))
+
+    def _detach(self) -> None:
+        """공유 memmap을 프로세스 메모리로 복사 (변경 전 호출, 이후 공유 세대와 분리)"""
+        self.generation = None
+        if not self._mapped:
+            return
+        self._matrix = np.array(self._matrix)
+        self._scales = np.array(self._scales)
+        self._mapped = False
+
+    def add_many(self, doc_ids: Sequence[str], vectors: np.ndarray) -> None:
+        """임베딩 일괄 추가 (행렬 용량은 두 배씩 확장)"""
+        with self._lock:
+            if len(doc_ids) == 0:
+                return
+            self._detach()
+            vectors = np.asarray(vectors).reshape(len(doc_ids), -1)
+            # 한 배치에 같은 ID가 여러 번 오면 처음 위치에 마지막 벡터만 반영 (add를 차례로 호출한 것과 같게)
+            last = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+            if len(last) < len(doc_ids):
+                doc_ids = list(last)
+                vectors = vectors[list(last.values())]
+            vectors = normalize_rows(vectors)
+            if self.dim is None or len(self.ids) == 0:
+                if self.dim != vectors.shape[1] or self._matrix.shape[1] != vectors.shape[1]:
+                    self.dim = vectors.shape[1]
+                    self._matrix = np.zeros((0, self.dim), dtype=self.STORAGE_TYPES[self.storage])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"임베딩 차원 불일치: {vectors.shape[1]} != {self.dim}")
+
+            labels = self.ivf.assign(vectors) if self.ivf is not None else None
+            self._lists = None
+
+            new_rows = []
+            for i, doc_id in enumerate(doc_ids):
+                row = self.id_index.get(doc_id)
+                if row is not None:
+                    self._write(slice(row, row + 1), vectors[i:i + 1])
+                    if labels is not None:
+                        self._assign[row] = labels[i]
+                else:
+                    self.id_index[doc_id] = len(self.ids) + len(new_rows)
+                    new_rows.append(i)
+            if not new_rows:
+                return
+
+            size = len(self.ids)
+            needed = size + len(new_rows)
+            if needed > len(self._matrix):
+                self._grow(needed)
+            self._write(slice(size, needed), vectors[new_rows])
+            if labels is not None:
+                self._assign[size:needed] = labels[new_rows]
+            self.ids.extend(doc_ids[i] for i in new_rows)
+
+    def remove(self, doc_id: str) -> bool:
+        """임베딩 삭제 (마지막 행을 빈자리로 옮김)"""
+        with self._lock:
+            if doc_id not in self.id_index:
+                return False
+            self._detach()
+            row = self.id_index.pop(doc_id)
+            last = len(self.ids) - 1
+            self._lists = None
+            if row != last:
+                moved = self.ids[last]
+                self._matrix[row] = self._matrix[last]
+                if self.storage == 'int8':
+                    self._scales[row] = self._scales[last]
+                if self.ivf is not None:
+                    self._assign[row] = self._assign[last]
+                self.ids[row] = moved
+                self.id_index[moved] = row
+            self.ids.pop()
+            return True
+
+    # ---- 점수 계산 ----
+
+    def _dot(self, rows, queries: np.ndarray) -> np.ndarray:
+        """행들과 쿼리들의 내적 [행 수, 쿼리 수] (저장 형식 복원은 블록 단위)"""
+        scores = self._matrix[rows].astype(np.float32, copy=False) @ queries.T
+        if self.storage == 'int8':
+            scores *= self._scales[rows][:, None]
+        return scores
+
+    def _score_all(self, queries: np.ndarray) -> np.ndarray:
+        """
+        전체 행 점수 [n, 쿼리 수]
+
+        양자화 형식은 _SCORE_BLOCK 행씩 재사용 버퍼에 float32로 복원한 뒤 행렬 곱
+        (블록마다 새 배열을 만들지 않고, 누적은 float32 BLAS)
+        """
+        n = len(self.ids)
+        if self.storage == 'float32':
+            return self.matrix @ queries.T
+        scores = np.empty((n, len(queries)), dtype=np.float32)
+        buffer = np.empty((min(n, _SCORE_BLOCK), self.dim), dtype=np.float32)
+        queries_t = np.ascontiguousarray(queries.T, dtype=np.float32)
+        for start in range(0, n, _SCORE_BLOCK):
+            end = min(start + _SCORE_BLOCK, n)
+            block = buffer[:end - start]
+            np.copyto(block, self._matrix[start:end], casting='unsafe')
+            np.matmul(block, queries_t, out=scores[start:end])
+            if self.storage == 'int8':
+                scores[start:end] *= self._scales[start:end, None]
+        return scores
+
+    def _select(self, rows: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """상위 k개 (점수 내림차순, 동점은 행 순서)"""
+        if len(rows) > k:
+            part = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[part], scores[part]
+        order = np.lexsort((rows, -scores))
+        return rows[order], scores[order]
+
+    def _finish(self, rows: np.ndarray, scores: np.ndarray, query: np.ndarray, top_k: int) -> List[Tuple[str, float]]:
+        """후보 행에서 상위 k개 선택 (재점수화 설정 시 원본으로 다시 점수화)"""
+        if top_k <= 0 or len(rows) == 0:
+            return []
+        if self.rescore and self.source is not None:
+            rows, scores = self._select(rows, scores, top_k * self.rescore)
+            scores = self._rescore(rows, scores, query)
+        rows, scores = self._select(rows, scores, top_k)
+        return [(self.ids[row], float(score)) for row, score in zip(rows.tolist(), scores.tolist())]
+
+    def _rescore(self, rows: np.ndarray, scores: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """원본 임베딩이 있는 후보만 다시 점수화 (없는 후보는 양자화 점수 유지)"""
+        originals = self.source([self.ids[row] for row in rows.tolist()])
+        found = [i for i, vector in enumerate(originals) if vector is not None]
+        if not found:
+            return scores
+        vectors = np.stack([np.asarray(originals[i], dtype=np.float32).reshape(-1) for i in found])
+        if vectors.shape[1] != self.dim:
+            return scores
+        scores = scores.copy()
+        scores[found] = normalize_rows(vectors) @ query
+        return scores
+
+    def search(
+        self,
+        query_vector: np.ndarray,
+        top_k: int = 10,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        코사인 유사도 상위 k개
+
+        Args:
+            nprobe: 근사 검색 리스트 수 (기본: self.nprobe, IVF 미학습이면 전수 검색)
+        """
+        with self._lock:
+            if not self.ids:
+                return []
+            query = normalize_rows(np.asarray(query_vector).reshape(-1))
+            if self._use_ivf(nprobe):
+                return self._search_ivf(query, query @ self.ivf.centroids.T, top_k, nprobe or self.nprobe)
+            return self.search_exact(query, top_k)
+
+    def search_exact(self, query_vector: np.ndarray, top_k: int = 10) -> List[Tuple[str, float]]:
+        """IVF와 관계없이 전수 검색 (재현율 측정 기준)"""
+        with self._lock:
+            if not self.ids:
+                return []
+            query = normalize_rows(np.asarray(query_vector).reshape(-1))
+            scores = self._score_all(query[None, :])[:, 0]
+            return self._finish(np.arange(len(self.ids)), scores, query, top_k)
+
+    def search_many(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int = 10,
+        nprobe: Optional[int] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """여러 쿼리를 행렬 곱 한 번으로 검색 (IVF면 중심 점수만 한 번에 계산)"""
+        with self._lock:
+            queries = normalize_rows(np.asarray(query_vectors).reshape(len(query_vectors), -1))
+            if not self.ids:
+                return [[] for _ in range(len(queries))]
+            if self._use_ivf(nprobe):
+                centroid_scores = queries @ self.ivf.centroids.T
+                return [
+                    self._search_ivf(query, scores, top_k, nprobe or self.nprobe)
+                    for query, scores in zip(queries, centroid_scores)
+                ]
+            scores = self._score_all(queries)
+            rows = np.arange(len(self.ids))
+            return [self._finish(rows, scores[:, j], query, top_k) for j, query in enumerate(queries)]
+
+    # ---- IVF 근사 검색 ----
+
+    def _use_ivf(self, nprobe: Optional[int]) -> bool:
+        return self.ivf is not None and (nprobe or self.nprobe) < self.ivf.nlist
+
+    def train_ivf(self, nlist: Optional[int] = None, iterations: int = 10) -> IVFQuantizer:
+        """
+        현재 임베딩으로 IVF 중심 학습 후 모든 행 배정
+
+        Args:
+            nlist: 중심 수 (기본: 4 * sqrt(n))
+        """
+        with self._lock:
+            n = len(self.ids)
+            if nlist is None:
+                nlist = max(1, int(4 * np.sqrt(n)))
+            sample = np.arange(n)
+            if n > _TRAIN_SAMPLES:
+                sample = np.sort(np.random.default_rng(0).choice(n, _TRAIN_SAMPLES, replace=False))
+            self.ivf = IVFQuantizer.train(self.vectors(sample), nlist, iterations=iterations)
+            self._assign = np.zeros(len(self._matrix), dtype=np.int32)
+            for start in range(0, n, _SCORE_BLOCK):
+                end = min(start + _SCORE_BLOCK, n)
+                self._assign[start:end] = self.ivf.assign(self.vectors(slice(start, end)))
+            self._lists = None
+            return self.ivf
+
+    def _inverted_lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        """리스트별 행 번호 (CSR: 행 순서, 리스트 오프셋), 변경 후 첫 검색 때 재계산"""
+        lists = self._lists
+        if lists is None:
+            assign = self._assign[:len(self.ids)]
+            order = np.argsort(assign, kind="stable").astype(np.int64)
+            offsets = np.zeros(self.ivf.nlist + 1, dtype=np.int64)
+            np.cumsum(np.bincount(assign, minlength=self.ivf.nlist), out=offsets[1:])
+            lists = self._lists = (order, offsets)
+        return lists
+
+    def _search_ivf(self, query: np.ndarray, centroid_scores: np.ndarray, top_k: int, nprobe: int):
+        order, offsets = self._inverted_lists()
+        nprobe = min(nprobe, self.ivf.nlist)
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        rows = np.concatenate([order[offsets[p]:offsets[p + 1]] for p in probes])
+        if len(rows) == 0:
+            return []
+        return self._finish(rows, self._dot(rows, query[None, :])[:, 0], query, top_k)
+
+    def save_ivf(self, path: Path, source_hash: str = '') -> None:
+        """IVF 중심과 doc_id별 리스트 번호 저장 (임시 파일에 쓴 뒤 원자적으로 교체)"""
+        with self._lock:
+            if self.ivf is None:
+                return
+            header = {
+                'version': IVF_VERSION,
+                'source_hash': source_hash,
+                'dim': self.dim,
+                'nlist': self.ivf.nlist,
+                'count': len(self.ids),
+                'created_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            write_atomic(path, lambda f: np.savez(
+                f,
+                header=np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+                centroids=self.ivf.centroids,
+                ids=np.frombuffer("\0".join(self.ids).encode("utf-8"), dtype=np.uint8),
+                assign=self._assign[:len(self.ids)],
+            ))
+
+    def load_ivf(self, path: Path, source_hash: str = '') -> bool:
+        """
+        저장된 IVF 적용 (원본 해시/차원이 다르면 False)
+
+        저장 이후 새로 생긴 문서는 중심에 다시 배정합니다.
+        """
+        with self._lock:
+            path = Path(path)
+            if not path.exists() or not self.ids:
+                return False
+            try:
+                with np.load(path) as data:
+                    header = json.loads(data["header"].tobytes().decode("utf-8"))
+                    if (header.get('version') != IVF_VERSION
+                            or header.get('source_hash') != source_hash
+                            or header.get('dim') != self.dim):
+                        return False
+                    centroids = data["centroids"]
+                    saved_ids = data["ids"].tobytes().decode("utf-8").split("\0") if header['count'] else []
+                    saved_assign = data["assign"]
+            except Exception:
+                return False
+
+            self.ivf = IVFQuantizer(centroids)
+            saved = dict(zip(saved_ids, saved_assign.tolist()))
+            assign = np.zeros(len(self._matrix), dtype=np.int32)
+            missing = []
+            for row, doc_id in enumerate(self.ids):
+                label = saved.get(doc_id)
+                if label is None:
+                    missing.append(row)
+                else:
+                    assign[row] = label
+            if missing:
+                assign[missing] = self.ivf.assign(self.vectors(np.asarray(missing)))
+            self._assign = assign
+            self._lists = None
+            return True
+
+    # ---- 공유 행렬 (memmap) ----
+
+    def save_shared(self, directory: Path, source_hash: str = '', model_name: str = '') -> Path:
+        """
+        행렬을 세대별 .npy로 기록하고 메타 파일을 원자적으로 교체
+
+        Returns:
+            Path: 메타 파일 경로
+
+        Raises:
+            OSError: 기록 실패 (메타 교체 전에 세대 파일이 지워진 경우 포함)
+        """
+        with self._lock:
+            directory = Path(directory)
+            directory.mkdir(parents=True, exist_ok=True)
+            n = len(self.ids)
+            generation = _new_generation()
+            prefix = f"vector_index.{generation}"
+
+            files = {'matrix': f"{prefix}.npy", 'ids': f"{prefix}.ids"}
+            write_atomic(directory / files['matrix'], lambda f: np.save(f, self._matrix[:n]))
+            if self.storage == 'int8':
+                files['scales'] = f"{prefix}.scales.npy"
+                write_atomic(directory / files['scales'], lambda f: np.save(f, self._scales[:n]))
+            write_atomic(directory / files['ids'], lambda f: f.write("\n".join(self.ids).encode("utf-8")))
+
+            meta = {
+                'version': SHARED_VERSION,
+                'generation': generation,
+                'files': files,
+                'shape': [n, self.dim or 0],
+                'dtype': str(self._matrix.dtype),
+                'storage': self.storage,
+                'source_hash': source_hash,
+                'provider': model_name,
+                # 관리 화면(_read_vector_meta) 호환 필드
+                'indexed_count': n,
+                'dimension': self.dim or 0,
+                'created_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            meta_path = directory / SHARED_META_FILENAME
+            with _shared_lock(directory):
+                missing = [name for name in files.values() if not (directory / name).exists()]
+                if missing:
+                    raise OSError(f"공유 행렬 세대 파일이 없습니다: {', '.join(missing)}")
+                previous = self.read_shared_meta(directory)
+                write_atomic(meta_path, lambda f: f.write(
+                    json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8")
+                ))
+
+                # 교체 전 메타 세대보다 오래된 세대만 정리 (그 세대를 매핑한 워커와
+                # 아직 메타를 교체하지 않은 다른 기록자의 새 세대는 남김)
+                if previous is not None:
+                    _remove_generations_before(directory, previous.get('generation') or '', keep=generation)
+            self.generation = generation
+            return meta_path
+
+    @staticmethod
+    def read_shared_meta(directory: Path) -> Optional[Dict]:
+        """공유 행렬 메타 (없거나 손상되면 None)"""
+        try:
+            with open(Path(directory) / SHARED_META_FILENAME, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            return meta if meta.get('version') == SHARED_VERSION else None
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def open_shared(cls, directory: Path, meta: Optional[Dict] = None) -> Optional['DenseVectorIndex']:
+        """
+        공유 행렬을 memmap으로 열기 (읽기 전용, 첫 변경 시 메모리로 복사)
+
+        Returns:
+            DenseVectorIndex 또는 None (메타/파일 없음, 형태 불일치)
+        """
+        directory = Path(directory)
+        meta = meta or cls.read_shared_meta(directory)
+        if meta is None:
+            return None
+        try:
+            files = meta['files']
+            n, dim = meta['shape']
+            index = cls(dim or None, storage=meta['storage'])
+            matrix = np.load(directory / files['matrix'], mmap_mode='r')
+            if matrix.shape != (n, dim) or str(matrix.dtype) != meta['dtype']:
+                return None
+            with open(directory / files['ids'], "r", encoding="utf-8") as f:
+                ids = f.read().split("\n") if n else []
+            if len(ids) != n:
+                return None
+            index._matrix = matrix
+            if 'scales' in files:
+                index._scales = np.load(directory / files['scales'], mmap_mode='r')
+        except (OSError, KeyError, ValueError, TypeError):
+            return None
+
+        index.ids = ids
+        index.id_index = {doc_id: i for i, doc_id in enumerate(ids)}
+        index.generation = meta['generation']
+        index._mapped = True
+        return index
+
+    def memory_bytes(self) -> int:
+        """프로세스 전용 메모리 (공유 memmap 행렬 제외)"""
+        total = self._assign.nbytes
+        if self.ivf is not None:
+            total += self.ivf.centroids.nbytes
+        if self._mapped:
+            return int(total)
+        total += self._matrix.nbytes
+        if self.storage == 'int8':
+            total += self._scales.nbytes
+        return int(total)
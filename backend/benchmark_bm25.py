@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+BM25 검색 벤치마크
+
+순수 Python BM25Engine.search와 NumPy CSR 인덱스(FrozenBM25Index)를 비교합니다.
+CSR 인덱스는 전수 점수화(search_exhaustive)와 MaxScore 가지치기(search)를 따로 측정합니다.
+합성 코퍼스(Zipf 분포 토큰)를 만들고 색인/고정 시간, 쿼리 지연, 상위 결과 일치율을 출력합니다.
+
+    python benchmark_bm25.py --docs 50000 --queries 200
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.resolve()
+sys.path.insert(0, str(project_root))
+
+from app.services.advanced_rag_service import BM25Engine
+
+
+def make_corpus(num_docs: int, vocab_size: int, seed: int = 42):
+    """합성 코퍼스 생성 (한국어 조사처럼 흔한 토큰이 섞인 Zipf 분포)"""
+    rng = random.Random(seed)
+    vocab = [f"단어{i}" for i in range(vocab_size)]
+    weights = [1.0 / (i + 1) for i in range(vocab_size)]
+    docs = []
+    for i in range(num_docs):
+        length = rng.randint(20, 200)
+        docs.append((f"doc_{i}", " ".join(rng.choices(vocab, weights, k=length)), None))
+    queries = [" ".join(rng.choices(vocab, weights, k=rng.randint(1, 5))) for _ in range(1000)]
+    return docs, queries
+
+
+def time_queries(search, queries, top_k):
+    """쿼리별 지연 측정 (ms)"""
+    latencies = []
+    results = []
+    for q in queries:
+        t0 = time.perf_counter()
+        results.append(search(q, top_k))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    return results, latencies
+
+
+def summarize(name, latencies):
+    n = len(latencies)
+    p50 = latencies[n // 2]
+    p95 = latencies[min(n - 1, int(n * 0.95))]
+    print(f"  {name:<10} 평균 {sum(latencies) / n:8.3f}ms  p50 {p50:8.3f}ms  p95 {p95:8.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 검색 벤치마크")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--vocab", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"코퍼스 생성: 문서 {args.docs}개, 어휘 {args.vocab}개")
+    docs, queries = make_corpus(args.docs, args.vocab)
+    queries = queries[:args.queries]
+
+    engine = BM25Engine()
+    t0 = time.perf_counter()
+    engine.add_documents(docs)
+    print(f"일괄 색인: {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+    python_results, python_latencies = time_queries(engine.search, queries, args.top_k)
+
+    t0 = time.perf_counter()
+    frozen = engine.freeze()
+    if frozen is None:
+        print("numpy가 없어 CSR 인덱스를 비교할 수 없습니다.")
+        return
+    print(f"CSR 고정: {(time.perf_counter() - t0) * 1000:.1f}ms, 배열 {frozen.memory_bytes() / 1024 / 1024:.1f}MB")
+
+    numpy_results, numpy_latencies = time_queries(frozen.search_exhaustive, queries, args.top_k)
+    pruned_results, pruned_latencies = time_queries(frozen.search, queries, args.top_k)
+
+    # 상위 결과 일치율 (float32 반올림 차이로 동점 순서만 다를 수 있음)
+    same = sum(
+        1 for a, b in zip(python_results, numpy_results)
+        if {d for d, _ in a} == {d for d, _ in b}
+    )
+
+    print(f"쿼리 {len(queries)}개, top_k={args.top_k}")
+    summarize("python", python_latencies)
+    summarize("numpy", numpy_latencies)
+    summarize("maxscore", pruned_latencies)
+    print(f"  상위 {args.top_k} 집합 일치: {same}/{len(queries)}")
+    # 가지치기 결과는 전수 점수화와 문서/점수/순서까지 같아야 함
+    identical = sum(1 for a, b in zip(numpy_results, pruned_results) if a == b)
+    print(f"  가지치기 결과 동일: {identical}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
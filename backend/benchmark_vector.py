@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+벡터 검색 벤치마크
+
+전수 내적 검색(DenseVectorIndex.search_exact)과 IVF 근사 검색을 비교합니다.
+군집 구조가 있는 합성 임베딩을 만들고 nprobe별 지연과 recall@10을 출력합니다.
+저장 형식(float16, int8, int8 + 원본 재점수화)별 메모리와 float32 대비 recall@10도 출력합니다.
+
+    python benchmark_vector.py --docs 200000 --dim 384 --nprobe 8 16 32 64
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.resolve()
+sys.path.insert(0, str(project_root))
+
+from app.services.vector_index import DenseVectorIndex
+
+
+def make_embeddings(num_docs: int, dim: int, num_queries: int, seed: int = 42):
+    """합성 임베딩 생성 (주제 중심 주변에 흩어진 문서, 문서를 변형한 쿼리)"""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((max(8, num_docs // 500), dim)).astype(np.float32)
+    labels = rng.integers(0, len(topics), num_docs)
+    docs = topics[labels] + 0.8 * rng.standard_normal((num_docs, dim)).astype(np.float32)
+    picks = rng.integers(0, num_docs, num_queries)
+    queries = docs[picks] + 0.6 * rng.standard_normal((num_queries, dim)).astype(np.float32)
+    return docs, queries
+
+
+def time_queries(search, queries, top_k):
+    """쿼리별 결과와 지연 (ms)"""
+    results, latencies = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        results.append(search(q, top_k))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    return results, latencies
+
+
+def recall_at_k(exact, approx, k):
+    hits = sum(len({d for d, _ in e[:k]} & {d for d, _ in a[:k]}) for e, a in zip(exact, approx))
+    return hits / (k * len(exact))
+
+
+def summarize(name, latencies, recall=None):
+    n = len(latencies)
+    p50 = latencies[n // 2]
+    p95 = latencies[min(n - 1, int(n * 0.95))]
+    line = f"  {name:<12} 평균 {sum(latencies) / n:8.3f}ms  p50 {p50:8.3f}ms  p95 {p95:8.3f}ms"
+    if recall is not None:
+        line += f"  recall@10 {recall:.3f}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벡터 검색 벤치마크")
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    print(f"임베딩 생성: 문서 {args.docs}개, 차원 {args.dim}")
+    docs, queries = make_embeddings(args.docs, args.dim, args.queries)
+
+    doc_ids = [f"doc_{i}" for i in range(args.docs)]
+    index = DenseVectorIndex()
+    index.add_many(doc_ids, docs)
+
+    exact, exact_latencies = time_queries(index.search_exact, queries, 10)
+
+    print(f"저장 형식별 전수 검색 (쿼리 {len(queries)}개, top_k=10)")
+    summarize("float32", exact_latencies)
+    print(f"  {'':<12} 행렬 {index.memory_bytes() / 1024 / 1024:8.1f}MB")
+    for storage, rescore in (("float16", 0), ("int8", 0), ("int8", 4)):
+        quantized = DenseVectorIndex(storage=storage, rescore=rescore)
+        quantized.add_many(doc_ids, docs)
+        # 원본 임베딩 조회 (실서비스는 임베딩 캐시, 인덱스 메모리에는 포함되지 않음)
+        quantized.source = lambda ids: [docs[int(doc_id[4:])] for doc_id in ids]
+        results, latencies = time_queries(quantized.search_exact, queries, 10)
+        name = storage if not rescore else f"{storage}+rs{rescore}"
+        summarize(name, latencies, recall_at_k(exact, results, 10))
+        print(f"  {'':<12} 행렬 {quantized.memory_bytes() / 1024 / 1024:8.1f}MB "
+              f"({quantized.memory_bytes() / index.memory_bytes():.0%})")
+        del quantized
+    del docs
+
+    t0 = time.perf_counter()
+    index.train_ivf(args.nlist)
+    print(f"IVF 학습: 리스트 {index.ivf.nlist}개, {(time.perf_counter() - t0) * 1000:.0f}ms")
+
+    print(f"쿼리 {len(queries)}개, top_k=10")
+    summarize("exact", exact_latencies)
+    for nprobe in args.nprobe:
+        approx, latencies = time_queries(
+            lambda q, k: index.search(q, k, nprobe=nprobe), queries, 10
+        )
+        summarize(f"nprobe={nprobe}", latencies, recall_at_k(exact, approx, 10))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RAG 키워드 검색 테스트
+역색인 기반 검색이 기존 선형 스캔과 같은 결과/점수를 내는지 확인합니다.
+"""
+
+import re
+import sys
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.resolve()
+sys.path.insert(0, str(project_root))
+
+from app.services.keyword_index import KeywordIndex
+
+
+SAMPLE_TEXTS = [
+    "현재시제 (Present Tense)\n\n현재시제는 현재의 상태나 습관적인 행동을 나타냅니다. 예: I play soccer.",
+    "과거시제 (Past Tense)\n\n과거시제는 과거에 일어난 일을 나타냅니다. 예: I played soccer yesterday.",
+    "현재완료시제는 have/has + 과거분사를 사용합니다. 예: I have played soccer since 2010.",
+    "관계대명사 who, which, that은 앞의 명사를 꾸며줍니다. That is the player who plays soccer.",
+    "",
+    "aaa aa a_aa aaaa 2010년 2010",
+]
+
+
+def _linear_scan(texts, query):
+    """기존 RAGService.search 폴백 로직 (비교 기준)"""
+    query_tokens = re.findall(r'[가-힣A-Za-z0-9]+', query.lower())
+    results = []
+    for idx, text in enumerate(texts):
+        text_lower = text.lower()
+        score = 0
+        for token in query_tokens:
+            count = len(re.findall(r'\b' + re.escape(token) + r'\b', text_lower, re.IGNORECASE))
+            if count > 0:
+                score += count
+            else:
+                score += text_lower.count(token) * 0.5
+        if score > 0:
+            results.append((idx, score))
+    results.sort(key=lambda x: x[1], reverse=True)
+    return results
+
+
+def _load_texts():
+    chunks_file = project_root / ".like" / "persist" / "chunks.jsonl"
+    texts = list(SAMPLE_TEXTS)
+    if chunks_file.exists():
+        with open(chunks_file, 'r', encoding='utf-8') as f:
+            texts.extend(json.loads(line).get('text', '') for line in f if line.strip())
+    return texts
+
+
+def test_keyword_index_matches_linear_scan():
+    """역색인 점수가 선형 스캔과 동일한지 확인"""
+    texts = _load_texts()
+    index = KeywordIndex.build(texts)
+
+    queries = [
+        "현재시제", "현재", "시제", "과거시제 설명", "soccer", "play", "a", "aa",
+        "2010", "who plays", "soccer soccer", "관계대명사는", "없는단어", "!!!",
+        "완료", "시제는", "layed", "occer", "과거분사",
+    ]
+    for query in queries:
+        expected = _linear_scan(texts, query)
+        actual = index.score(query)
+        print(f"'{query}': {len(actual)}개")
+        assert actual == expected, query
+
+
+def _random_corpus(seed, count, vocab_size=150, max_len=40):
+    """(doc_id, 텍스트, 메타데이터) 목록 (Zipf 분포 어휘)"""
+    import random
+
+    rng = random.Random(seed)
+    vocab = [f"단어{i}" for i in range(vocab_size)]
+    weights = [1.0 / (i + 1) for i in range(vocab_size)]
+    return [
+        (f"doc_{i}", " ".join(rng.choices(vocab, weights, k=rng.randint(3, max_len))), None)
+        for i in range(count)
+    ]
+
+
+def _assert_same_scores(actual, expected, tolerance=1e-9):
+    actual, expected = dict(actual), dict(expected)
+    assert actual.keys() == expected.keys()
+    for doc_id, score in expected.items():
+        assert abs(actual[doc_id] - score) <= tolerance * max(1.0, abs(score)), doc_id
+
+
+def test_bm25_bulk_and_incremental_indexing_agree():
+    """BM25 일괄 색인과 문서별 증분 색인(교체 포함)이 새로 만든 색인과 같은 통계/점수"""
+    from app.services.advanced_rag_service import BM25Engine
+
+    docs = _random_corpus(3, 300)
+    # 일부 문서는 다른 텍스트로 다시 추가 (교체)
+    docs += [(doc_id, text + " 추가어", meta) for doc_id, text, meta in docs[::7]]
+    latest = dict((doc_id, (text, meta)) for doc_id, text, meta in docs)
+
+    reference = BM25Engine()
+    reference.add_documents((doc_id, text, meta) for doc_id, (text, meta) in latest.items())
+    bulk = BM25Engine()
+    assert bulk.add_documents(docs) == len(docs)
+    incremental = BM25Engine()
+    lengths = {}
+    for doc_id, text, meta in docs:
+        incremental.add_document(doc_id, text, meta)
+        lengths[doc_id] = len(text.split())
+        # N/평균 길이는 문서마다 바로 반영
+        assert incremental.N == len(lengths)
+        assert abs(incremental.avg_len - sum(lengths.values()) / len(lengths)) < 1e-9
+
+    for engine in (bulk, incremental):
+        assert engine.N == reference.N and engine.total_len == reference.total_len
+        assert engine.doc_len == reference.doc_len
+        assert {t: n for t, n in engine.df.items() if n} == reference.df
+        for query in ("단어0", "단어3 단어17", "단어1 추가어", "없는단어"):
+            _assert_same_scores(engine.search(query, 1000), reference.search(query, 1000))
+
+
+def test_bm25_tombstone_delete_and_forward_index():
+    """BM25 삭제: df/길이는 즉시 반영, 포스팅은 tombstone으로 남았다가 병합 시 정방향 색인으로 제거"""
+    from app.services.advanced_rag_service import BM25Engine
+
+    docs = _random_corpus(5, 200)
+    engine = BM25Engine()
+    engine.TOMBSTONE_MERGE_MIN = 10_000  # 자동 병합 끔
+    engine.add_documents(docs)
+    removed = {doc_id for doc_id, _, _ in docs[::4]}
+    for doc_id in sorted(removed):
+        assert engine.remove_document(doc_id)
+    assert not engine.remove_document("doc_0")  # 이미 삭제
+    assert not engine.remove_document("없는문서")
+
+    live = [doc for doc in docs if doc[0] not in removed]
+    reference = BM25Engine()
+    reference.add_documents(live)
+
+    # 병합 전: 포스팅에는 남아 있지만 검색/통계에서는 제외
+    assert engine.tombstones == removed
+    assert any(doc_id in bucket for bucket in engine.postings.values() for doc_id in removed)
+    assert engine.N == reference.N and engine.avg_len == reference.avg_len
+    assert {t: n for t, n in engine.df.items() if n} == reference.df
+    for query in ("단어0", "단어2 단어9", "단어40 단어41"):
+        _assert_same_scores(engine.search(query, 1000), reference.search(query, 1000))
+
+    # 병합: 삭제 문서의 포스팅/정방향 색인만 제거되어 새로 만든 색인과 같아짐
+    assert engine.merge_tombstones() == len(removed)
+    assert not engine.tombstones and engine.forward.keys() == reference.forward.keys()
+    assert engine.postings == reference.postings and engine.df == reference.df
+
+    # 병합 전에 같은 ID를 다시 추가하면 이전 포스팅을 먼저 정리
+    engine.remove_document("doc_1")
+    engine.add_document("doc_1", "새문서 새문서 단어0")
+    assert "doc_1" not in engine.tombstones
+    assert engine.postings["새문서"] == {"doc_1": 2} and engine.forward["doc_1"] == ("새문서", "단어0")
+    assert all("doc_1" not in bucket for token, bucket in engine.postings.items()
+               if token not in engine.forward["doc_1"])
+
+    # 임계값을 넘으면 자동 병합
+    engine.TOMBSTONE_MERGE_MIN, engine.TOMBSTONE_MERGE_RATIO = 5, 0.0
+    for doc_id, _, _ in live[:6]:
+        engine.remove_document(doc_id)
+    assert not engine.tombstones
+
+
+def test_bm25_csr_freeze_and_merge_match_dict_index():
+    """CSR 고정 인덱스와 세그먼트 병합 결과가 dict 포스팅 검색과 같은 점수"""
+    import numpy as np
+
+    from app.services.advanced_rag_service import BM25Engine
+    from app.services.bm25_index import FrozenBM25Index
+
+    docs = _random_corpus(9, 400)
+    engine = BM25Engine()
+    engine.TOMBSTONE_MERGE_MIN = 10_000
+    engine.add_documents(docs)
+    removed = {doc_id for doc_id, _, _ in docs[::5]}
+    for doc_id in removed:
+        engine.remove_document(doc_id)
+    queries = ["단어0", "단어1 단어2 단어2", "단어30 단어77", "없는단어", ""]
+    expected = {query: engine.search(query, 1000) for query in queries}
+
+    frozen = engine.freeze()
+    assert engine.is_frozen and frozen.N == engine.N and not removed & set(frozen.doc_ids)
+    for query in queries:
+        _assert_same_scores(engine.search(query, 1000), expected[query], 1e-5)
+        # 상위 k는 점수 내림차순
+        top = frozen.search(query, 5)
+        assert [score for _, score in top] == sorted((score for _, score in top), reverse=True)
+    engine.add_document("new", "단어0 단어0")
+    assert not engine.is_frozen and "new" in dict(engine.search("단어0", 1000))
+
+    # 두 조각으로 고정한 뒤 삭제 마스크와 함께 병합하면 살아 있는 문서로 고정한 것과 같음
+    halves = [BM25Engine(), BM25Engine()]
+    halves[0].add_documents(docs[:200])
+    halves[1].add_documents(docs[200:])
+    parts = [half.freeze() for half in halves]
+    masks = [np.array([doc_id in removed for doc_id in part.doc_ids]) for part in parts]
+    merged = FrozenBM25Index.merge(parts, masks, engine._tokenize)
+    assert merged.doc_ids == frozen.doc_ids and merged.terms.keys() == frozen.terms.keys()
+    for query in queries:
+        _assert_same_scores(merged.search(query, 1000), expected[query], 1e-5)
+
+
+def test_bm25_npz_snapshot_round_trip_and_stale_rejection(tmp_path):
+    """BM25 스냅샷: 저장/로드 후 같은 검색 결과, 원본 해시/파라미터/형식이 다르거나 손상되면 None"""
+    import json as _json
+    from concurrent.futures import ThreadPoolExecutor
+
+    import numpy as np
+
+    from app.services import bm25_index
+    from app.services.advanced_rag_service import BM25Engine, SegmentedBM25Engine
+    from app.services.bm25_index import FrozenBM25Index
+
+    engine = BM25Engine()
+    engine.add_documents(_random_corpus(13, 300))
+    frozen = engine.freeze()
+    path = tmp_path / bm25_index.SNAPSHOT_FILENAME
+    # 같은 프로세스의 여러 스레드가 동시에 저장해도 완성된 파일만 남음
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: frozen.save(path, "hash-a"), range(8)))
+    assert not list(tmp_path.glob("*.tmp"))
+    assert FrozenBM25Index.read_header(path)["source_hash"] == "hash-a"
+
+    loaded = FrozenBM25Index.load(path, engine._tokenize, "hash-a")
+    assert loaded is not None and loaded.doc_ids == frozen.doc_ids and loaded.terms == frozen.terms
+    for query in ("단어0", "단어4 단어8", "없는단어"):
+        assert loaded.search(query, 20) == frozen.search(query, 20)
+
+    restored = SegmentedBM25Engine()
+    restored.load_frozen(loaded)
+    assert restored.N == engine.N and restored.search("단어5", 10) == engine.search("단어5", 10)
+
+    # 원본이 바뀌었거나 BM25 파라미터가 다르면 재사용하지 않음
+    assert FrozenBM25Index.load(path, engine._tokenize, "hash-b") is None
+    assert FrozenBM25Index.load(path, engine._tokenize, "hash-a", k1=1.2) is None
+    assert FrozenBM25Index.load(tmp_path / "missing.npz", engine._tokenize, "hash-a") is None
+
+    # 형식 버전이 다르거나 파일이 손상된 경우
+    with np.load(path) as data:
+        arrays = dict(data)
+    header = _json.loads(arrays["header"].tobytes().decode("utf-8"))
+    header["version"] = bm25_index.SNAPSHOT_VERSION + 1
+    arrays["header"] = np.frombuffer(_json.dumps(header).encode("utf-8"), dtype=np.uint8)
+    old_format = tmp_path / "old.npz"
+    with open(old_format, "wb") as f:
+        np.savez(f, **arrays)
+    assert FrozenBM25Index.load(old_format, engine._tokenize, "hash-a") is None
+    path.write_bytes(path.read_bytes()[:100])
+    assert FrozenBM25Index.load(path, engine._tokenize, "hash-a") is None
+    assert FrozenBM25Index.read_header(path) is None
+
+
+def test_bm25_pruned_search_matches_exhaustive():
+    """MaxScore 가지치기 검색이 전수 점수화와 같은 결과를 내는지 확인"""
+    import random
+    from app.services import bm25_index
+    from app.services.advanced_rag_service import BM25Engine
+
+    rng = random.Random(7)
+    vocab = [f"단어{i}" for i in range(400)]
+    weights = [1.0 / (i + 1) for i in range(len(vocab))]
+    engine = BM25Engine()
+    engine.add_documents(
+        (f"doc_{i}", " ".join(rng.choices(vocab, weights, k=rng.randint(5, 60))), None)
+        for i in range(3000)
+    )
+    frozen = bm25_index.FrozenBM25Index.from_engine(engine)
+    assert frozen.N == 3000
+
+    queries = [" ".join(rng.choices(vocab, weights, k=rng.randint(1, 5))) for _ in range(100)]
+    queries += ["단어0", "단어0 단어0 단어7", "단어1 단어399", "없는단어"]
+
+    original = bm25_index.PRUNE_MIN_POSTINGS
+    bm25_index.PRUNE_MIN_POSTINGS = 0
+    try:
+        for top_k in (1, 5, 20):
+            for query in queries:
+                assert frozen.search(query, top_k) == frozen.search_exhaustive(query, top_k), query
+    finally:
+        bm25_index.PRUNE_MIN_POSTINGS = original
+
+
+def test_segmented_bm25_matches_single_index():
+    """세그먼트 색인(flush/삭제/병합)이 단일 BM25 색인과 같은 점수를 내는지 확인"""
+    import random
+    from app.services.advanced_rag_service import BM25Engine, SegmentedBM25Engine
+
+    rng = random.Random(11)
+    vocab = [f"단어{i}" for i in range(200)]
+    weights = [1.0 / (i + 1) for i in range(len(vocab))]
+
+    segmented = SegmentedBM25Engine()
+    segmented.MEMTABLE_FLUSH_DOCS = 40
+    segmented.MAX_SEGMENTS = 3
+    single = BM25Engine()
+    live = []
+
+    def check():
+        if segmented._merge_thread is not None:
+            segmented._merge_thread.join()
+        for _ in range(20):
+            query = " ".join(rng.choices(vocab, weights, k=rng.randint(1, 4)))
+            expected = dict(single.search(query, 1000))
+            actual = dict(segmented.search(query, 1000))
+            assert expected.keys() == actual.keys(), query
+            for doc_id, score in expected.items():
+                assert abs(score - actual[doc_id]) < 1e-3 * max(1.0, abs(score)), (query, doc_id)
+
+    for step in range(600):
+        if rng.random() < 0.65 or not live:
+            doc_id = f"doc_{rng.randint(0, 300)}"
+            text = " ".join(rng.choices(vocab, weights, k=rng.randint(3, 30)))
+            segmented.add_document(doc_id, text)
+            single.add_document(doc_id, text)
+            if doc_id not in live:
+                live.append(doc_id)
+        else:
+            doc_id = live.pop(rng.randrange(len(live)))
+            assert segmented.remove_document(doc_id) == single.remove_document(doc_id)
+        if step % 100 == 99:
+            check()
+
+    assert segmented.N == single.N
+    result = segmented.optimize()
+    assert result['segments'] <= 1 and segmented.pending_deletes == 0
+    check()
+
+
+def test_segmented_bm25_search_is_safe_during_concurrent_writes():
+    """세그먼트 BM25: 다른 스레드가 추가/삭제하는 동안 검색해도 예외 없이 일관된 결과"""
+    import threading
+    from app.services.advanced_rag_service import SegmentedBM25Engine
+
+    engine = SegmentedBM25Engine()
+    engine.MEMTABLE_FLUSH_DOCS = 10_000
+    for i in range(200):
+        engine.add_document(f"base{i}", f"common token{i % 7} filler{i}")
+    engine.flush()
+    stop = threading.Event()
+    errors = []
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            engine.add_document(f"dyn{i % 50}", f"common token{i % 7} fresh{i}")
+            engine.remove_document(f"dyn{(i + 25) % 50}")
+            i += 1
+
+    def reader():
+        try:
+            for _ in range(300):
+                results = engine.search("common token3", 20)
+                assert results == sorted(results, key=lambda x: x[1], reverse=True)
+        except Exception as e:  # pragma: no cover - 실패 시 원인 보고
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads[1:]:
+        thread.join()
+    stop.set()
+    threads[0].join()
+    assert not errors, errors
+
+
+def test_embedding_server_batches_concurrent_requests(tmp_path):
+    """동시 요청이 한 배치로 인코딩되고, 서버가 없으면 프로세스 안 모델로 폴백"""
+    import threading
+    import numpy as np
+    from app.services.embedding_server import EmbeddingClient, EmbeddingServer
+
+    class LengthModel:
+        def __init__(self):
+            self.batches = []
+
+        def encode(self, texts, batch_size=32):
+            self.batches.append(len(texts))
+            return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+    model = LengthModel()
+    socket_path = str(tmp_path / "embed.sock")
+    server = EmbeddingServer(socket_path, model, "length", window=0.2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = EmbeddingClient(socket_path, "length")
+        results = {}
+        barrier = threading.Barrier(6)
+
+        def query(n):
+            barrier.wait()
+            results[n] = client.encode("x" * n)
+
+        threads = [threading.Thread(target=query, args=(n,)) for n in range(1, 7)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert all(results[n].tolist() == [n, 1.0] for n in results)
+        assert sum(model.batches) == 6 and len(model.batches) < 6
+        assert client.encode(["ab", "abc"]).tolist() == [[2, 1.0], [3, 1.0]]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    fallback = EmbeddingClient(socket_path, "length", fallback=LengthModel)
+    assert not fallback.available()
+    assert fallback.encode("abcd").tolist() == [4, 1.0]
+    assert fallback.stats()["fallback_calls"] == 1
+
+
+def test_hashing_embedder_is_deterministic_and_lexical():
+    """해시 임베딩: 같은 입력은 같은 벡터, 어간이 겹치는 문서가 더 가깝게"""
+    from app.services.hashing_embedder import HashingEmbedder
+
+    embedder = HashingEmbedder(dim=256)
+    docs = [text for text in SAMPLE_TEXTS if text]
+    matrix = embedder.encode(docs, batch_size=2)
+    assert matrix.shape == (len(docs), 256)
+    assert (HashingEmbedder(dim=256).encode(docs) == matrix).all()
+    assert abs(float((matrix[0] ** 2).sum()) - 1.0) < 1e-5
+
+    query = embedder.encode("현재완료 시제")
+    assert query.shape == (256,)
+    assert int((matrix @ query).argmax()) == 2
+
+
+def test_hybrid_searcher_over_private_bm25_engine():
+    """domain.rag 검색기: 벡터 저장소가 없으면 BM25 모드로 RagHit 반환"""
+    from app.domain.rag import Bm25RagEngine, HybridSearcher, RagDoc, SearchMode
+
+    engine = Bm25RagEngine()
+    count = engine.index(
+        RagDoc(doc_id=f"c{i}", text=text, title=f"title {i}") for i, text in enumerate(SAMPLE_TEXTS)
+    )
+    assert count == len(SAMPLE_TEXTS)
+
+    searcher = HybridSearcher(engine, None, mode="hybrid")
+    assert searcher.effective_mode == SearchMode.BM25
+    hits = searcher.search("과거시제는 played", top_k=2)
+    assert [hit.chunk_id for hit in hits][0] == "c1"
+    assert hits[0].title == "title 1" and hits[0].text == SAMPLE_TEXTS[1]
+    assert hits[0].score == hits[0].bm25_score > hits[1].score
+
+
+def test_fusion_methods_respect_alpha_and_rank():
+    """융합: alpha 양 끝은 한쪽 순위 그대로, RRF는 점수 척도와 무관"""
+    from app.domain.rag.fusion import fuse
+
+    bm25 = [("a", 12.0), ("b", 6.0), ("c", 3.0)]
+    vector = [("c", 0.9), ("d", 0.5), ("a", 0.4)]
+    for method in ("minmax", "zscore", "rrf"):
+        assert [doc_id for doc_id, _ in fuse(bm25, vector, 1.0, method)][:3] == ["a", "b", "c"]
+        assert [doc_id for doc_id, _ in fuse(bm25, vector, 0.0, method)][:3] == ["c", "d", "a"]
+        fused = fuse(bm25, vector, 0.5, method)
+        assert {doc_id for doc_id, _ in fused} == {"a", "b", "c", "d"}
+        assert fused[-1][0] in ("b", "d")
+
+    scaled = [(doc_id, score * 1000) for doc_id, score in bm25]
+    assert fuse(scaled, vector, 0.5, "rrf") == fuse(bm25, vector, 0.5, "rrf")
+    assert fuse(scaled, vector, 0.5, "minmax") == fuse(bm25, vector, 0.5, "minmax")
+
+
+def test_retrieval_cache_lru_ttl_and_version_invalidation():
+    """결과 캐시: 용량 초과 시 LRU 제거, TTL 만료, 인덱스 버전이 바뀌면 이전 항목 정리, 늦은 이전 버전 저장은 버림"""
+    from app.domain.rag.retrieval_cache import RetrievalCache
+
+    cache = RetrievalCache(max_entries=2, ttl=60)
+    key_a = cache.make_key("rag", "  현재   완료 ", (1, 0), mode="hybrid", top_k=5)
+    assert key_a == cache.make_key("rag", "현재 완료", (1, 0), top_k=5, mode="hybrid")
+    cache.put(key_a, ["a"])
+    cache.put(cache.make_key("rag", "b", (1, 0), top_k=5), ["b"])
+    assert cache.get(key_a) == ["a"]
+    cache.put(cache.make_key("rag", "c", (1, 0), top_k=5), ["c"])
+    assert cache.get(cache.make_key("rag", "b", (1, 0), top_k=5)) is None
+    assert cache.evictions == 1
+
+    cache.put(cache.make_key("rag", "d", (1, 1), top_k=5), ["d"])
+    assert cache.get(key_a) is None and len(cache) == 1
+    assert cache.invalidations == 2
+
+    expired = RetrievalCache(max_entries=2, ttl=0)
+    expired.put(key_a, ["a"])
+    time.sleep(0.01)
+    assert expired.get(key_a) is None and expired.expirations == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["size"] == 1 and 0 < stats["hit_ratio"] < 1
+
+    # 교체 전에 시작한 느린 요청의 이전 버전 결과는 버리고 새 버전 항목은 유지
+    key_d = cache.make_key("rag", "d", (1, 1), top_k=5)
+    cache.put(cache.make_key("rag", "late", (1, 0), top_k=5), ["late"])
+    assert cache.stale_puts == 1 and cache.invalidations == 2
+    assert cache.get(cache.make_key("rag", "late", (1, 0), top_k=5)) is None
+    assert cache.get(key_d) == ["d"]
+
+    # 반환 목록을 바꿔도 캐시된 결과는 그대로
+    results = ["x"]
+    key_x = cache.make_key("rag", "x", (1, 1), top_k=5)
+    cache.put(key_x, results)
+    results.append("after-put")
+    cache.get(key_x).append("after-get")
+    assert cache.get(key_x) == ["x"]
+
+
+def test_rerank_features_match_scalar_rules():
+    """리랭킹: 색인 시 계산한 특징으로 score * (1 + boost) + evidence 적용, 점수순 재정렬"""
+    from app.services.advanced_rag_service import HybridSearchResult, RerankEngine
+
+    def result(doc_id, score, text, source):
+        return HybridSearchResult(doc_id, doc_id, score, 0.0, 0.0, text, "", source, "hybrid", {})
+
+    engine = RerankEngine()
+    engine.index_documents([
+        ("r", "현재완료를 쓰는 이유는" + "x" * 300, {"source": "notes.md"}),
+        ("b", "plain text", {"source": "Official_Grammar_Book.pdf"}),
+    ])
+    assert len(engine.features) == 2
+    reranked = engine.rerank([
+        result("o", 0.95, "x" * 600, "academic/paper.md"),
+        result("b", 0.9, "plain text", "Official_Grammar_Book.pdf"),
+        result("r", 0.8, "현재완료를 쓰는 이유는" + "x" * 300, "notes.md"),
+    ])
+    assert [(r.doc_id, r.metadata["classification"]) for r in reranked] == [
+        ("b", "book"), ("r", "reason"), ("o", "other")
+    ]
+    assert reranked[0].score == 0.9 * 1.2 + 0.2
+    assert reranked[1].score == 0.8 * 1.5 + 0.05
+    assert reranked[2].score == 0.95 + (0.1 + 0.15)
+    assert len(engine.features) == 3
+    assert engine.classify_document({"text": "WHY? Because.", "source": ""}) == "reason"
+
+
+def test_rerank_features_reuse_removed_rows():
+    """리랭킹 특징: 추가/삭제를 반복해도 제거된 행을 재사용해 배열이 자라지 않음"""
+    from app.services.rerank_features import RerankFeatures
+
+    features = RerankFeatures({"definition": 0.2})
+    for i in range(50):
+        features.add(f"base{i}", "정의란 무엇인가", "")
+    capacity = features.memory_bytes()
+    for i in range(1000):
+        features.add(f"dyn{i}", "예시 문장" if i % 2 else "정의란", "official/guide.md")
+        features.remove(f"dyn{i}")
+        features.remove("missing")
+    features.add("last", "예시 문장", "")
+
+    assert len(features) == 51 and features.memory_bytes() == capacity
+    fresh = RerankFeatures({"definition": 0.2})
+    fresh.add("last", "예시 문장", "")
+    assert features.lookup([("last", "", "")]).tolist() == fresh.lookup([("last", "", "")]).tolist()
+    assert features.lookup([("base0", "", "")]).tolist() == fresh.lookup([("x", "정의란 무엇인가", "")]).tolist()
+
+
+def test_background_loop_runs_coroutines_on_one_thread():
+    """백그라운드 루프: 여러 스레드에서 제출한 코루틴이 같은 루프 스레드에서 실행, 시간 초과/종료 처리"""
+    import asyncio
+    import threading
+    from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+    from app.services.background_loop import BackgroundEventLoop
+
+    loop = BackgroundEventLoop(name="test-loop")
+
+    async def where(value):
+        await asyncio.sleep(0)
+        return threading.current_thread().name, value
+
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda i: loop.run(where(i), timeout=5), range(8)))
+        assert results == [("test-loop", i) for i in range(8)]
+
+        async def nested():
+            return loop.run(where(0))
+
+        try:
+            loop.run(nested(), timeout=5)
+            assert False, "루프 안에서 run()은 실패해야 함"
+        except RuntimeError:
+            pass
+
+        # 시간 초과: 호출 스레드는 풀려나고 코루틴은 취소됨
+        cancelled = threading.Event()
+
+        async def stall():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        try:
+            loop.run(stall(), timeout=0.05)
+            assert False, "시간 초과가 발생해야 함"
+        except FutureTimeoutError:
+            pass
+        assert cancelled.wait(5)
+        assert loop.run(where(1), timeout=5) == ("test-loop", 1)
+    finally:
+        loop.stop()
+    assert not loop.running
+
+    # 루프 스레드가 제때 끝나지 않으면 실행 중인 루프를 닫지 않고 둠, 끝난 뒤 다시 stop()하면 닫힘
+    blocked = BackgroundEventLoop(name="test-blocked-loop")
+    release = threading.Event()
+    asyncio_loop = blocked.start()
+    asyncio_loop.call_soon_threadsafe(release.wait, 5)  # 루프 스레드를 막는 동기 콜백
+    blocked.stop(timeout=0.05)
+    assert blocked.running and not asyncio_loop.is_closed()
+    release.set()
+    blocked._thread.join(5)
+    blocked.stop()
+    assert not blocked.running and asyncio_loop.is_closed()
+
+
+def test_rag_service_cache_keeps_hybrid_and_keyword_entries():
+    """RAGService 결과 캐시: 하이브리드/키워드 검색을 번갈아 해도 서로의 항목을 지우지 않음"""
+    from unittest import mock
+
+    from app.domain.rag.engine import get_resident_index
+    from app.domain.rag.retrieval_cache import RetrievalCache
+    from app.services.rag_service import RAGService
+
+    cache = RetrievalCache(max_entries=16, ttl=60)
+    service = RAGService()
+    calls = []
+
+    class FakeHybrid:
+        bm25 = mock.Mock(resident=get_resident_index())
+        effective_mode = mock.Mock(value="hybrid")
+        alpha, fusion = 0.5, "minmax"
+
+        def search(self, query, top_k=5):
+            calls.append("hybrid")
+            return []
+
+    snapshot = mock.Mock(version=3, store=[{"text": "현재완료", "chunk_id": "c0"}])
+    snapshot.keyword_index.score.side_effect = lambda query: calls.append("keyword") or [(0, 1.0)]
+    with mock.patch("app.domain.rag.retrieval_cache.retrieval_cache", cache), \
+            mock.patch.object(service, "_get_hybrid_engine", return_value=FakeHybrid()), \
+            mock.patch.object(service, "_get_snapshot", return_value=snapshot):
+        for _ in range(2):
+            service.search("현재완료", 3, use_hybrid=True)
+            service.search("현재완료", 3, use_hybrid=False)
+    assert calls == ["hybrid", "keyword"]
+    assert cache.invalidations == 0 and cache.hits == 2
+
+
+def _random_unit_rows(n, dim, seed=0):
+    import numpy as np
+
+    rows = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def _clustered_rows(n, dim, clusters, seed=0):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    rows = centers[rng.integers(0, clusters, n)] + 0.35 * rng.standard_normal((n, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def test_ivf_recall_and_save_load(tmp_path):
+    """IVF: nprobe에 따른 재현율, 저장/로드 후 같은 배정, 해시 불일치 거부, 추가/삭제 후 리스트 유지"""
+    import numpy as np
+
+    from app.services.vector_index import IVF_FILENAME, DenseVectorIndex
+
+    rows = _clustered_rows(4000, 32, 40, seed=1)
+    ids = [f"d{i}" for i in range(len(rows))]
+    queries = rows[:100] + 0.2 * np.random.default_rng(2).standard_normal((100, 32)).astype(np.float32)
+    index = DenseVectorIndex()
+    index.add_many(ids, rows)
+    index.train_ivf(nlist=64)
+    exact = [{d for d, _ in index.search_exact(q, 10)} for q in queries]
+
+    def recall(idx, nprobe):
+        return np.mean([len({d for d, _ in idx.search(q, 10, nprobe=nprobe)} & e) / 10
+                        for q, e in zip(queries, exact)])
+
+    assert recall(index, 4) >= 0.8 and recall(index, 16) >= 0.97
+    assert recall(index, 64) == 1.0  # 모든 리스트 = 전수 검색
+    # 쿼리 여러 개도 같은 결과
+    assert index.search_many(queries[:5], 10) == [index.search(q, 10) for q in queries[:5]]
+
+    path = tmp_path / IVF_FILENAME
+    index.save_ivf(path, "hash-a")
+    assert not list(tmp_path.glob("*.tmp"))
+    # 저장 이후 추가된 문서는 로드 시 중심에 새로 배정
+    extra = _clustered_rows(50, 32, 40, seed=3)
+    restored = DenseVectorIndex()
+    restored.add_many(ids + [f"x{i}" for i in range(50)], np.concatenate([rows, extra]))
+    assert not restored.load_ivf(path, "hash-b") and restored.ivf is None
+    assert restored.load_ivf(path, "hash-a")
+    assert np.array_equal(restored.ivf.centroids, index.ivf.centroids)
+    assert np.array_equal(restored._assign[:len(ids)], index._assign[:len(ids)])
+    assert np.array_equal(restored._assign[len(ids):len(restored)], index.ivf.assign(extra))
+    assert restored.search(queries[0], 10, nprobe=16) == index.search(queries[0], 10, nprobe=16)
+
+    # 추가/삭제 후에도 재학습 없이 리스트 갱신
+    restored.remove("d0")
+    restored.add("new", rows[0])
+    assert restored.search(rows[0], 1, nprobe=4)[0][0] == "new"
+    assert "d0" not in {d for d, _ in restored.search(rows[0], 50, nprobe=64)}
+
+
+def test_quantized_storage_recall_against_float32():
+    """float16/int8 저장: float32 정확 검색 대비 top-10 재현율, int8 재점수화는 원본 조회로 순위까지 동일"""
+    import numpy as np
+
+    from app.services.vector_index import DenseVectorIndex
+
+    rows = _random_unit_rows(2000, 64, seed=5)
+    noise = np.random.default_rng(6).standard_normal((50, 64)).astype(np.float32)
+    queries = rows[:50] + 0.5 * noise
+    ids = [f"d{i}" for i in range(len(rows))]
+
+    def top_ids(index, query):
+        return [doc_id for doc_id, _ in index.search(query, 10)]
+
+    exact = DenseVectorIndex()
+    exact.add_many(ids, rows)
+    expected = [top_ids(exact, query) for query in queries]
+    sizes = {}
+    lookups = []
+
+    def source(doc_ids):
+        lookups.append(len(doc_ids))
+        return [rows[int(doc_id[1:])] if doc_id != "d7" else None for doc_id in doc_ids]
+
+    for storage, rescore, min_recall in (("float16", 0, 0.99), ("int8", 0, 0.95), ("int8", 4, 1.0)):
+        index = DenseVectorIndex(storage=storage, rescore=rescore)
+        index.add_many(ids, rows)
+        index.source = source if rescore else None
+        found = [top_ids(index, query) for query in queries]
+        recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(found, expected)])
+        assert recall >= min_recall, (storage, rescore, recall)
+        sizes[(storage, rescore)] = index.memory_bytes()
+        if rescore:
+            assert found == expected
+            assert lookups and set(lookups) == {40}
+            # 재점수화는 원본 사본을 인덱스에 두지 않음
+            assert sizes[(storage, rescore)] == sizes[("int8", 0)]
+    assert sizes[("int8", 0)] < sizes[("float16", 0)] < exact.memory_bytes()
+
+    # 전수 점수는 블록 경계와 관계없이 float32 점수와 같음 (블록 복원 버퍼 재사용)
+    from app.services import vector_index
+    half = DenseVectorIndex(storage="float16")
+    half.add_many(ids, rows)
+    normalized = vector_index.normalize_rows(queries[:3])
+    blocked = half._score_all(normalized)
+    original = vector_index._SCORE_BLOCK
+    vector_index._SCORE_BLOCK = 300
+    try:
+        assert np.allclose(half._score_all(normalized), blocked, atol=1e-6)
+    finally:
+        vector_index._SCORE_BLOCK = original
+    assert np.allclose(blocked, half.vectors() @ normalized.T, atol=1e-5)
+
+
+def test_shared_matrix_round_trip_with_concurrent_publishers(tmp_path, monkeypatch):
+    """공유 행렬: 기록/매핑 왕복, 두 워커가 동시에 기록해도 메타가 가리키는 세대 파일은 남음"""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import numpy as np
+
+    from app.services import vector_index
+    from app.services.vector_index import DenseVectorIndex
+
+    vectors = _random_unit_rows(40, 16)
+    ids = [f"d{i}" for i in range(40)]
+    index = DenseVectorIndex(storage='int8', rescore=2)
+    index.add_many(ids, vectors)
+    index.save_shared(tmp_path, "hash", "model")
+    mapped = DenseVectorIndex.open_shared(tmp_path)
+    assert mapped is not None and mapped.ids == ids and mapped.generation == index.generation
+    assert mapped.search(vectors[3], 5) == index.search(vectors[3], 5)
+
+    # 두 기록자 모두 세대 파일을 쓴 뒤에 메타를 교체하도록 잠금 직전에서 맞춤
+    barrier = threading.Barrier(2)
+    real_lock = vector_index._shared_lock
+
+    class SyncedLock(real_lock):
+        def __enter__(self):
+            barrier.wait(timeout=10)
+            return super().__enter__()
+
+    monkeypatch.setattr(vector_index, "_shared_lock", SyncedLock)
+    publishers = [DenseVectorIndex(), DenseVectorIndex()]
+    for publisher in publishers:
+        publisher.add_many(ids, vectors)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(lambda p: p.save_shared(tmp_path, "hash", "model"), publishers))
+
+    meta = DenseVectorIndex.read_shared_meta(tmp_path)
+    assert meta["generation"] in {p.generation for p in publishers}
+    reopened = DenseVectorIndex.open_shared(tmp_path, meta)
+    assert reopened is not None and reopened.ids == ids
+    # 처음 매핑한 세대는 파일이 지워져도 열린 매핑으로 계속 검색 가능
+    assert mapped.search(vectors[3], 5) == index.search(vectors[3], 5)
+    assert not list(tmp_path.glob("*.tmp"))
+    assert np.allclose(reopened.vectors(), vectors, atol=1e-6)
+
+
+def test_dense_index_add_many_keeps_last_duplicate():
+    """벡터 색인: 한 배치에 같은 ID가 반복되면 add를 차례로 호출한 것처럼 마지막 벡터가 남음"""
+    import numpy as np
+
+    from app.services.vector_index import DenseVectorIndex
+
+    eye = np.eye(4, dtype=np.float32)
+    batched, sequential = DenseVectorIndex(), DenseVectorIndex()
+    for doc_ids, vectors in ((["a", "b", "a"], eye[:3]), (["b", "c", "b", "c"], eye[[0, 1, 2, 3]])):
+        batched.add_many(doc_ids, vectors)
+        for doc_id, vector in zip(doc_ids, vectors):
+            sequential.add(doc_id, vector)
+
+    assert batched.ids == sequential.ids == ["a", "b", "c"]
+    assert np.allclose(batched.vectors(), sequential.vectors())
+    assert np.allclose(batched.vectors(), eye[[2, 2, 3]])
+    assert [doc_id for doc_id, _ in batched.search(eye[3], 1)] == ["c"]
+    assert sorted(doc_id for doc_id, _ in batched.search(eye[2], 2)) == ["a", "b"]
+
+
+def test_dense_index_search_is_safe_during_concurrent_removes():
+    """벡터 색인: 다른 스레드가 삭제/추가(마지막 행 이동, 행렬 확장)하는 동안 검색해도 점수와 doc_id가 일치"""
+    import threading
+
+    from app.services.vector_index import DenseVectorIndex
+
+    rows = _random_unit_rows(3000, 32, seed=3)
+    ids = [f"d{i}" for i in range(len(rows))]
+    vectors = dict(zip(ids, rows))
+    index = DenseVectorIndex()
+    index.add_many(ids[:2000], rows[:2000])
+    stop = threading.Event()
+    errors = []
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            index.remove(ids[i % 2000])
+            index.add_many(ids[2000 + i % 1000:2000 + i % 1000 + 1], rows[2000 + i % 1000:][:1])
+            index.add(ids[i % 2000], rows[i % 2000])
+            i += 1
+
+    def reader():
+        try:
+            for j in range(100):
+                queries = rows[j * 7 % 3000:][:8]
+                for query, results in zip(queries, index.search_many(queries, 5)):
+                    for doc_id, score in results:
+                        assert abs(float(vectors[doc_id] @ query) - score) < 1e-4, doc_id
+        except Exception as e:  # pragma: no cover - 실패 시 원인 보고
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads[1:]:
+        thread.join()
+    stop.set()
+    threads[0].join()
+    assert not errors, errors[:3]
+    assert len(index) == len(index.id_index) and all(index.id_index[d] == r for r, d in enumerate(index.ids))
+
+
+class _CountingEmbedder:
+    """HashingEmbedder 호출 기록 (배치 크기, 인코딩한 텍스트)"""
+
+    def __init__(self, dim=64):
+        from app.services.hashing_embedder import HashingEmbedder
+
+        self.model = HashingEmbedder(dim)
+        self.batches = []
+        self.texts = []
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        self.batches.append(len(texts))
+        self.texts.extend(texts)
+        vectors = self.model.encode(texts)
+        return vectors[0] if single else vectors
+
+
+def test_vector_engine_batches_encodes_like_single_adds():
+    """벡터 일괄 색인: 배치마다 모델 한 번 호출(길이순), 문서별 추가와 같은 임베딩/검색 결과"""
+    import numpy as np
+
+    from app.services.advanced_rag_service import VectorEngine
+
+    docs = [(doc_id, text, {"n": i}) for i, (doc_id, text, _) in enumerate(_random_corpus(17, 150))]
+    batched_model, single_model = _CountingEmbedder(), _CountingEmbedder()
+    batched, single = VectorEngine(batched_model, "hash"), VectorEngine(single_model, "hash")
+    assert batched.add_documents(docs, batch_size=64) == len(docs)
+    for doc_id, text, meta in docs:
+        single.add_document(doc_id, text, meta)
+
+    assert batched_model.batches == [64, 64, 22] and len(single_model.batches) == len(docs)
+    # 패딩 낭비를 줄이도록 텍스트 길이순으로 배치 구성
+    lengths = [len(text) for text in batched_model.texts]
+    assert lengths == sorted(lengths)
+    assert batched.doc_metadata == single.doc_metadata
+    assert batched.last_build["encoded"] == len(docs) and batched.last_build["cache_hits"] == 0
+    for doc_id, _, _ in docs[:20]:
+        a = batched.index.vectors(np.array([batched.index.id_index[doc_id]]))
+        b = single.index.vectors(np.array([single.index.id_index[doc_id]]))
+        assert np.allclose(a, b, atol=1e-6)
+    for query in ("단어0 단어5", "단어42"):
+        assert [d for d, _ in batched.search(query, 5)] == [d for d, _ in single.search(query, 5)]
+
+
+def test_vector_engine_query_embedding_lru(monkeypatch):
+    """쿼리 임베딩 LRU: 정규화 키 적중, 배치 안 중복 한 번 인코딩, 용량 초과 시 오래된 항목 제거, 모델별 키, 0이면 끔"""
+    import unicodedata
+
+    from app.services.advanced_rag_service import VectorEngine
+
+    model = _CountingEmbedder()
+    engine = VectorEngine(model, "hash")
+    engine.add_documents(_random_corpus(29, 50))
+    monkeypatch.setattr(VectorEngine, "QUERY_CACHE_SIZE", 2)
+    model.texts.clear()
+
+    first = engine.search("현재완료 단어1", 5)
+    assert engine.search(" 현재완료\n 단어1 ", 5) == first  # 공백 정리
+    assert engine.search(unicodedata.normalize("NFD", "현재완료 단어1"), 5) == first  # NFC
+    assert model.texts == ["현재완료 단어1"]
+    assert engine.query_cache_stats() == {
+        'size': 1, 'capacity': 2, 'hits': 2, 'misses': 1, 'hit_rate': round(2 / 3, 4),
+    }
+
+    # 한 배치 안 중복 쿼리는 한 번만 인코딩 (적중/미스는 쿼리마다 집계)
+    batches = len(model.batches)
+    results = engine.search_many(["단어3", "단어4", "단어3"], 5)
+    assert model.batches[batches:] == [2] and results[0] == results[2]
+    assert engine.query_cache_misses == 4
+
+    # 용량 2: 가장 오래 쓰지 않은 "현재완료 단어1"이 밀려나 다시 인코딩
+    assert len(engine._query_cache) == 2
+    model.texts.clear()
+    engine.search("단어3", 5)
+    engine.search("현재완료 단어1", 5)
+    assert model.texts == ["현재완료 단어1"]
+
+    # 모델 이름이 바뀌면 같은 쿼리도 새로 인코딩
+    engine.model_name = "other"
+    engine.search("단어3", 5)
+    assert model.texts == ["현재완료 단어1", "단어3"]
+
+    # 캐시 끔: 매번 인코딩, 캐시 크기 그대로
+    monkeypatch.setattr(VectorEngine, "QUERY_CACHE_SIZE", 0)
+    size = len(engine._query_cache)
+    engine.search("단어3", 5)
+    engine.search("단어3", 5)
+    assert model.texts[-2:] == ["단어3", "단어3"] and len(engine._query_cache) == size
+
+
+def test_vector_engine_falls_back_when_embedding_server_is_down(tmp_path):
+    """임베딩 사이드카가 없으면 프로세스 안 모델로 색인/검색, 서버가 뜨면 RETRY_INTERVAL 뒤 서버 사용"""
+    import threading
+
+    import numpy as np
+
+    from app.services.advanced_rag_service import VectorEngine
+    from app.services.embedding_server import EmbeddingClient, EmbeddingServer
+    from app.services.hashing_embedder import HashingEmbedder
+
+    loads = []
+
+    def load_local():
+        loads.append(1)
+        return HashingEmbedder(64)
+
+    socket_path = str(tmp_path / "embed.sock")
+    client = EmbeddingClient(socket_path, "hash", fallback=load_local)
+    client.RETRY_INTERVAL = 0.0
+    docs = _random_corpus(31, 40)
+    engine = VectorEngine(client, "hash")
+    assert engine.add_documents(docs) == len(docs)
+    local_results = engine.search("단어2 단어9", 5)
+    assert local_results and len(loads) == 1
+    assert client.stats()["remote_calls"] == 0 and client.stats()["fallback_calls"] >= 2
+
+    server = EmbeddingServer(socket_path, HashingEmbedder(64), "hash", window=0.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        engine.QUERY_CACHE_SIZE = 0
+        assert engine.search("단어2 단어9", 5) == local_results
+        assert client.stats()["remote_calls"] == 1 and len(loads) == 1
+        remote = client.encode(["단어5"])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # 서버가 내려가면 다시 폴백 (이미 로드한 모델 재사용, 프로세스 종료처럼 기존 연결도 끊음)
+    client._disconnect()
+    fallback_calls = client.fallback_calls
+    assert np.allclose(client.encode(["단어5"]), remote)
+    assert client.fallback_calls == fallback_calls + 1 and len(loads) == 1
+
+
+def test_embedding_cache_hits_and_invalidation(tmp_path):
+    """임베딩 캐시: 저장/재로드 적중, 정규화 키, 모델/차원 변경 시 폐기, 재구축 시 정리, 동시 저장"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    import numpy as np
+
+    from app.services.advanced_rag_service import VectorEngine
+    from app.services.embedding_cache import EmbeddingCache, text_key
+
+    assert text_key("가나  다\n") == text_key("가나 다") != text_key("가나다")
+    rows = _random_unit_rows(3, 8)
+    keys = [text_key(t) for t in ("a", "b", "c")]
+    cache = EmbeddingCache(tmp_path, "org/model:v1")
+    assert cache.get(keys[0]) is None and cache.misses == 1
+    cache.put_many(keys, rows)
+    assert np.array_equal(cache.get(keys[1]), rows[1])  # 저장 전에도 적중
+    assert cache.save() and not cache.save()  # 변경 없으면 다시 쓰지 않음
+
+    reloaded = EmbeddingCache(tmp_path, "org/model:v1")
+    assert len(reloaded) == 3 and np.array_equal(reloaded.get(keys[2]), rows[2]) and reloaded.hits == 1
+    assert len(EmbeddingCache(tmp_path, "other-model")) == 0
+
+    # 같은 이름으로 차원이 다른 모델이 오면 기존 항목 폐기
+    reloaded.put_many([text_key("d")], np.ones((1, 4), dtype=np.float32))
+    assert reloaded.get(keys[0]) is None and reloaded.dim == 4
+
+    # 전체 재구축: keep에 없는 키 정리
+    assert cache.save(keep=keys[:2])
+    pruned = EmbeddingCache(tmp_path, "org/model:v1")
+    assert len(pruned) == 2 and pruned.get(keys[2]) is None
+
+    # 같은 프로세스의 여러 스레드가 동시에 저장해도 완성된 파일만 남음
+    writers = [EmbeddingCache(tmp_path, "org/model:v1") for _ in range(6)]
+    for i, writer in enumerate(writers):
+        writer.put_many([text_key(f"w{i}")], rows[:1])
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        assert all(pool.map(lambda w: w.save(), writers))
+    assert len(EmbeddingCache(tmp_path, "org/model:v1")) == 3
+    assert not list((tmp_path / "embedding_cache").glob("*.tmp"))
+
+    # VectorEngine 재구축: 바뀐 청크만 다시 인코딩
+    docs = [(f"doc{i}", f"문서 {i} 내용", None) for i in range(20)]
+    model = _CountingEmbedder()
+    engine = VectorEngine(model, "counting")
+    engine.cache = EmbeddingCache(tmp_path, "counting")
+    engine.rebuild(docs)
+    assert engine.last_build["encoded"] == 20
+    docs[3] = ("doc3", "바뀐 내용", None)
+    model.texts.clear()
+    engine.cache = EmbeddingCache(tmp_path, "counting")
+    engine.rebuild(docs)
+    assert model.texts == ["바뀐 내용"] and engine.last_build["cache_hits"] == 19
+    assert engine.search("바뀐 내용", 1)[0][0] == "doc3"
+
+
+def test_vector_engine_rescores_quantized_index_from_embedding_cache(tmp_path, monkeypatch):
+    """int8 + 재점수화: 임베딩 캐시 원본으로 float32와 같은 순위, 인덱스에 원본 사본 없음, 공유 행렬 워커 포함"""
+    from app.services.advanced_rag_service import VectorEngine
+    from app.services.embedding_cache import EmbeddingCache
+
+    docs = _random_corpus(23, 300)
+    queries = ["단어1 단어2", "단어7", "단어30 단어31 단어32", "단어99 단어3"]
+    exact = VectorEngine(_CountingEmbedder(), "hash")
+    exact.add_documents(docs)
+    expected = [exact.search(query, 10) for query in queries]
+
+    monkeypatch.setattr(VectorEngine, "STORAGE", "int8")
+    monkeypatch.setattr(VectorEngine, "RESCORE", 4)
+    engine = VectorEngine(_CountingEmbedder(), "hash")
+    engine.cache = EmbeddingCache(tmp_path, "hash")
+    engine.shared_dir = tmp_path / "vectors"
+    engine.add_documents(docs)
+    assert engine.index.rescore == 4 and engine.index.memory_bytes() < exact.index.memory_bytes() / 3
+
+    hits = engine.cache.hits
+    for query, want in zip(queries, expected):
+        got = engine.search(query, 10)
+        assert [d for d, _ in got] == [d for d, _ in want]
+        _assert_same_scores(got, want, tolerance=1e-5)
+    assert engine.cache.hits == hits  # 재점수화 조회는 적중 집계에 넣지 않음
+
+    # 공유 행렬을 매핑한 워커는 인코딩 없이 캐시 키만 계산해 재점수화
+    assert engine.publish_shared("h")
+    worker_model = _CountingEmbedder()
+    worker = VectorEngine(worker_model, "hash")
+    worker.cache = EmbeddingCache(tmp_path, "hash")
+    worker.shared_dir = tmp_path / "vectors"
+    assert worker.open_shared("h") and worker.index_sources(docs) == len(docs)
+    assert [d for d, _ in worker.search(queries[0], 10)] == [d for d, _ in expected[0]]
+    assert worker_model.texts == [queries[0]]
+
+    # 캐시 원본이 없는 문서는 양자화 점수 유지
+    worker.remove_document(docs[0][0])
+    assert docs[0][0] not in worker._source_keys
+    assert worker._source_vectors([docs[1][0], "missing"])[1] is None
+
+
+def test_rag_service_reload_swaps_snapshot_and_keeps_it_on_failure(tmp_path, monkeypatch):
+    """청크 재로드: 변경 시 새 스냅샷으로 교체, 재구축이 실패하면 기존 스냅샷 유지"""
+    from app.config import Config
+    from app.services import rag_service as rag_module
+
+    def write_chunks(texts):
+        with open(tmp_path / "chunks.jsonl", "w", encoding="utf-8") as f:
+            for i, text in enumerate(texts):
+                f.write(json.dumps({"chunk_id": f"c{i}", "doc_id": "d", "title": "t", "text": text},
+                                   ensure_ascii=False) + "\n")
+
+    monkeypatch.setattr(Config, "RAG_PERSIST_DIR", str(tmp_path))
+    monkeypatch.setattr(rag_module.RAGService, "RELOAD_SETTLE_SECONDS", 0.01)
+    write_chunks(SAMPLE_TEXTS[:2])
+    service = rag_module.RAGService()
+    assert len(service._load_chunks()) == 2 and service.index_version == 1
+
+    write_chunks(SAMPLE_TEXTS[:4])
+    assert service.reload(wait=True)
+    assert len(service._load_chunks()) == 4 and service.index_version == 2
+    assert service.get_chunk("c3")["text"] == SAMPLE_TEXTS[3]
+
+    def broken_store(path):
+        raise OSError("read error")
+
+    write_chunks(SAMPLE_TEXTS[:1])
+    monkeypatch.setattr(rag_module, "open_chunk_store", broken_store)
+    service.reload(wait=True)
+    assert len(service._load_chunks()) == 4 and service.index_version == 2
+    # 실패한 원본으로는 주기 확인이 재구축을 반복하지 않고, 원본이 다시 바뀌면 재시도
+    assert not service.check_for_update()
+    write_chunks(SAMPLE_TEXTS[:3])
+    assert service.check_for_update()
+    service._reload_thread.join()
+    assert not service.check_for_update()
+
+    # 최초 로드 실패만 빈 저장소로 시작
+    fresh = rag_module.RAGService()
+    assert len(fresh._load_chunks()) == 0 and fresh.index_version == 1
+
+
+def _write_chunks(directory, texts):
+    with open(directory / "chunks.jsonl", "w", encoding="utf-8") as f:
+        for i, text in enumerate(texts):
+            f.write(json.dumps({"chunk_id": f"c{i}", "doc_id": "d", "title": "t", "text": text},
+                               ensure_ascii=False) + "\n")
+
+
+def test_chunk_store_concurrent_builds_publish_complete_file(tmp_path):
+    """청크 저장소: 같은 프로세스의 여러 스레드가 동시에 만들어도 완성된 파일만 남음"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.services.chunk_store import ChunkStore, build_chunk_store
+
+    texts = [f"청크 {i} " + "본문 " * (i % 50) for i in range(2000)]
+    _write_chunks(tmp_path, texts)
+    jsonl_path = tmp_path / "chunks.jsonl"
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        paths = list(pool.map(lambda _: build_chunk_store(jsonl_path), range(8)))
+
+    store = ChunkStore.open(paths[0])
+    assert len(store) == len(texts) and store.matches_source(jsonl_path)
+    assert list(store.iter_texts()) == texts
+    assert store.field(1999, "chunk_id") == "c1999"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_resident_index_keeps_dynamic_documents_across_swaps(tmp_path, monkeypatch):
+    """상주 인덱스: 동적 추가 문서는 스냅샷 교체/벡터 재구축 뒤에도 검색됨"""
+    from app.config import Config
+    from app.domain.rag.engine import ResidentIndex
+    from app.services.rag_service import RAGService
+
+    monkeypatch.setattr(Config, "RAG_PERSIST_DIR", str(tmp_path))
+    monkeypatch.setattr(RAGService, "RELOAD_SETTLE_SECONDS", 0.01)
+    monkeypatch.setenv("RAG_EMBED_PROVIDER", "hashing")
+    _write_chunks(tmp_path, SAMPLE_TEXTS[:3])
+    service = RAGService()
+    index = ResidentIndex(service).ensure_loaded()
+    index.add_document("dyn", "dynamic zebra document", {"source": "upload"})
+    index.add_document("gone", "removed zebra document", {})
+    index.remove_document("gone")
+
+    def found():
+        return ([doc_id for doc_id, _ in index.bm25.search("zebra", 5)],
+                [doc_id for doc_id, _ in index.vectors.search("dynamic zebra document", 1)])
+
+    assert found() == (["dyn"], ["dyn"])
+
+    _write_chunks(tmp_path, SAMPLE_TEXTS[:4])
+    service.reload(wait=True)
+    assert index.ensure_current()
+    index._refresh_thread.join()
+    assert index.source_version == service.index_version and index.bm25.N == 5
+    assert found() == (["dyn"], ["dyn"])
+    assert index.document("dyn") == ("dynamic zebra document", {"source": "upload"})
+
+    assert index.rebuild_vectors() == 5
+    assert found() == (["dyn"], ["dyn"])
+
+
+def test_resident_index_builds_from_one_snapshot_with_shared_result_ids(tmp_path, monkeypatch):
+    """상주 인덱스: 로드 도중 스냅샷이 바뀌어도 한 스냅샷의 버전/해시/청크로 구축, 결과 doc_id·chunk_id는 경로와 무관하게 같음"""
+    import asyncio
+
+    from app.config import Config
+    from app.domain.rag.engine import ResidentIndex
+    from app.services.advanced_rag_service import AdvancedRAGService
+    from app.services.bm25_index import FrozenBM25Index
+    from app.services.rag_service import RAGService
+
+    monkeypatch.setattr(Config, "RAG_PERSIST_DIR", str(tmp_path))
+    monkeypatch.setattr(RAGService, "RELOAD_SETTLE_SECONDS", 0.01)
+    monkeypatch.setenv("RAG_EMBED_PROVIDER", "hashing")
+    _write_chunks(tmp_path, SAMPLE_TEXTS[:3])
+    service = RAGService()
+    first = service.snapshot
+
+    # BM25 구축 직전에 청크가 바뀌어 스냅샷이 교체되는 경우
+    real_build = ResidentIndex._build_bm25
+
+    def build_after_swap(self, snapshot):
+        if service.index_version == first.version:
+            _write_chunks(tmp_path, SAMPLE_TEXTS[:4])
+            service.reload(wait=True)
+        return real_build(self, snapshot)
+
+    monkeypatch.setattr(ResidentIndex, "_build_bm25", build_after_swap)
+    index = ResidentIndex(service).ensure_loaded()
+    assert service.index_version == first.version + 1
+    assert index.source_version == first.version
+    assert index.bm25.N == 3 and len(index.vectors) == 3
+    header = FrozenBM25Index.read_header(tmp_path / "bm25_index.npz")
+    assert header["source_hash"] == first.source_hash
+
+    assert index.ensure_current()
+    index._refresh_thread.join()
+    assert index.source_version == service.index_version and index.bm25.N == 4
+
+    # 같은 청크는 도메인 엔진, 고급 검색, RAGService 키워드 검색에서 같은 (doc_id, chunk_id)
+    hit = index.hit("c2", 1.0)
+    assert (hit.doc_id, hit.chunk_id) == ("d", "c2")
+    advanced = AdvancedRAGService(service, None)
+
+    async def search():
+        await advanced.initialize()
+        return await advanced.hybrid_search("현재완료시제 have", top_k=2)
+
+    results = asyncio.run(search())
+    keyword = service.search("현재완료시제 have", top_k=2)
+    assert (results[0].doc_id, results[0].chunk_id) == ("d", "c2")
+    assert (keyword[0].doc_id, keyword[0].chunk_id) == ("d", "c2")
+
+
+def test_rrf_fusion_survives_rerank_evidence():
+    """RRF 점수는 0~1로 맞춰져 리랭킹 증거 점수가 검색 관련도를 뒤집지 않음"""
+    from app.domain.rag.fusion import fuse
+    from app.services.advanced_rag_service import HybridSearchResult, RerankEngine
+
+    fused = fuse([("a", 9.0), ("b", 4.0)], [("a", 0.9), ("c", 0.8)], 0.5, "rrf")
+    assert fused[0] == ("a", 1.0)
+    assert all(0.0 < score <= 1.0 for _, score in fused)
+
+    texts = {"a": "short", "b": "x" * 600, "c": "y" * 300}
+    sources = {"a": "notes.md", "b": "official/guide.md", "c": "academic/paper.md"}
+    results = [
+        HybridSearchResult(doc_id, doc_id, score, 0.0, 0.0, texts[doc_id], "", sources[doc_id], "hybrid", {})
+        for doc_id, score in fused
+    ]
+    reranked = RerankEngine().rerank(results)
+    assert reranked[0].doc_id == "a"
+
+
+def test_hybrid_search_many_matches_single_queries(tmp_path, monkeypatch):
+    """일괄 검색: 쿼리별 hybrid_search와 같은 결과, 중복 쿼리는 한 번만 계산하고 캐시 적중"""
+    import asyncio
+
+    from app.config import Config
+    from app.domain.rag.retrieval_cache import RetrievalCache
+    from app.services.advanced_rag_service import AdvancedRAGService
+    from app.services.rag_service import RAGService
+
+    monkeypatch.setattr(Config, "RAG_PERSIST_DIR", str(tmp_path))
+    monkeypatch.setenv("RAG_EMBED_PROVIDER", "hashing")
+    _write_chunks(tmp_path, SAMPLE_TEXTS[:4])
+    service = AdvancedRAGService(RAGService(), None)
+    queries = ["현재시제 soccer", "관계대명사 who", " 현재시제   soccer "]
+
+    def same(left, right):
+        # 일괄 행렬곱과 단일 쿼리 내적은 float32 반올림이 달라 점수는 근사 비교
+        return all(
+            [r.doc_id for r in a] == [r.doc_id for r in b]
+            and all(abs(x.score - y.score) < 1e-5 for x, y in zip(a, b))
+            for a, b in zip(left, right)
+        ) and len(left) == len(right)
+
+    async def run():
+        await service.initialize()
+        for fusion in ("minmax", "rrf"):
+            service.cache = RetrievalCache(max_entries=64, ttl=60)
+            batch = await service.hybrid_search_many(queries, top_k=3, fusion=fusion)
+            # 같은(정규화 기준) 쿼리 2개 -> 계산은 2번, 세 번째는 첫 번째 결과를 공유
+            assert len(service.cache) == 2 and service.cache.hits == 0
+            assert same([batch[0]], [batch[2]]) and batch[0] is not batch[2]
+
+            service.cache = RetrievalCache(max_entries=64, ttl=60)
+            single = [await service.hybrid_search(q, top_k=3, fusion=fusion) for q in queries]
+            assert same(batch, single)
+            assert service.cache.hits == 1
+
+            again = await service.hybrid_search_many(queries, top_k=3, fusion=fusion)
+            assert service.cache.hits == 4
+            assert same(again, batch)
+
+    asyncio.run(run())
+
+
+def test_batch_search_endpoint_rejects_invalid_requests():
+    """일괄 검색 API: 잘못된 요청은 검색 서비스를 거치지 않고 400"""
+    pytest.importorskip("app.api.chat")  # openai 등 chat 블루프린트 의존성이 없으면 건너뜀
+    from app import create_app
+    from app.api.chat import MAX_BATCH_QUERIES
+    from app.config import TestingConfig
+
+    client = create_app(TestingConfig).test_client()
+    bodies = [
+        {},
+        {"queries": []},
+        {"queries": "현재시제"},
+        {"queries": ["현재시제", "  "]},
+        {"queries": ["q"] * (MAX_BATCH_QUERIES + 1)},
+        {"queries": ["현재시제"], "fusion": "unknown"},
+    ]
+    for body in bodies:
+        response = client.post("/api/v1/search/batch", json=body)
+        assert response.status_code == 400, body
+        assert response.get_json()["success"] is False
@@ -18,6 +18,7 @@ export class AdvancedSearchService {
    * @param {number} options.topK - 상위 결과 수 (기본값: 10)
    * @param {number} options.alpha - BM25 가중치 (기본값: 0.5)
    * @param {boolean} options.useRerank - 리랭킹 사용 여부 (기본값: true)
+   * @param {string} [options.fusion] - 점수 융합 방식 ('minmax' | 'zscore' | 'rrf', 생략하면 서버 기본값)
    * @returns {Promise<Object>} 검색 결과
    */
   async hybridSearch(options = {}) {
@@ -25,7 +26,8 @@ export class AdvancedSearchService {
       query,
       topK = 10,
       alpha = 0.5,
-      useRerank = true
+      useRerank = true,
+      fusion
     } = options;
 
     if (!query || query.trim().length === 0) {
@@ -33,7 +35,7 @@ export class AdvancedSearchService {
     }
 
     // 캐시 확인
-    const cacheKey = `search:${query}:${topK}:${alpha}:${useRerank}`;
+    const cacheKey = `search:${query}:${topK}:${alpha}:${useRerank}:${fusion || ''}`;
     const cached = this.cache.get(cacheKey);
     if (cached && Date.now() - cached.timestamp < this.cacheTimeout) {
       return cached.data;
@@ -44,7 +46,8 @@ export class AdvancedSearchService {
         query: query.trim(),
         top_k: topK,
         alpha: alpha,
-        use_rerank: useRerank
+        use_rerank: useRerank,
+        ...(fusion ? { fusion } : {})
       });
 
       // 캐시 저장
@@ -59,6 +62,43 @@ export class AdvancedSearchService {
     }
   }
 
+  /**
+   * 여러 쿼리 하이브리드 검색 (요청 한 번, 서버에서 쿼리 임베딩을 한 번에 계산)
+   * @param {Object} options - 검색 옵션
+   * @param {string[]} options.queries - 검색 쿼리 목록
+   * @param {number} options.topK - 쿼리별 상위 결과 수 (기본값: 10)
+   * @param {number} options.alpha - BM25 가중치 (기본값: 0.5)
+   * @param {boolean} options.useRerank - 리랭킹 사용 여부 (기본값: true)
+   * @param {string} [options.fusion] - 점수 융합 방식 ('minmax' | 'zscore' | 'rrf', 생략하면 서버 기본값)
+   * @returns {Promise<Object>} 쿼리별 검색 결과 (results[i].query, results[i].results)
+   */
+  async batchSearch(options = {}) {
+    const {
+      queries = [],
+      topK = 10,
+      alpha = 0.5,
+      useRerank = true,
+      fusion
+    } = options;
+
+    const trimmed = queries.map(query => (query || '').trim());
+    if (trimmed.length === 0 || trimmed.some(query => query.length === 0)) {
+      throw new ApiError(400, '비어있는 검색 쿼리가 있습니다.');
+    }
+
+    try {
+      return await apiClient.post('/search/batch', {
+        queries: trimmed,
+        top_k: topK,
+        alpha: alpha,
+        use_rerank: useRerank,
+        ...(fusion ? { fusion } : {})
+      });
+    } catch (error) {
+      throw new ApiError(error.status || 500, `일괄 검색 실패: ${error.message}`);
+    }
+  }
+
   /**
    * 검색 통계 조회
    * @returns {Promise<Object>} 검색 통계